@@ -0,0 +1,96 @@
+"""Throughput benchmark of http json api.
+
+Run from root of project:
+    python -m benchmarks.bench_http_api --books 10000 --clients 32
+"""
+
+import asyncio
+import json
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+from book_library.http_api import BookHttpApi
+from book_library.repository import RepositoryBook
+
+
+async def client(
+    port: int, requests: list[tuple[str, str, bytes]]
+) -> list[float]:
+    """Send requests over one keep alive connection, return latencies."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    latencies = []
+    for method, path, body in requests:
+        started = time.perf_counter()
+        writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: bench\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+        length = 0
+        while (line := await reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - started)
+    writer.close()
+    return latencies
+
+
+async def benchmark(
+    count_books: int, count_clients: int, count_requests: int, writes: float
+) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repository = RepositoryBook(Path(tmpdir) / "bench.json", journal=True)
+        book_data = dict(
+            title="Основы Python", author="Лутц", year=2023, availability=True
+        )
+        for _ in range(count_books):
+            repository.create(**book_data)
+
+        api = BookHttpApi(repository)
+        server = await api.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+
+        body = json.dumps(book_data).encode()
+        every_write = int(1 / writes) if writes else 0
+        requests = [
+            (
+                ("POST", "/books", body)
+                if every_write and number % every_write == 0
+                else ("GET", f"/books/{number % count_books + 1}", b"")
+            )
+            for number in range(count_requests)
+        ]
+
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(client(port, requests) for _ in range(count_clients))
+        )
+        elapsed = time.perf_counter() - started
+
+        server.close()
+        await server.wait_closed()
+        await api.stop()
+
+    latencies = sorted(latency for result in results for latency in result)
+    total = len(latencies)
+    print(f"книг: {count_books}, клиентов: {count_clients}")
+    print(f"запросов: {total}, доля записи: {writes}")
+    print(f"пропускная способность: {total / elapsed:.0f} запросов/с")
+    print(f"задержка p50: {latencies[total // 2] * 1000:.2f} мс")
+    print(f"задержка p99: {latencies[int(total * 0.99)] * 1000:.2f} мс")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Нагрузочный тест http api.")
+    parser.add_argument("--books", type=int, default=10_000)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--writes", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(
+        benchmark(args.books, args.clients, args.requests, args.writes)
+    )
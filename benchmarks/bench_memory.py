@@ -0,0 +1,65 @@
+"""Memory benchmark of books in list of models and in column arrays.
+
+Run from root of project:
+    python -m benchmarks.bench_memory --books 1000000
+"""
+
+import gc
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from typing import Callable, MutableMapping
+
+from book_library.columnar import ColumnarBookStore
+from book_library.schemas import BookSchema
+
+
+def generate_books(count_books: int) -> list[dict]:
+    return [
+        dict(
+            id=obj_id,
+            title=f"Книга номер {obj_id % 50_000}",
+            author=f"Автор {obj_id % 5_000}",
+            year=1900 + obj_id % 125,
+            availability=obj_id % 3 != 0,
+        )
+        for obj_id in range(1, count_books + 1)
+    ]
+
+
+def measure(
+    name: str,
+    make_store: Callable[[], MutableMapping[int, BookSchema]],
+    books_data: list[dict],
+) -> None:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    store = make_store()
+    for book_data in books_data:
+        store[book_data["id"]] = BookSchema(**book_data)
+    elapsed = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for _ in store.values():
+        pass
+    scan = time.perf_counter() - started
+    print(
+        f"{name:<10} память: {size / 2**20:8.1f} МБ"
+        f" ({size / len(books_data):6.1f} байт на книгу),"
+        f" загрузка: {elapsed:6.2f} с, обход: {scan:6.2f} с"
+    )
+    del store
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Замер памяти хранения книг.")
+    parser.add_argument("--books", type=int, default=200_000)
+    args = parser.parse_args()
+
+    books_data = generate_books(args.books)
+    print(f"книг: {args.books}")
+    measure("models", dict, books_data)
+    measure("columnar", ColumnarBookStore, books_data)
@@ -0,0 +1,60 @@
+"""Benchmark of validation of json lines snapshot in processes.
+
+Serial load validates records one by one and puts them in columns
+with counters of books, as repository does. Parallel load validates
+parts of snapshot in 2, 4 and more processes up to number of cores,
+counts of processes are set by --workers.
+
+Run from root of project:
+    python -m benchmarks.bench_parallel_load --books 1000000
+"""
+
+import os
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from benchmarks.catalog import generate_books
+from book_library.columnar import ColumnarBookStore
+from book_library.constants import LOAD_CHUNK_BYTES
+from book_library.snapshot import (
+    iter_snapshot,
+    read_jsonl_parallel,
+    write_snapshot,
+)
+from book_library.stats import BookStats
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Замер проверки снимка в процессах.")
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--chunk-bytes", type=int, default=LOAD_CHUNK_BYTES)
+    parser.add_argument("--workers", type=int, nargs="+")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    counts_workers = args.workers or [
+        2**power for power in range(1, cores.bit_length())
+    ]
+    if args.workers is None and cores not in counts_workers and cores > 1:
+        counts_workers.append(cores)
+
+    with TemporaryDirectory() as tmpdir:
+        path_file = Path(tmpdir) / "library_db.jsonl"
+        write_snapshot(path_file, generate_books(args.books))
+        print(f"книг: {args.books}, ядер: {cores}")
+        print(f"{'процессов':>10} {'время с':>10} {'ускорение':>10}")
+
+        started = time.perf_counter()
+        store, stats = ColumnarBookStore(), BookStats()
+        for book in iter_snapshot(path_file):
+            store[book.id] = book
+            stats.add(book)
+        serial = time.perf_counter() - started
+        print(f"{1:>10} {serial:10.3f} {1:10.2f}")
+
+        for workers in counts_workers:
+            started = time.perf_counter()
+            read_jsonl_parallel(path_file, workers, args.chunk_bytes)
+            elapsed = time.perf_counter() - started
+            print(f"{workers:>10} {elapsed:10.3f} {serial / elapsed:10.2f}")
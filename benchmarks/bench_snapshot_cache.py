@@ -0,0 +1,58 @@
+"""Benchmark of repository start with and without snapshot cache.
+
+Run from root of project:
+    python -m benchmarks.bench_snapshot_cache --books 200000
+"""
+
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+from benchmarks.bench_memory import generate_books
+from book_library.repository import RepositoryBook
+from book_library.schemas import BookSchema
+from book_library.snapshot import write_snapshot
+
+
+def measure(
+    name: str, json_path: Path, cache: bool, columnar: bool, repeat: int
+) -> None:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        repository = RepositoryBook(json_path, columnar=columnar, cache=cache)
+        repository.get(obj_id=1)
+        timings.append(time.perf_counter() - started)
+    print(f"{name:<20} старт и get --id: {min(timings):6.3f} с")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Замер старта с кэшем снимка.")
+    parser.add_argument("--books", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        json_path = Path(tmpdir) / "library_db.json"
+        write_snapshot(
+            json_path,
+            (
+                BookSchema(**book_data)
+                for book_data in generate_books(args.books)
+            ),
+        )
+        print(f"книг: {args.books}")
+        RepositoryBook(json_path)
+        for columnar in (False, True):
+            store_name = "columnar" if columnar else "models"
+            measure(
+                f"{store_name} validate",
+                json_path,
+                False,
+                columnar,
+                args.repeat,
+            )
+            measure(
+                f"{store_name} cache", json_path, True, columnar, args.repeat
+            )
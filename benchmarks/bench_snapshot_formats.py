@@ -0,0 +1,87 @@
+"""Benchmark of snapshot formats: write, start and size of file.
+
+Catalog is written in json with indent, compact json, json lines and
+binary format. Start is measured without snapshot cache, point read
+of binary format reads one book through memory map.
+
+Run from root of project:
+    python -m benchmarks.bench_snapshot_formats --books 200000
+"""
+
+import random
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Callable
+
+from benchmarks.catalog import generate_books
+from book_library.binary_snapshot import BinarySnapshot
+from book_library.repository import RepositoryBook
+from book_library.snapshot import write_snapshot
+
+MB = 2**20
+FORMATS = {
+    "json indent": ("library_db.json", 4),
+    "json compact": ("library_db.json", None),
+    "jsonl": ("library_db.jsonl", None),
+    "binary": ("library_db.books", None),
+}
+
+
+def best_time(func: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def point_reads(path_file: Path, count_books: int, count: int) -> float:
+    """Get mean time of opening of binary snapshot and reading one book."""
+    rng = random.Random(0)
+
+    def read() -> None:
+        for _ in range(count):
+            with BinarySnapshot(path_file) as snapshot:
+                snapshot.get(rng.randint(1, count_books))
+
+    return best_time(read, 3) / count
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Замер форматов файла с книгами.")
+    parser.add_argument("--books", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    books = list(generate_books(args.books))
+    print(f"книг: {args.books}")
+    print(
+        f"{'формат':<14} {'размер МБ':>10} {'запись с':>10}"
+        f" {'старт с':>10} {'старт columnar с':>17}"
+    )
+    with TemporaryDirectory() as tmpdir:
+        for name, (file_name, indent) in FORMATS.items():
+            path_file = Path(tmpdir) / file_name
+            save = best_time(
+                lambda: write_snapshot(path_file, books, indent), args.repeat
+            )
+            loads = [
+                best_time(
+                    lambda: RepositoryBook(
+                        path_file, columnar=columnar, cache=False
+                    ),
+                    args.repeat,
+                )
+                for columnar in (False, True)
+            ]
+            size = path_file.stat().st_size / MB
+            print(
+                f"{name:<14} {size:10.2f} {save:10.3f}"
+                f" {loads[0]:10.3f} {loads[1]:17.3f}"
+            )
+            if path_file.suffix == ".books":
+                read = point_reads(path_file, args.books, 1000)
+                print(f"{'':<14} чтение одной книги: {read * 1000:.3f} мс")
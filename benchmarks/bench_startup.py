@@ -0,0 +1,109 @@
+"""Benchmark of program start for every command with import time log.
+
+Program is copied in temp directory with generated catalog, every
+command runs in new process with python -X importtime. Exit code is 1
+when import time of some command is over --max-import-ms.
+
+Run from root of project:
+    python -m benchmarks.bench_startup --books 100000 --max-import-ms 300
+"""
+
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+from benchmarks.bench_memory import generate_books
+from book_library.constants import BASE_DIR, JSON_FILE
+from book_library.schemas import BookSchema
+from book_library.snapshot import write_snapshot
+
+COMMANDS = (
+    ["-h"],
+    ["unknown_command"],
+    ["get", "--id", "1"],
+    ["delete"],
+    ["search", "--author", "Автор 1"],
+)
+
+
+def run_command(project_dir: Path, args: list[str]) -> tuple[float, dict]:
+    """Run command and get wall time and import time of modules in ms."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "main.py", *args],
+        cwd=project_dir,
+        capture_output=True,
+        text=True,
+    )
+    wall_time = (time.perf_counter() - started) * 1000
+
+    modules: dict[str, tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, cumulative, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = (int(self_time), int(cumulative))
+    return wall_time, modules
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Замер старта программы.")
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=3)
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_dir = Path(tmpdir)
+        shutil.copytree(
+            BASE_DIR / "book_library",
+            project_dir / "book_library",
+            ignore=shutil.ignore_patterns("__pycache__"),
+        )
+        shutil.copy(BASE_DIR / "main.py", project_dir)
+        write_snapshot(
+            project_dir / JSON_FILE.name,
+            (
+                BookSchema(**book_data)
+                for book_data in generate_books(args.books)
+            ),
+        )
+        # first run writes snapshot cache and byte code
+        run_command(project_dir, ["get", "--id", "1"])
+
+        print(f"книг: {args.books}")
+        failed = False
+        for command in COMMANDS:
+            runs = [
+                run_command(project_dir, command) for _ in range(args.repeat)
+            ]
+            wall_time, modules = min(runs, key=lambda run: run[0])
+            import_time = sum(self_time for self_time, _ in modules.values())
+            import_ms = import_time / 1000
+            top_modules = sorted(
+                (
+                    (cumulative, name)
+                    for name, (_, cumulative) in modules.items()
+                    if name.split(".")[0] != "book_library" and "." not in name
+                ),
+                reverse=True,
+            )[: args.top]
+            print(
+                f"{' '.join(command):<28} запуск: {wall_time:7.1f} мс,"
+                f" импорт: {import_ms:6.1f} мс, модулей: {len(modules):4},"
+                " тяжелые: "
+                + ", ".join(
+                    f"{name} {cumulative / 1000:.1f}"
+                    for cumulative, name in top_modules
+                )
+            )
+            if args.max_import_ms is not None and (
+                import_ms > args.max_import_ms
+            ):
+                failed = True
+        sys.exit(1 if failed else 0)
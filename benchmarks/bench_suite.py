@@ -0,0 +1,362 @@
+"""Benchmark suite of repository and CLI on generated catalogs.
+
+Every storage is measured on catalog of every size: start with and
+without snapshot cache, peak memory of start, file size, latency of
+CRUD operations, search, sort, output of books and CLI commands.
+Results are saved in json file. With --compare the results are checked
+against results of earlier run, exit code is 1 when some metric is
+worse than --threshold.
+
+Run from root of project:
+    python -m benchmarks.bench_suite --sizes 10000 100000 1000000
+    python -m benchmarks.bench_suite --sizes 10000 --compare old.json
+"""
+
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Callable
+
+from benchmarks.catalog import author_name, generate_books, write_catalog
+from book_library.constants import (
+    BASE_DIR,
+    COLUMNAR_STORAGE,
+    JOURNAL_MODE,
+    JSON_FILE,
+    OUTPUT_FORMAT_TSV,
+    SNAPSHOT_CACHE_SUFFIX,
+)
+from book_library.outputs import pretty_books_output, stream_books_output
+from book_library.query import EqualPredicate, RangePredicate, SortOrder
+from book_library.storage import open_repository
+
+STORAGE_FILES = {
+    "json": JSON_FILE.name,
+    "binary": "library_db.books",
+    "sqlite": "library_db.sqlite3",
+    "records": "library_db.rec",
+}
+MB = 2**20
+# metrics with these units are better when they are greater
+GREATER_IS_BETTER = ("books/s",)
+# latency of one slow call is noise, it is saved but not compared
+NOT_COMPARED = ("max_ms",)
+
+
+class Results:
+    """Metrics of run with description of environment."""
+
+    def __init__(self, settings: dict[str, Any]):
+        self.meta = {
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "commit": git_commit(),
+            **settings,
+        }
+        self.metrics: list[dict[str, Any]] = []
+
+    def add(
+        self,
+        size: int,
+        storage: str,
+        operation: str,
+        metric: str,
+        value: float,
+        unit: str,
+    ) -> None:
+        self.metrics.append(
+            dict(
+                size=size,
+                storage=storage,
+                operation=operation,
+                metric=metric,
+                value=round(value, 6),
+                unit=unit,
+            )
+        )
+        print(
+            f"{storage:<7} {size:>9} {operation:<16} {metric:<10}"
+            f" {value:12.3f} {unit}"
+        )
+
+    def add_latency(
+        self, size: int, storage: str, operation: str, timings: list[float]
+    ) -> None:
+        """Add median, 95 percentile and max of latencies in ms."""
+        timings = sorted(timings)
+        for metric, position in (
+            ("p50_ms", 0.5),
+            ("p95_ms", 0.95),
+            ("max_ms", 1.0),
+        ):
+            value = timings[round(position * (len(timings) - 1))] * 1000
+            self.add(size, storage, operation, metric, value, "ms")
+
+    def save(self, path_file: Path) -> None:
+        path_file.write_text(
+            json.dumps(
+                {"meta": self.meta, "metrics": self.metrics},
+                ensure_ascii=False,
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        print(f"Результаты сохранены в {path_file}.")
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR,
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def measure(func: Callable[[int], Any], count: int) -> list[float]:
+    """Call function with number of call, get time of every call."""
+    timings = []
+    for number in range(count):
+        started = time.perf_counter()
+        func(number)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def bench_repository(
+    results: Results, storage: str, size: int, path_file: Path, ops: int
+) -> None:
+    """Measure start, reads, writes and output of books of storage."""
+    add = results.add
+    rng = random.Random(size)
+    add(size, storage, "file", "size", path_file.stat().st_size / MB, "MB")
+
+    def open_storage():
+        return open_repository(path_file, JOURNAL_MODE, COLUMNAR_STORAGE)
+
+    path_cache = path_file.with_name(path_file.name + SNAPSHOT_CACHE_SUFFIX)
+    path_cache.unlink(missing_ok=True)
+    started = time.perf_counter()
+    open_storage()
+    add(size, storage, "load_cold", "s", time.perf_counter() - started, "s")
+    # memory is traced in separate start, tracing slows start down
+    path_cache.unlink(missing_ok=True)
+    tracemalloc.start()
+    open_storage()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    add(size, storage, "load_cold", "peak", peak / MB, "MB")
+    timings = measure(lambda _: open_storage(), 3)
+    add(size, storage, "load_warm", "s", min(timings), "s")
+    repository = open_storage()
+
+    def random_id() -> int:
+        return rng.randint(1, size)
+
+    reads: dict[str, Callable[[int], Any]] = {
+        "get": lambda _: repository.get(random_id()),
+        "get_many_1000": lambda _: repository.get_many(
+            [random_id() for _ in range(1000)]
+        ),
+        "search_author": lambda number: list(
+            repository.iter_search(
+                [EqualPredicate("author", author_name(number % 50))]
+            )
+        ),
+        "search_years": lambda number: list(
+            repository.iter_search(
+                [RangePredicate("year", 1900 + number, 1909 + number)]
+            )
+        ),
+        "search_text": lambda number: list(
+            repository.iter_search([], ["мастер", "сад", "ночь"][number % 3])
+        ),
+        "top_20_by_year": lambda _: list(
+            repository.iter_all(0, 20, SortOrder("year", True))
+        ),
+        "stats": lambda _: repository.stats(),
+    }
+    for operation, func in reads.items():
+        results.add_latency(size, storage, operation, measure(func, ops))
+
+    timings = measure(lambda _: sum(1 for _ in repository.iter_all()), 3)
+    add(size, storage, "scan", "speed", size / min(timings), "books/s")
+    page = list(repository.iter_all(0, 1000))
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        with redirect_stdout(devnull):
+            table_timings = measure(lambda _: pretty_books_output(page), 3)
+            tsv_timings = measure(
+                lambda _: stream_books_output(
+                    repository.iter_all(), OUTPUT_FORMAT_TSV
+                ),
+                1,
+            )
+    speed = len(page) / min(table_timings)
+    add(size, storage, "render_table", "speed", speed, "books/s")
+    speed = size / min(tsv_timings)
+    add(size, storage, "render_tsv", "speed", speed, "books/s")
+
+    book_data = next(generate_books(1)).model_dump(exclude={"id"})
+    created_ids: list[int] = []
+    writes: dict[str, Callable[[int], Any]] = {
+        "create": lambda _: created_ids.append(
+            repository.create(**book_data).id
+        ),
+        "update": lambda _: repository.update(random_id(), availability=False),
+        "remove": lambda number: repository.remove(created_ids[number]),
+    }
+    for operation, func in writes.items():
+        results.add_latency(size, storage, operation, measure(func, ops))
+
+    timings = measure(lambda _: repository.create_many([book_data] * 1000), 3)
+    add(size, storage, "create_many", "speed", 1000 / min(timings), "books/s")
+    timings = measure(
+        lambda number: repository.update_many(
+            [EqualPredicate("author", author_name(number))], title="Новое"
+        ),
+        3,
+    )
+    results.add_latency(size, storage, "update_many", timings)
+
+
+def bench_cli(
+    results: Results, size: int, path_file: Path, repeat: int
+) -> None:
+    """Measure wall time of CLI commands on copy of program."""
+    project_dir = path_file.parent / "cli"
+    shutil.copytree(
+        BASE_DIR / "book_library",
+        project_dir / "book_library",
+        ignore=shutil.ignore_patterns("__pycache__"),
+    )
+    shutil.copy(BASE_DIR / "main.py", project_dir)
+    shutil.copy(path_file, project_dir / JSON_FILE.name)
+    commands = {
+        "cli_get": ["get", "--id", "1"],
+        "cli_search": ["search", "--author", author_name(0), "--limit", "20"],
+        "cli_top_20": ["get_all", "--sort-by", "year", "--limit", "20"],
+        "cli_stats": ["stats", "--limit", "5"],
+        "cli_post": [
+            "post",
+            "--title=Книга",
+            "--author=Автор",
+            "--year=2000",
+            "--availability=true",
+        ],
+    }
+
+    def run(args: list[str]) -> None:
+        subprocess.run(
+            [sys.executable, "main.py", *args],
+            cwd=project_dir,
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+
+    # first run writes snapshot cache and byte code
+    run(commands["cli_get"])
+    for operation, args in commands.items():
+        timings = measure(lambda _: run(args), repeat)
+        results.add_latency(size, "json", operation, timings)
+
+
+def compare(
+    metrics: list[dict[str, Any]], path_old: Path, threshold: float
+) -> bool:
+    """Print change of metrics against old results, get if some is worse."""
+    old_data = json.loads(path_old.read_text(encoding="utf-8"))
+    old_metrics = {
+        (item["size"], item["storage"], item["operation"], item["metric"]): (
+            item["value"]
+        )
+        for item in old_data["metrics"]
+    }
+    print(f"Сравнение с {path_old} (коммит {old_data['meta']['commit']}):")
+    regression = False
+    for item in metrics:
+        key = (
+            item["size"],
+            item["storage"],
+            item["operation"],
+            item["metric"],
+        )
+        old_value = old_metrics.get(key)
+        if not old_value or item["metric"] in NOT_COMPARED:
+            continue
+        change = item["value"] / old_value - 1
+        worse = -change if item["unit"] in GREATER_IS_BETTER else change
+        mark = ""
+        if worse > threshold:
+            mark = " РЕГРЕССИЯ"
+            regression = True
+        print(
+            f"{' '.join(map(str, key)):<50}"
+            f" {old_value:12.3f} -> {item['value']:12.3f}"
+            f" {item['unit']:<8} {change:+7.1%}{mark}"
+        )
+    return regression
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Набор замеров хранилищ и команд.")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000]
+    )
+    parser.add_argument(
+        "--storages",
+        nargs="+",
+        choices=tuple(STORAGE_FILES),
+        default=list(STORAGE_FILES),
+    )
+    parser.add_argument("--ops", type=int, default=50)
+    parser.add_argument("--cli-repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path(f"bench_{datetime.now():%Y%m%d_%H%M%S}.json"),
+    )
+    parser.add_argument("--compare", type=Path, default=None)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = Results(
+        dict(
+            sizes=args.sizes,
+            ops=args.ops,
+            seed=args.seed,
+            journal=JOURNAL_MODE,
+            columnar=COLUMNAR_STORAGE,
+        )
+    )
+    for size in args.sizes:
+        for storage in args.storages:
+            with TemporaryDirectory() as tmpdir:
+                path_file = Path(tmpdir) / STORAGE_FILES[storage]
+                write_catalog(path_file, size, args.seed)
+                if storage == "json":
+                    bench_cli(results, size, path_file, args.cli_repeat)
+                bench_repository(results, storage, size, path_file, args.ops)
+    results.save(args.output)
+
+    if args.compare is not None:
+        sys.exit(
+            1 if compare(results.metrics, args.compare, args.threshold) else 0
+        )
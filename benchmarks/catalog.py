@@ -0,0 +1,80 @@
+"""Synthetic catalog of books for benchmarks.
+
+Books are validated BookSchema models generated from seed, so every run
+gets the same catalog. Few authors have many books and most authors
+have few of them, like in real catalogs.
+"""
+
+import random
+from pathlib import Path
+from typing import Iterator
+
+from book_library.constants import SQLITE_SUFFIXES
+from book_library.schemas import BookSchema
+from book_library.snapshot import write_snapshot
+from book_library.sqlite_repository import SQLiteRepositoryBook
+
+# fmt: off
+TITLE_WORDS = (
+    "война", "мир", "тихий", "дон", "мастер", "маргарита", "отцы", "дети",
+    "преступление", "наказание", "идиот", "бесы", "мертвые", "души",
+    "капитанская", "дочка", "герой", "нашего", "времени", "горе", "от",
+    "ума", "белая", "гвардия", "собачье", "сердце", "золотой", "теленок",
+    "основы", "python", "алгоритмы", "структуры", "данных", "история",
+    "сад", "вишневый", "остров", "море", "старик", "ночь",
+)
+FIRST_NAMES = (
+    "Александр", "Федор", "Лев", "Михаил", "Антон", "Иван", "Николай",
+    "Анна", "Марина", "Борис", "Сергей", "Владимир", "Ольга", "Елена",
+)
+LAST_NAMES = (
+    "Пушкин", "Достоевский", "Толстой", "Булгаков", "Чехов", "Тургенев",
+    "Гоголь", "Ахматова", "Цветаева", "Пастернак", "Есенин", "Лермонтов",
+    "Грибоедов", "Шолохов", "Ильф", "Лутц", "Кнут", "Бунин",
+)
+# fmt: on
+BOOKS_PER_AUTHOR = 20
+YEAR_FROM = 1800
+YEAR_TO = 2024
+AVAILABLE_SHARE = 0.7
+
+
+def author_name(number: int) -> str:
+    """Get unique name of author for its number."""
+    last_name = LAST_NAMES[number % len(LAST_NAMES)]
+    first_name = FIRST_NAMES[number // len(LAST_NAMES) % len(FIRST_NAMES)]
+    name = f"{first_name} {last_name}"
+    names_count = len(LAST_NAMES) * len(FIRST_NAMES)
+    if number >= names_count:
+        name += f" {number // names_count}"
+    return name
+
+
+def generate_books(count_books: int, seed: int = 0) -> Iterator[BookSchema]:
+    """Generate books with ids from 1 to count_books."""
+    rng = random.Random(seed)
+    count_authors = max(1, count_books // BOOKS_PER_AUTHOR)
+    for obj_id in range(1, count_books + 1):
+        # cube of uniform number makes authors with small numbers popular
+        author_number = int(count_authors * rng.random() ** 3)
+        words = rng.choices(TITLE_WORDS, k=rng.randint(1, 4))
+        yield BookSchema(
+            id=obj_id,
+            title=" ".join(words).capitalize(),
+            author=author_name(author_number),
+            year=rng.randint(YEAR_FROM, YEAR_TO),
+            availability=rng.random() < AVAILABLE_SHARE,
+        )
+
+
+def write_catalog(path_file: Path, count_books: int, seed: int = 0) -> None:
+    """Write generated catalog in json, json lines or sqlite file."""
+    books = generate_books(count_books, seed)
+    if path_file.suffix in SQLITE_SUFFIXES:
+        repository = SQLiteRepositoryBook(path_file)
+        repository.create_many(
+            book.model_dump(exclude={"id"}) for book in books
+        )
+        repository.close()
+        return
+    write_snapshot(path_file, books)
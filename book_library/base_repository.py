@@ -0,0 +1,164 @@
+import heapq
+import logging
+from abc import ABC, abstractmethod
+from itertools import islice
+from pathlib import Path
+from typing import Any, ContextManager, Iterable, Iterator
+
+from book_library.query import (
+    EqualPredicate,
+    InPredicate,
+    Predicate,
+    SortOrder,
+)
+from book_library.schemas import BookSchema, BookStatsSchema
+
+
+def not_found_error(
+    predicates: list[Predicate], text: str | None
+) -> ValueError:
+    """Log and make error of empty search result."""
+    except_message = (
+        f"Элементы по условиям: {predicates} и тексту: {text} не найдены."
+    )
+    logging.error(except_message)
+    return ValueError(except_message)
+
+
+def paginate(
+    books: Iterable[BookSchema], offset: int = 0, limit: int | None = None
+) -> Iterator[BookSchema]:
+    """Skip offset books and stop after limit books."""
+    return islice(books, offset, None if limit is None else offset + limit)
+
+
+def order_books(
+    books: Iterable[BookSchema],
+    order: SortOrder | None,
+    offset: int = 0,
+    limit: int | None = None,
+) -> Iterator[BookSchema]:
+    """Get page of books in order.
+
+    Page with limit is selected with heap of offset + limit books,
+    so the first books are found without sort of all books.
+    """
+    if order is None:
+        return paginate(books, offset, limit)
+    if limit is None:
+        ordered = sorted(books, key=order.key, reverse=order.descending)
+    else:
+        select = heapq.nlargest if order.descending else heapq.nsmallest
+        ordered = select(offset + limit, books, key=order.key)
+    return paginate(ordered, offset, limit)
+
+
+class BaseRepositoryBook(ABC):
+    """Interface of CRUD operations for Book objects in some storage."""
+
+    path_json: Path
+
+    @abstractmethod
+    def batch(
+        self,
+        max_changes: int | None = None,
+        max_seconds: float | None = None,
+    ) -> ContextManager["BaseRepositoryBook"]:
+        """Context of many changes written in storage at once."""
+
+    def get_all(self, order: SortOrder | None = None) -> list[BookSchema]:
+        """Get all books."""
+        return list(self.iter_all(order=order))
+
+    @abstractmethod
+    def iter_all(
+        self,
+        offset: int = 0,
+        limit: int | None = None,
+        order: SortOrder | None = None,
+    ) -> Iterator[BookSchema]:
+        """Iterate page of books without copy of all books in list."""
+
+    @abstractmethod
+    def create(self, **kwargs) -> BookSchema:
+        """Create book."""
+
+    @abstractmethod
+    def create_many(
+        self, books_data: Iterable[dict[str, Any]]
+    ) -> list[BookSchema]:
+        """Create books from many records in one transaction."""
+
+    @abstractmethod
+    def update(self, obj_id: int, **kwargs) -> BookSchema:
+        """Update book for id or other fields."""
+
+    @abstractmethod
+    def update_many(self, predicates: list[Predicate], **kwargs) -> int:
+        """Update all books matching predicates, get count of them."""
+
+    @abstractmethod
+    def remove(self, obj_id: int) -> None:
+        """Delete book for id."""
+
+    @abstractmethod
+    def remove_many(self, predicates: list[Predicate]) -> int:
+        """Delete all books matching predicates, get count of them."""
+
+    @abstractmethod
+    def stats(self) -> BookStatsSchema:
+        """Get counts of books by availability, author and year."""
+
+    @abstractmethod
+    def full_text_search(
+        self, query: str, fields: Iterable[str] | None = None
+    ) -> list[BookSchema]:
+        """Get books with all query words in text fields ranked by match."""
+
+    @abstractmethod
+    def iter_search(
+        self,
+        predicates: list[Predicate],
+        text: str | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+        order: SortOrder | None = None,
+    ) -> Iterator[BookSchema]:
+        """Iterate page of books matching predicates and full text query.
+
+        Books found by text are ranked by match unless order is passed.
+        """
+
+    def search(
+        self,
+        predicates: list[Predicate],
+        text: str | None = None,
+        order: SortOrder | None = None,
+    ) -> list[BookSchema]:
+        """Get books matching all predicates and full text query."""
+        filter_data = list(self.iter_search(predicates, text, order=order))
+        if not filter_data:
+            raise not_found_error(predicates, text)
+        return filter_data
+
+    def get(self, obj_id: int) -> BookSchema | list[BookSchema]:
+        """Get book model for id or category."""
+        return self.get_obj_for_field_arg("id", obj_id, False)
+
+    def get_many(self, obj_ids: Iterable[int]) -> list[BookSchema]:
+        """Get books for all ids in one pass, missing ids are skipped."""
+        return list(self.iter_search([InPredicate("id", obj_ids)]))
+
+    def get_obj_for_field_arg(
+        self,
+        field: str,
+        arg: Any,
+        many: bool,
+        order: SortOrder | None = None,
+    ):
+        """Get book for keyword argument."""
+        filter_data = self.search([EqualPredicate(field, arg)], order=order)
+
+        if many:
+            return filter_data
+        return filter_data[0]
@@ -0,0 +1,302 @@
+"""Compact binary snapshot of books stored by columns.
+
+File starts with header: magic bytes, version of format, flags, number
+of sections and number of books. Table of sections follows the header,
+every section is aligned by 8 bytes: ids and years as int64, bits of
+availability and for title and author codes of rows, offsets of
+distinct strings and their utf-8 bytes. Repeated authors and titles
+are stored once. All numbers are little endian.
+
+File is read through memory map, so one book is got by reading only
+its bytes, and the whole catalog is read in column arrays without
+building models of books.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import accumulate
+from operator import lt
+from pathlib import Path
+from typing import IO, Iterable
+
+from book_library.columnar import (
+    BitColumn,
+    ColumnarBookStore,
+    StringColumn,
+    construct_book,
+    int_column,
+)
+from book_library.schemas import BookSchema
+from book_library.stats import BookStats
+
+BINARY_MAGIC = b"BOOKLIB\x00"
+BINARY_VERSION = 1
+# magic, version, flags, number of sections, number of books
+HEADER = struct.Struct("<8sHHIQ")
+# offset from start of file and size of section in bytes
+SECTION = struct.Struct("<QQ")
+SECTIONS = (
+    "ids",
+    "years",
+    "availability",
+    "title_codes",
+    "title_offsets",
+    "titles",
+    "author_codes",
+    "author_offsets",
+    "authors",
+)
+# ids of books go in ascending order, book is found by binary search
+FLAG_SORTED_IDS = 1
+ALIGNMENT = 8
+INT64 = struct.Struct("<q")
+UINT32 = struct.Struct("<I")
+UINT64 = struct.Struct("<Q")
+
+
+def _array_bytes(values: array) -> bytes:
+    """Get little endian bytes of array."""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _string_sections(values: list[str]) -> tuple[bytes, bytes, bytes]:
+    """Get codes of rows, offsets of distinct strings and their bytes."""
+    codes = {value: code for code, value in enumerate(dict.fromkeys(values))}
+    encoded = [value.encode() for value in codes]
+    offsets = array("Q", accumulate(map(len, encoded), initial=0))
+    return (
+        _array_bytes(array("I", map(codes.__getitem__, values))),
+        _array_bytes(offsets),
+        b"".join(encoded),
+    )
+
+
+def write_binary(file: IO[bytes], books: Iterable[BookSchema]) -> None:
+    """Write books in binary snapshot file opened for writing."""
+    books = list(books)
+    ids = array("q", [book.id for book in books])
+    flags = FLAG_SORTED_IDS if all(map(lt, ids, ids[1:])) else 0
+
+    sections = (
+        _array_bytes(ids),
+        _array_bytes(array("q", [book.year for book in books])),
+        BitColumn.from_values([book.availability for book in books]).bits,
+        *_string_sections([book.title for book in books]),
+        *_string_sections([book.author for book in books]),
+    )
+    offset = HEADER.size + SECTION.size * len(sections)
+    table = []
+    for data in sections:
+        offset += -offset % ALIGNMENT
+        table.append(SECTION.pack(offset, len(data)))
+        offset += len(data)
+
+    position = file.write(
+        HEADER.pack(
+            BINARY_MAGIC, BINARY_VERSION, flags, len(sections), len(ids)
+        )
+    )
+    position += file.write(b"".join(table))
+    for data in sections:
+        position += file.write(bytes(-position % ALIGNMENT))
+        position += file.write(data)
+
+
+class _Int64Column:
+    """Sequence of int64 section of memory map for binary search."""
+
+    def __init__(self, data: mmap.mmap | bytes, offset: int, length: int):
+        self.__data = data
+        self.__offset = offset
+        self.__length = length
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def __getitem__(self, row: int) -> int:
+        return INT64.unpack_from(self.__data, self.__offset + row * 8)[0]
+
+
+class BinarySnapshot:
+    """Books of binary snapshot read through memory map of file.
+
+    Header and sizes of sections are checked on open, content of
+    sections is checked when the whole catalog is read. Errors of
+    format are ValueError with description of broken part.
+    """
+
+    def __init__(self, path_file: Path):
+        self.path_file = path_file
+        self.count = 0
+        self.__flags = FLAG_SORTED_IDS
+        self.__sections: dict[str, tuple[int, int]] = {}
+        self.__file = open(path_file, mode="rb")
+        self.__map: mmap.mmap | bytes = b""
+        try:
+            if os.fstat(self.__file.fileno()).st_size:
+                self.__map = mmap.mmap(
+                    self.__file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+                self.__read_header()
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self) -> "BinarySnapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self.__map, mmap.mmap):
+            self.__map.close()
+        self.__file.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __read_header(self) -> None:
+        """Read header and table of sections, check their sizes."""
+        size = len(self.__map)
+        if size < HEADER.size:
+            raise ValueError("Файл короче заголовка.")
+        magic, version, self.__flags, count_sections, self.count = (
+            HEADER.unpack_from(self.__map)
+        )
+        if magic != BINARY_MAGIC:
+            raise ValueError("Файл не является бинарным снимком книг.")
+        if version != BINARY_VERSION:
+            raise ValueError(f"Версия формата {version} не поддерживается.")
+        if count_sections != len(SECTIONS):
+            raise ValueError(f"Неверное число секций {count_sections}.")
+        if HEADER.size + SECTION.size * count_sections > size:
+            raise ValueError("Файл короче таблицы секций.")
+
+        count = self.count
+        expected_sizes = {
+            "ids": count * INT64.size,
+            "years": count * INT64.size,
+            "availability": (count + 7) // 8,
+            "title_codes": count * UINT32.size,
+            "author_codes": count * UINT32.size,
+        }
+        for number, name in enumerate(SECTIONS):
+            offset, length = SECTION.unpack_from(
+                self.__map, HEADER.size + SECTION.size * number
+            )
+            if offset + length > size:
+                raise ValueError(f"Секция {name} выходит за конец файла.")
+            if expected_sizes.get(name, length) != length:
+                raise ValueError(f"Неверный размер секции {name}.")
+            if name.endswith("_offsets") and (
+                length < UINT64.size or length % UINT64.size
+            ):
+                raise ValueError(f"Неверный размер секции {name}.")
+            self.__sections[name] = offset, length
+
+    def __item(self, name: str, packer: struct.Struct, row: int) -> int:
+        return packer.unpack_from(
+            self.__map, self.__sections[name][0] + row * packer.size
+        )[0]
+
+    def __string(self, field: str, row: int) -> str:
+        """Decode string of field of row, reading only its bytes."""
+        code = self.__item(f"{field}_codes", UINT32, row)
+        start = self.__item(f"{field}_offsets", UINT64, code)
+        end = self.__item(f"{field}_offsets", UINT64, code + 1)
+        offset = self.__sections[f"{field}s"][0]
+        return self.__map[offset + start : offset + end].decode()
+
+    def __find_row(self, obj_id: int) -> int | None:
+        if self.__flags & FLAG_SORTED_IDS:
+            ids = _Int64Column(
+                self.__map, self.__sections["ids"][0], self.count
+            )
+            row = bisect_left(ids, obj_id)
+            if row < self.count and ids[row] == obj_id:
+                return row
+            return None
+        for row in range(self.count):
+            if self.__item("ids", INT64, row) == obj_id:
+                return row
+        return None
+
+    def get(self, obj_id: int) -> BookSchema | None:
+        """Get book by id reading only bytes of its row."""
+        row = self.__find_row(obj_id) if self.count else None
+        if row is None:
+            return None
+        offset = self.__sections["availability"][0]
+        return construct_book(
+            obj_id,
+            self.__string("title", row),
+            self.__string("author", row),
+            self.__item("years", INT64, row),
+            bool(self.__map[offset + (row >> 3)] >> (row & 7) & 1),
+        )
+
+    def __array(self, name: str, typecode: str) -> array:
+        offset, length = self.__sections[name]
+        values = array(typecode)
+        values.frombytes(self.__map[offset : offset + length])
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+
+    def __string_column(self, field: str) -> StringColumn:
+        """Read codes and distinct strings of field, check them."""
+        codes = self.__array(f"{field}_codes", "I")
+        offsets = self.__array(f"{field}_offsets", "Q")
+        offset, length = self.__sections[f"{field}s"]
+        data = self.__map[offset : offset + length]
+        if offsets[0] != 0 or offsets[-1] != length:
+            raise ValueError(f"Неверные смещения строк {field}.")
+        if codes and max(codes) >= len(offsets) - 1:
+            raise ValueError(f"Неверные коды строк {field}.")
+        try:
+            values = [
+                data[start:end].decode()
+                for start, end in zip(offsets, offsets[1:])
+            ]
+        except UnicodeDecodeError:
+            raise ValueError(f"Неверные строки {field}.")
+        return StringColumn.from_values(values, codes)
+
+    def read(self) -> tuple[ColumnarBookStore, BookStats]:
+        """Read all books in column arrays and count them."""
+        if not self.count:
+            return ColumnarBookStore(), BookStats()
+        ids = self.__array("ids", "q")
+        years = self.__array("years", "q")
+        availability = BitColumn()
+        offset, length = self.__sections["availability"]
+        availability.bits = bytearray(self.__map[offset : offset + length])
+        availability.length = self.count
+        titles = self.__string_column("title")
+        authors = self.__string_column("author")
+        store = ColumnarBookStore.from_columns(
+            int_column(ids), int_column(years), availability, titles, authors
+        )
+        if len(store) != self.count:
+            raise ValueError("Айди книг повторяются.")
+
+        stats = BookStats()
+        stats.total = self.count
+        stats.available = int.from_bytes(
+            availability.bits, "little"
+        ).bit_count()
+        stats.authors = {
+            authors.values[code]: count
+            for code, count in Counter(authors.codes).items()
+        }
+        stats.years = dict(Counter(years))
+        return store, stats
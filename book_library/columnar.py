@@ -0,0 +1,270 @@
+from array import array
+from collections.abc import MutableMapping
+from typing import Iterator
+
+from book_library.schemas import BookSchema
+
+BOOK_FIELDS_SET = set(BookSchema.model_fields)
+
+
+def construct_book(
+    obj_id: int, title: str, author: str, year: int, availability: bool
+) -> BookSchema:
+    """Build book from trusted values faster than model_construct.
+
+    Values are set in the same attributes model_construct sets,
+    but without its generic handling of defaults and aliases.
+    """
+    book = object.__new__(BookSchema)
+    object.__setattr__(
+        book,
+        "__dict__",
+        {
+            "id": obj_id,
+            "title": title,
+            "author": author,
+            "year": year,
+            "availability": availability,
+        },
+    )
+    object.__setattr__(book, "__pydantic_fields_set__", BOOK_FIELDS_SET)
+    object.__setattr__(book, "__pydantic_extra__", None)
+    object.__setattr__(book, "__pydantic_private__", None)
+    return book
+
+
+# int32 and int64 arrays, list keeps ints of any size
+IntColumn = array | list[int]
+
+
+def int_column(values: list[int] | array) -> IntColumn:
+    """Get int32 array of values, int64 array or list if they do not fit."""
+    for typecode in ("i", "q"):
+        try:
+            return array(typecode, values)
+        except OverflowError:
+            continue
+    return list(values)
+
+
+def _widen(column: IntColumn) -> IntColumn:
+    """Get copy of int column of wider type."""
+    if isinstance(column, array) and column.typecode == "i":
+        return array("q", column)
+    return list(column)
+
+
+def append_int(column: IntColumn, value: int) -> IntColumn:
+    """Append value to int column, column is widened if value does not
+    fit, so returned column must replace the old one."""
+    while True:
+        try:
+            column.append(value)
+            return column
+        except OverflowError:
+            column = _widen(column)
+
+
+def set_int(column: IntColumn, row: int, value: int) -> IntColumn:
+    """Set value in row of int column, widen it like append_int."""
+    while True:
+        try:
+            column[row] = value
+            return column
+        except OverflowError:
+            column = _widen(column)
+
+
+class StringColumn:
+    """Column of strings stored as codes of interned values."""
+
+    def __init__(self):
+        self.codes = array("I")
+        self.__values: list[str] = []
+        self.__value_codes: dict[str, int] = {}
+
+    @classmethod
+    def from_values(cls, values: list[str], codes: array) -> "StringColumn":
+        """Build column from distinct values and codes of rows."""
+        column = cls()
+        column.codes = codes
+        column.__values = values
+        column.__value_codes = {
+            value: code for code, value in enumerate(values)
+        }
+        return column
+
+    @classmethod
+    def from_strings(cls, strings: list[str]) -> "StringColumn":
+        """Build column from strings of all rows."""
+        values = list(dict.fromkeys(strings))
+        codes = {value: code for code, value in enumerate(values)}
+        return cls.from_values(
+            values, array("I", map(codes.__getitem__, strings))
+        )
+
+    @property
+    def values(self) -> list[str]:
+        """Distinct values in order of their codes."""
+        return self.__values
+
+    def __code(self, value: str) -> int:
+        code = self.__value_codes.get(value)
+        if code is None:
+            code = self.__value_codes[value] = len(self.__values)
+            self.__values.append(value)
+        return code
+
+    def append(self, value: str) -> None:
+        self.codes.append(self.__code(value))
+
+    def extend(self, values: list[str], codes: array) -> None:
+        """Append rows of other column given by its values and codes."""
+        own_codes = list(map(self.__code, values))
+        self.codes.extend(map(own_codes.__getitem__, codes))
+
+    def __getitem__(self, row: int) -> str:
+        return self.__values[self.codes[row]]
+
+    def __setitem__(self, row: int, value: str) -> None:
+        self.codes[row] = self.__code(value)
+
+
+class BitColumn:
+    """Column of booleans packed in bits."""
+
+    def __init__(self):
+        self.bits = bytearray()
+        self.length = 0
+
+    @classmethod
+    def from_values(cls, values: list[bool]) -> "BitColumn":
+        """Build column from booleans of all rows at once."""
+        column = cls()
+        digits = "".join("1" if value else "0" for value in reversed(values))
+        column.bits = bytearray(
+            int(digits or "0", 2).to_bytes((len(values) + 7) // 8, "little")
+        )
+        column.length = len(values)
+        return column
+
+    def append(self, value: bool) -> None:
+        if self.length % 8 == 0:
+            self.bits.append(0)
+        self.length += 1
+        self[self.length - 1] = value
+
+    def __getitem__(self, row: int) -> bool:
+        return bool(self.bits[row >> 3] >> (row & 7) & 1)
+
+    def __setitem__(self, row: int, value: bool) -> None:
+        if value:
+            self.bits[row >> 3] |= 1 << (row & 7)
+        else:
+            self.bits[row >> 3] &= ~(1 << (row & 7)) & 0xFF
+
+
+class ColumnarBookStore(MutableMapping[int, BookSchema]):
+    """Compact storage of books in column arrays keyed by book id.
+
+    Rows keep order of insertion, removed row stays in columns without
+    its id in map of rows and is dropped when removed rows take half
+    of the rows. Book models are built
+    on demand without validation, because every stored row was valid.
+    Store is pickled as its arrays, so it is used as snapshot cache.
+    """
+
+    def __init__(self):
+        self.__rows: dict[int, int] = {}
+        self.__init_columns()
+
+    @classmethod
+    def from_columns(
+        cls,
+        ids: IntColumn,
+        years: IntColumn,
+        availability: BitColumn,
+        titles: StringColumn,
+        authors: StringColumn,
+    ) -> "ColumnarBookStore":
+        """Build store from filled columns of rows with unique ids."""
+        store = cls()
+        store.__ids = ids
+        store.__years = years
+        store.__availability = availability
+        store.__titles = titles
+        store.__authors = authors
+        store.__rows = {obj_id: row for row, obj_id in enumerate(ids)}
+        return store
+
+    def __init_columns(self) -> None:
+        self.__ids = array("i")
+        self.__years = array("i")
+        self.__availability = BitColumn()
+        self.__titles = StringColumn()
+        self.__authors = StringColumn()
+
+    def __len__(self) -> int:
+        return len(self.__rows)
+
+    def __contains__(self, obj_id: object) -> bool:
+        return obj_id in self.__rows
+
+    def __live_rows(self) -> Iterator[tuple[int, int]]:
+        """Iterate rows and ids of books which are not removed."""
+        if len(self.__rows) == len(self.__ids):
+            yield from enumerate(self.__ids)
+            return
+        rows = self.__rows
+        for row, obj_id in enumerate(self.__ids):
+            if rows.get(obj_id) == row:
+                yield row, obj_id
+
+    def __iter__(self) -> Iterator[int]:
+        for _, obj_id in self.__live_rows():
+            yield obj_id
+
+    def __book(self, row: int) -> BookSchema:
+        return construct_book(
+            self.__ids[row],
+            self.__titles[row],
+            self.__authors[row],
+            self.__years[row],
+            self.__availability[row],
+        )
+
+    def __getitem__(self, obj_id: int) -> BookSchema:
+        return self.__book(self.__rows[obj_id])
+
+    def __setitem__(self, obj_id: int, book: BookSchema) -> None:
+        row = self.__rows.get(obj_id)
+        if row is None:
+            # row is registered after all its columns are written
+            self.__ids = append_int(self.__ids, obj_id)
+            self.__years = append_int(self.__years, book.year)
+            self.__availability.append(book.availability)
+            self.__titles.append(book.title)
+            self.__authors.append(book.author)
+            self.__rows[obj_id] = len(self.__ids) - 1
+            return
+        self.__years = set_int(self.__years, row, book.year)
+        self.__availability[row] = book.availability
+        self.__titles[row] = book.title
+        self.__authors[row] = book.author
+
+    def __delitem__(self, obj_id: int) -> None:
+        del self.__rows[obj_id]
+        if len(self.__rows) * 2 < len(self.__ids):
+            self.__vacuum()
+
+    def __vacuum(self) -> None:
+        """Drop removed rows and unused strings."""
+        books = [self.__book(row) for row in self.__rows.values()]
+        self.__rows = {}
+        self.__init_columns()
+        for book in books:
+            self[book.id] = book
+
+    def values(self) -> Iterator[BookSchema]:
+        for row, _ in self.__live_rows():
+            yield self.__book(row)
@@ -0,0 +1,397 @@
+import logging
+from argparse import Namespace
+from pathlib import Path
+from typing import Callable
+
+from book_library.base_repository import (
+    BaseRepositoryBook,
+    not_found_error,
+    paginate,
+)
+from book_library.constants import (
+    ARG_CONVERT,
+    ARG_DELETE,
+    ARG_EXPORT,
+    ARG_GET,
+    ARG_GET_ALL,
+    ARG_IMPORT,
+    ARG_PATCH,
+    ARG_POST,
+    ARG_SEARCH,
+    ARG_STATS,
+    ORDER_DESC,
+    SNAPSHOT_SUFFIXES,
+)
+from book_library.outputs import (
+    pretty_books_output,
+    stats_output,
+    stream_books_output,
+)
+from book_library.query import (
+    EqualPredicate,
+    IdRanges,
+    InPredicate,
+    Predicate,
+    RangePredicate,
+    SortOrder,
+)
+from book_library.schemas import BookSchema
+from book_library.storage import iter_snapshot_books, read_snapshot_book
+from book_library.transfer import read_books, write_books
+from book_library.utils import except_control
+
+
+def namespace_ids(namespace: Namespace) -> IdRanges | None:
+    """Get ids and ranges of --id argument, client of server may pass
+    one id."""
+    if namespace.id is None:
+        return None
+    if isinstance(namespace.id, list):
+        return IdRanges(namespace.id)
+    return IdRanges([namespace.id])
+
+
+@except_control(
+    value_exc_msg="Элементы не найдены.",
+    validate_err_msg="Ошибка валидации в переданных полях.",
+)
+def get(repository: BaseRepositoryBook, namespace: Namespace) -> None:
+    """Get books for ids."""
+    obj_ids = namespace_ids(namespace)
+
+    if obj_ids is None:
+        warning_message = "Чтобы получить элементы, вы должны передать id"
+        logging.warning(warning_message)
+        print(warning_message)
+        return
+
+    if len(obj_ids) > 1:
+        books = repository.get_many(obj_ids)
+        if not books:
+            raise not_found_error([InPredicate("id", obj_ids)], None)
+        stream_books_output(books, namespace.format)
+        return
+    books = repository.get(obj_id=obj_ids.first())
+    if isinstance(books, list):
+        pretty_books_output(books)
+    else:
+        pretty_books_output([books])
+
+
+@except_control(
+    value_exc_msg="Элементы не найдены.",
+    validate_err_msg="Ошибка валидации в переданных полях.",
+)
+def get_from_snapshot(path_file: Path, namespace: Namespace) -> None:
+    """Get one book of binary snapshot without load of catalog."""
+    obj_id = namespace_ids(namespace).first()
+    book = read_snapshot_book(path_file, obj_id)
+    if book is None:
+        raise not_found_error([EqualPredicate("id", obj_id)], None)
+    pretty_books_output([book])
+
+
+def check_page(namespace: Namespace) -> bool:
+    """Check arguments of page of books list."""
+    if namespace.offset < 0 or (
+        namespace.limit is not None and namespace.limit < 0
+    ):
+        warning_message = "Лимит и смещение не могут быть отрицательными."
+        logging.warning(warning_message)
+        print(warning_message)
+        return False
+    return True
+
+
+def sort_order(namespace: Namespace) -> SortOrder | None:
+    """Get order of books list from arguments."""
+    if namespace.sort_by is None:
+        return None
+    return SortOrder(namespace.sort_by, namespace.order == ORDER_DESC)
+
+
+@except_control(
+    value_exc_msg="Элементы не найдены.",
+    validate_err_msg="Ошибка валидации в переданных полях.",
+)
+def get_all(repository: BaseRepositoryBook, namespace: Namespace):
+    """Get page of all books."""
+    if not check_page(namespace):
+        return
+    books = repository.iter_all(
+        namespace.offset, namespace.limit, sort_order(namespace)
+    )
+    stream_books_output(books, namespace.format)
+
+
+@except_control(
+    value_exc_msg="Элементы не найдены.",
+    validate_err_msg="Ошибка валидации в переданных полях.",
+)
+def get_all_from_snapshot(path_file: Path, namespace: Namespace) -> None:
+    """Print page of books of json snapshot as snapshot is read."""
+    if not check_page(namespace):
+        return
+    books = paginate(
+        iter_snapshot_books(path_file), namespace.offset, namespace.limit
+    )
+    stream_books_output(books, namespace.format)
+
+
+@except_control(
+    value_exc_msg="Элементы не найдены.",
+    validate_err_msg="Ошибка валидации в переданных полях.",
+)
+def post(repository: BaseRepositoryBook, namespace: Namespace) -> None:
+    """Create book."""
+    fields = dict(
+        title=namespace.title,
+        author=namespace.author,
+        year=namespace.year,
+        availability=namespace.availability,
+    )
+    for field_name in fields:
+        if fields[field_name] is None:
+            warning_message = (
+                f"У обязательного поля {field_name} нет значения.",
+                "Для создания объекта необходимо дать значение",
+                "всех обязательных полей.",
+            )
+            logging.warning(warning_message)
+            print(warning_message)
+            return
+
+    new_task = repository.create(**fields)
+    pretty_books_output([new_task])
+
+
+def filter_predicates(namespace: Namespace) -> list[Predicate] | None:
+    """Get conditions of -f/-v pairs and range of years.
+
+    None means that arguments of conditions are invalid.
+    """
+    fields = namespace.field or []
+    values = namespace.value or []
+
+    if len(fields) != len(values):
+        warning_message = (
+            "Каждому полю для поиска должно соответствовать одно значение."
+        )
+        logging.warning(warning_message)
+        print(warning_message)
+        return None
+    unknown_fields = set(fields) - set(BookSchema.model_fields)
+    if unknown_fields:
+        warning_message = f"Неизвестные поля для поиска {unknown_fields}."
+        logging.warning(warning_message)
+        print(warning_message)
+        return None
+
+    predicates: list[Predicate] = [
+        EqualPredicate(field, value) for field, value in zip(fields, values)
+    ]
+    if namespace.year_from is not None or namespace.year_to is not None:
+        predicates.append(
+            RangePredicate("year", namespace.year_from, namespace.year_to)
+        )
+    return predicates
+
+
+@except_control(
+    value_exc_msg="Элементы не найдены.",
+    validate_err_msg="Ошибка валидации в переданных полях.",
+)
+def patch(repository: BaseRepositoryBook, namespace: Namespace) -> None:
+    """Update books for ids or all books matching -f/-v conditions."""
+    obj_ids = namespace_ids(namespace)
+    fields = dict(
+        title=namespace.title,
+        author=namespace.author,
+        year=namespace.year,
+        availability=namespace.availability,
+    )
+    predicates = filter_predicates(namespace)
+    if predicates is None:
+        return
+    if obj_ids is None and not predicates:
+        warning_message = (
+            "Для изменения объекта вы должны передать айди"
+            " или поля и значения для поиска."
+        )
+        logging.warning(warning_message)
+        print(warning_message)
+        return
+    fields = {
+        name: value for name, value in fields.items() if value is not None
+    }
+    if not fields:
+        warning_message = (
+            "Для изменения объекта хотя бы одно поле с "
+            "аргументом для изменения."
+        )
+        logging.warning(warning_message)
+        print(warning_message)
+        return
+
+    if obj_ids is None or len(obj_ids) > 1 or predicates:
+        if obj_ids is not None:
+            predicates.append(InPredicate("id", obj_ids))
+        count_books = repository.update_many(predicates, **fields)
+        print(f"Изменено {count_books} книг.")
+        return
+    update_task = repository.update(obj_id=obj_ids.first(), **fields)
+    pretty_books_output([update_task])
+
+
+@except_control(
+    value_exc_msg="Элементы не найдены.",
+    validate_err_msg="Ошибка валидации в переданных полях.",
+)
+def delete(repository: BaseRepositoryBook, namespace: Namespace) -> None:
+    """Delete books for ids or all books matching -f/-v conditions."""
+    obj_ids = namespace_ids(namespace)
+    predicates = filter_predicates(namespace)
+    if predicates is None:
+        return
+
+    if obj_ids is None and not predicates:
+        warning_message = (
+            "Чтобы Удалить элементы, вы должны передать"
+            " либо id либо поля и значения для поиска."
+        )
+        logging.warning(warning_message)
+        print(warning_message)
+        return
+
+    if obj_ids is None or len(obj_ids) > 1 or predicates:
+        if obj_ids is not None:
+            predicates.append(InPredicate("id", obj_ids))
+        count_books = repository.remove_many(predicates)
+        print(f"Удалено {count_books} книг.")
+        return
+    repository.remove(obj_id=obj_ids.first())
+    print("Элементы успешно удалены.")
+
+
+@except_control(
+    value_exc_msg="Элементы не найдены.",
+    validate_err_msg="Ошибка валидации в переданных полях.",
+)
+def search(repository: BaseRepositoryBook, namespace: Namespace) -> None:
+    """Search books for all passed fields and values."""
+    predicates = filter_predicates(namespace)
+    if predicates is None:
+        return
+    for field in ("title", "author", "year", "availability"):
+        value = getattr(namespace, field)
+        if value is not None:
+            predicates.append(EqualPredicate(field, value))
+
+    if not predicates and namespace.text is None:
+        warning_message = (
+            "Вы должны передать в аргументы поле и значение для поиска."
+        )
+        logging.warning(warning_message)
+        print(warning_message)
+        return
+
+    if not check_page(namespace):
+        return
+    books = repository.iter_search(
+        predicates,
+        namespace.text,
+        namespace.offset,
+        namespace.limit,
+        sort_order(namespace),
+    )
+    if not stream_books_output(books, namespace.format, empty_table=False):
+        raise not_found_error(predicates, namespace.text)
+
+
+@except_control(
+    value_exc_msg="Ошибка импорта книг, подробности в логах.",
+    validate_err_msg="Ошибка валидации в переданных полях.",
+)
+def import_books(repository: BaseRepositoryBook, namespace: Namespace) -> None:
+    """Create books from csv or json lines file in one transaction."""
+    path_file = namespace.file and Path(namespace.file)
+    if path_file is None or not path_file.is_file():
+        warning_message = "Для импорта вы должны передать путь к файлу."
+        logging.warning(warning_message)
+        print(warning_message)
+        return
+
+    new_books = repository.create_many(read_books(path_file))
+    print(f"Импортировано {len(new_books)} книг.")
+
+
+@except_control(
+    value_exc_msg="Ошибка экспорта книг, подробности в логах.",
+    validate_err_msg="Ошибка валидации в переданных полях.",
+)
+def export_books(repository: BaseRepositoryBook, namespace: Namespace) -> None:
+    """Write all books in csv or json lines file."""
+    path_file = namespace.file and Path(namespace.file)
+    if path_file is None:
+        warning_message = "Для экспорта вы должны передать путь к файлу."
+        logging.warning(warning_message)
+        print(warning_message)
+        return
+
+    count_books = write_books(repository.iter_all(), path_file)
+    logging.info(f"Экспортировано {count_books} книг в {path_file}.")
+    print(f"Экспортировано {count_books} книг.")
+
+
+@except_control(
+    value_exc_msg="Элементы не найдены.",
+    validate_err_msg="Ошибка валидации в переданных полях.",
+)
+def stats(repository: BaseRepositoryBook, namespace: Namespace) -> None:
+    """Print counts of books by availability, author and year."""
+    if not check_page(namespace):
+        return
+    stats_output(repository.stats(), namespace.limit)
+
+
+@except_control(
+    value_exc_msg="Ошибка записи снимка, подробности в логах.",
+    validate_err_msg="Ошибка валидации в переданных полях.",
+)
+def convert(repository: BaseRepositoryBook, namespace: Namespace) -> None:
+    """Write all books with their ids in snapshot file of other format."""
+    from book_library.snapshot import write_snapshot
+
+    path_file = namespace.file and Path(namespace.file)
+    if path_file is None or path_file.suffix not in SNAPSHOT_SUFFIXES:
+        warning_message = (
+            "Для записи снимка вы должны передать путь к файлу"
+            f" {', '.join(SNAPSHOT_SUFFIXES)}."
+        )
+        logging.warning(warning_message)
+        print(warning_message)
+        return
+    if path_file.resolve() == repository.path_json.resolve():
+        warning_message = "Снимок нельзя записать в файл хранилища."
+        logging.warning(warning_message)
+        print(warning_message)
+        return
+
+    write_snapshot(path_file, repository.iter_all())
+    count_books = repository.stats().total
+    logging.info(f"Записан снимок {path_file} из {count_books} книг.")
+    print(f"Записано {count_books} книг в {path_file.name}.")
+
+
+CRUD: dict[str, Callable[[BaseRepositoryBook, Namespace], None]] = {
+    ARG_GET_ALL: get_all,
+    ARG_GET: get,
+    ARG_POST: post,
+    ARG_PATCH: patch,
+    ARG_DELETE: delete,
+    ARG_SEARCH: search,
+    ARG_IMPORT: import_books,
+    ARG_EXPORT: export_books,
+    ARG_STATS: stats,
+    ARG_CONVERT: convert,
+}
@@ -1,190 +1,108 @@
 import logging
-from argparse import ArgumentParser, Namespace, RawTextHelpFormatter
+from argparse import (
+    ArgumentParser,
+    ArgumentTypeError,
+    Namespace,
+    RawTextHelpFormatter,
+)
+from pathlib import Path
 
 from book_library.constants import (
-    ARG_DELETE,
     ARG_GET,
     ARG_GET_ALL,
-    ARG_PATCH,
-    ARG_POST,
-    ARG_SEARCH,
+    ARG_HTTP,
+    ARG_SERVE,
     AUTHOR_FIELD_HELP_TEXT,
     AVAILABILITY_FIELD_HELP_TEXT,
+    BINARY_SNAPSHOT_SUFFIX,
+    CLIENT_HELP_TEXT,
+    COLUMNAR_STORAGE,
     CRUD_ARGUMENTS_HELD_TEXT,
+    CRUD_COMMANDS,
     DESCRIPTION_CONSOLE_PROGRAM,
-    ID_FIELD_HELP_TEXT,
+    FILE_HELP_TEXT,
+    FORMAT_HELP_TEXT,
+    HTTP_HOST,
+    HTTP_PORT,
+    ID_LIST_HELP_TEXT,
+    JOURNAL_MODE,
     JSON_FILE,
+    LIMIT_HELP_TEXT,
     LONG_ARG_AUTHOR,
     LONG_ARG_AVAILABILITY,
+    LONG_ARG_CLIENT,
+    LONG_ARG_FILE,
+    LONG_ARG_FORMAT,
     LONG_ARG_ID,
+    LONG_ARG_LIMIT,
     LONG_ARG_NAME_FIELD,
+    LONG_ARG_OFFSET,
+    LONG_ARG_ORDER,
+    LONG_ARG_PROFILE,
+    LONG_ARG_PROFILE_FILE,
+    LONG_ARG_SORT_BY,
+    LONG_ARG_TEXT,
     LONG_ARG_TITLE,
     LONG_ARG_VALUE,
     LONG_ARG_YEAR,
+    LONG_ARG_YEAR_FROM,
+    LONG_ARG_YEAR_TO,
     NAME_FIELD_HELP_TEXT,
+    OFFSET_HELP_TEXT,
+    ORDER_ASC,
+    ORDER_DESC,
+    ORDER_HELP_TEXT,
+    OUTPUT_FORMAT_TABLE,
+    OUTPUT_FORMATS,
+    PROFILE_FILE_HELP_TEXT,
+    PROFILE_HELP_TEXT,
     SHORT_ARG_NAME_FIELD,
     SHORT_ARG_VALUE,
+    SOCKET_FILE,
+    SORT_BY_HELP_TEXT,
+    SORT_FIELDS,
+    TEXT_HELP_TEXT,
     TITLE_FIELD_HELP_TEXT,
     VALUE_HELP_TEXT,
     YEAR_FIELD_HELP_TEXT,
+    YEAR_FROM_HELP_TEXT,
+    YEAR_TO_HELP_TEXT,
 )
-from book_library.outputs import pretty_books_output
-from book_library.repository import RepositoryBook
-from book_library.utils import except_control
-
-
-@except_control(
-    value_exc_msg="Элементы не найдены.",
-    validate_err_msg="Ошибка валидации в переданных полях.",
-)
-def get(repository: RepositoryBook, namespace: Namespace) -> None:
-    """Get book for id."""
-    obj_id = namespace.id
-
-    if obj_id is None:
-        warning_message = "Чтобы получить элементы, вы должны передать id"
-        logging.warning(warning_message)
-        print(warning_message)
-        return
-
-    books = repository.get(obj_id=obj_id)
-    if isinstance(books, list):
-        pretty_books_output(books)
-    else:
-        pretty_books_output([books])
-
-
-@except_control(
-    value_exc_msg="Элементы не найдены.",
-    validate_err_msg="Ошибка валидации в переданных полях.",
-)
-def get_all(repository: RepositoryBook, namespace: Namespace):
-    """Get all books."""
-    books = repository.get_all()
-    pretty_books_output(books)
-
-
-@except_control(
-    value_exc_msg="Элементы не найдены.",
-    validate_err_msg="Ошибка валидации в переданных полях.",
-)
-def post(repository: RepositoryBook, namespace: Namespace) -> None:
-    """Create book."""
-    fields = dict(
-        title=namespace.title,
-        author=namespace.author,
-        year=namespace.year,
-        availability=namespace.availability,
-    )
-    for field_name in fields:
-        if fields[field_name] is None:
-            warning_message = (
-                f"У обязательного поля {field_name} нет значения.",
-                "Для создания объекта необходимо дать значение",
-                "всех обязательных полей.",
-            )
-            logging.warning(warning_message)
-            print(warning_message)
-            return
-
-    new_task = repository.create(**fields)
-    pretty_books_output([new_task])
-
-
-@except_control(
-    value_exc_msg="Элементы не найдены.",
-    validate_err_msg="Ошибка валидации в переданных полях.",
-)
-def patch(repository: RepositoryBook, namespace: Namespace) -> None:
-    """Update book for id."""
-    obj_id = namespace.id
-    fields = dict(
-        title=namespace.title,
-        author=namespace.author,
-        year=namespace.year,
-        availability=namespace.availability,
-    )
-    if obj_id is None:
-        warning_message = "Для изменения объекта вы должны передать айди."
-        logging.warning(warning_message)
-        print(warning_message)
-        return
-    if not any(fields.values()):
-        warning_message = (
-            "Для изменения объекта хотя бы одно поле с "
-            "аргументом для изменения."
+from book_library.metrics import profile
+
+
+def ids_type(text: str) -> list[int | tuple[int, int]]:
+    """Parse ids and ranges of ids like 1,5,10-200, range is kept as
+    pair of its first and last ids, so it passes to server in json."""
+    obj_ids: list[int | tuple[int, int]] = []
+    try:
+        for part in text.split(","):
+            first, separator, last = part.strip().partition("-")
+            if not separator:
+                obj_ids.append(int(first))
+                continue
+            if int(first) > int(last):
+                raise ValueError(part)
+            obj_ids.append((int(first), int(last)))
+    except ValueError:
+        raise ArgumentTypeError(
+            f"Айди {text} должны быть числами или диапазонами чисел."
         )
-        logging.warning(warning_message)
-        print(warning_message)
-        return
-    fields = {name: value for name, value in fields if value is not None}
-
-    update_task = repository.update(obj_id=obj_id, **fields)
-    pretty_books_output([update_task])
-
-
-@except_control(
-    value_exc_msg="Элементы не найдены.",
-    validate_err_msg="Ошибка валидации в переданных полях.",
-)
-def delete(repository: RepositoryBook, namespace: Namespace) -> None:
-    """Delete book for id."""
-    obj_id = namespace.id
-
-    if obj_id is None:
-        warning_message = (
-            "Чтобы Удалить элементы, вы должны передать"
-            " либо id либо имя категории."
-        )
-        logging.warning(warning_message)
-        print(warning_message)
-        return
-
-    repository.remove(obj_id=obj_id)
-    print("Элементы успешно удалены.")
-
-
-@except_control(
-    value_exc_msg="Элементы не найдены.",
-    validate_err_msg="Ошибка валидации в переданных полях.",
-)
-def search(repository: RepositoryBook, namespace: Namespace) -> None:
-    """Search books for field and value."""
-    field = namespace.field
-    value = namespace.value
-
-    if field is None or value is None:
-        warning_message = (
-            "Вы должны передать в аргументы поле и значение для поиска."
-        )
-        logging.warning(warning_message)
-        print(warning_message)
-        return
-
-    books = repository.get_obj_for_field_arg(field=field, arg=value, many=True)
-    pretty_books_output(books)
-
-
-CRUD = {
-    ARG_GET_ALL: get_all,
-    ARG_GET: get,
-    ARG_POST: post,
-    ARG_PATCH: patch,
-    ARG_DELETE: delete,
-    ARG_SEARCH: search,
-}
+    return obj_ids
 
 
 def parser():
-    repository = RepositoryBook(JSON_FILE)
-
     parser = ArgumentParser(
         description=DESCRIPTION_CONSOLE_PROGRAM,
         formatter_class=RawTextHelpFormatter,
     )
-    parser.add_argument("crud", choices=CRUD, help=CRUD_ARGUMENTS_HELD_TEXT)
+    parser.add_argument(
+        "crud",
+        choices=[*CRUD_COMMANDS, ARG_SERVE, ARG_HTTP],
+        help=CRUD_ARGUMENTS_HELD_TEXT,
+    )
 
-    parser.add_argument(LONG_ARG_ID, type=int, help=ID_FIELD_HELP_TEXT)
+    parser.add_argument(LONG_ARG_ID, type=ids_type, help=ID_LIST_HELP_TEXT)
     parser.add_argument(LONG_ARG_TITLE, type=str, help=TITLE_FIELD_HELP_TEXT)
     parser.add_argument(LONG_ARG_AUTHOR, type=str, help=AUTHOR_FIELD_HELP_TEXT)
     parser.add_argument(LONG_ARG_YEAR, type=int, help=YEAR_FIELD_HELP_TEXT)
@@ -197,10 +115,47 @@ def parser():
         SHORT_ARG_NAME_FIELD,
         LONG_ARG_NAME_FIELD,
         type=str,
+        action="append",
         help=NAME_FIELD_HELP_TEXT,
     )
     parser.add_argument(
-        SHORT_ARG_VALUE, LONG_ARG_VALUE, type=str, help=VALUE_HELP_TEXT
+        SHORT_ARG_VALUE,
+        LONG_ARG_VALUE,
+        type=str,
+        action="append",
+        help=VALUE_HELP_TEXT,
+    )
+    parser.add_argument(LONG_ARG_YEAR_FROM, type=int, help=YEAR_FROM_HELP_TEXT)
+    parser.add_argument(LONG_ARG_YEAR_TO, type=int, help=YEAR_TO_HELP_TEXT)
+    parser.add_argument(LONG_ARG_TEXT, type=str, help=TEXT_HELP_TEXT)
+    parser.add_argument(LONG_ARG_FILE, type=Path, help=FILE_HELP_TEXT)
+    parser.add_argument(LONG_ARG_LIMIT, type=int, help=LIMIT_HELP_TEXT)
+    parser.add_argument(
+        LONG_ARG_OFFSET, type=int, default=0, help=OFFSET_HELP_TEXT
+    )
+    parser.add_argument(
+        LONG_ARG_SORT_BY, choices=SORT_FIELDS, help=SORT_BY_HELP_TEXT
+    )
+    parser.add_argument(
+        LONG_ARG_ORDER,
+        choices=(ORDER_ASC, ORDER_DESC),
+        default=ORDER_ASC,
+        help=ORDER_HELP_TEXT,
+    )
+    parser.add_argument(
+        LONG_ARG_FORMAT,
+        choices=OUTPUT_FORMATS,
+        default=OUTPUT_FORMAT_TABLE,
+        help=FORMAT_HELP_TEXT,
+    )
+    parser.add_argument(
+        LONG_ARG_CLIENT, action="store_true", help=CLIENT_HELP_TEXT
+    )
+    parser.add_argument(
+        LONG_ARG_PROFILE, action="store_true", help=PROFILE_HELP_TEXT
+    )
+    parser.add_argument(
+        LONG_ARG_PROFILE_FILE, type=Path, help=PROFILE_FILE_HELP_TEXT
     )
 
     args: Namespace = parser.parse_args()
@@ -208,4 +163,71 @@ def parser():
 
     logging.info(f"Программа запущена в режиме {parser_crud}")
     logging.info(f"Переданные аргументы {args}")
+    if args.file is not None:
+        args.file = args.file.resolve()
+    with profile(args.profile and not args.client, args.profile_file):
+        run(args)
+
+
+def run(args: Namespace) -> None:
+    """Run parsed command in this process or send it to server."""
+    parser_crud = args.crud
+    # modules of commands are imported after parsing of arguments,
+    # so help and argument errors do not load pydantic and storage
+    if args.client and parser_crud in CRUD_COMMANDS:
+        from book_library.server import send_request
+
+        try:
+            output = send_request(SOCKET_FILE, parser_crud, vars(args))
+        except OSError:
+            error_message = f"Сервер на сокете {SOCKET_FILE} не отвечает."
+            logging.error(error_message)
+            print(error_message)
+            return
+        print(output, end="")
+        return
+
+    from book_library.commands import (
+        CRUD,
+        get_all_from_snapshot,
+        get_from_snapshot,
+    )
+    from book_library.storage import open_repository, streams_snapshot
+
+    # one book of binary snapshot is read from its row by memory map
+    if (
+        parser_crud == ARG_GET
+        and JSON_FILE.suffix == BINARY_SNAPSHOT_SUFFIX
+        and args.id is not None
+        and len(args.id) == 1
+        and isinstance(args.id[0], int)
+    ):
+        get_from_snapshot(JSON_FILE, args)
+        return
+    # unsorted books of json snapshot are printed as snapshot is read
+    if (
+        parser_crud == ARG_GET_ALL
+        and args.sort_by is None
+        and streams_snapshot(JSON_FILE)
+    ):
+        get_all_from_snapshot(JSON_FILE, args)
+        return
+    repository = open_repository(
+        JSON_FILE, journal=JOURNAL_MODE, columnar=COLUMNAR_STORAGE
+    )
+    if parser_crud == ARG_SERVE:
+        from book_library.server import serve
+
+        serve(SOCKET_FILE, repository, CRUD)
+        return
+    if parser_crud == ARG_HTTP:
+        import asyncio
+
+        from book_library.http_api import serve_http
+
+        try:
+            asyncio.run(serve_http(repository, HTTP_HOST, HTTP_PORT))
+        except KeyboardInterrupt:
+            logging.info("Http сервер остановлен.")
+        return
     CRUD[parser_crud](repository, namespace=args)
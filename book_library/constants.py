@@ -3,6 +3,79 @@ from typing import Final
 
 BASE_DIR: Final[Path] = Path(__file__).resolve().parent.parent
 JSON_FILE: Final[Path] = BASE_DIR / "library_db.json"
+# snapshot with this suffix is stored and read as json lines
+JSONL_SNAPSHOT_SUFFIX: Final[str] = ".jsonl"
+# snapshot with this suffix is stored in compact binary format by columns,
+# it is read through memory map without json parsing and validation
+BINARY_SNAPSHOT_SUFFIX: Final[str] = ".books"
+# storage with this suffix keeps books in records of fixed size read
+# through memory map, command for one book reads and writes only its record
+RECORD_FILE_SUFFIX: Final[str] = ".rec"
+# bytes for title and author in record, longer strings are kept in
+# overflow file next to records
+RECORD_TITLE_BYTES: Final[int] = 128
+RECORD_AUTHOR_BYTES: Final[int] = 64
+RECORD_OVERFLOW_SUFFIX: Final[str] = ".overflow"
+# journal of old bytes of records for rollback of change after crash
+RECORD_UNDO_SUFFIX: Final[str] = ".undo"
+# file grows with the largest id, id of new record may be at most this
+# many records after the end of file
+RECORD_MAX_ID_GAP: Final[int] = 100_000
+SNAPSHOT_SUFFIXES: Final[tuple[str, ...]] = (
+    ".json",
+    JSONL_SNAPSHOT_SUFFIX,
+    BINARY_SNAPSHOT_SUFFIX,
+    RECORD_FILE_SUFFIX,
+)
+# storage with one of these suffixes is sqlite database instead of json
+SQLITE_SUFFIXES: Final[tuple[str, ...]] = (".sqlite3", ".db")
+SOCKET_FILE: Final[Path] = BASE_DIR / "library_db.sock"
+HTTP_HOST: Final[str] = "127.0.0.1"
+HTTP_PORT: Final[int] = 8080
+
+# validated books of snapshot are cached in binary file for fast start
+SNAPSHOT_CACHE: Final[bool] = True
+SNAPSHOT_CACHE_SUFFIX: Final[str] = ".cache"
+
+# json lines snapshot is validated by parts of this size in processes,
+# None workers is number of cores, snapshot of one part is validated
+# in the main process
+LOAD_WORKERS: Final[int | None] = None
+LOAD_CHUNK_BYTES: Final[int] = 2**20
+# json array snapshot printed without load is parsed by chunks of
+# this many characters
+STREAM_CHUNK_CHARS: Final[int] = 2**16
+
+# indent of json snapshot, None writes compact json in one line
+JSON_INDENT: Final[int | None] = 4
+
+# lock file taken by processes writing the same storage
+LOCK_SUFFIX: Final[str] = ".lock"
+
+# keep books in memory in compact column arrays, such storage is read
+# from snapshot cache without building models of all books
+COLUMNAR_STORAGE: Final[bool] = True
+
+# journal constants
+JOURNAL_MODE: Final[bool] = True
+JOURNAL_SUFFIX: Final[str] = ".log"
+JOURNAL_COMPACT_THRESHOLD: Final[int] = 1000
+JOURNAL_OP_CREATE: Final[str] = "create"
+JOURNAL_OP_UPDATE: Final[str] = "update"
+JOURNAL_OP_REMOVE: Final[str] = "remove"
+JOURNAL_OP_NEXT_ID: Final[str] = "next_id"
+
+# batch writes whenever it has this many changes or seconds passed,
+# None keeps all changes of batch until its end
+BATCH_FLUSH_CHANGES: Final[int | None] = None
+BATCH_FLUSH_SECONDS: Final[float | None] = None
+
+# import constants
+IMPORT_BATCH_SIZE: Final[int] = 10_000
+
+# full text index constants
+FULLTEXT_SUFFIX: Final[str] = ".fts"
+FULLTEXT_FIELDS: Final[tuple[str, ...]] = ("title", "author")
 
 LOG_DIR: Final[Path] = BASE_DIR / "logging"
 LOG_FORMAT: Final[str] = '"%(asctime)s - [%(levelname)s] - %(message)s"'
@@ -21,9 +94,32 @@ ARG_POST: Final[str] = "post"
 ARG_PATCH: Final[str] = "patch"
 ARG_DELETE: Final[str] = "delete"
 ARG_SEARCH: Final[str] = "search"
+ARG_SERVE: Final[str] = "serve"
+ARG_HTTP: Final[str] = "http"
+ARG_IMPORT: Final[str] = "import"
+ARG_EXPORT: Final[str] = "export"
+ARG_STATS: Final[str] = "stats"
+ARG_CONVERT: Final[str] = "convert"
+
+# commands run by handlers of book_library.commands
+CRUD_COMMANDS: Final[tuple[str, ...]] = (
+    ARG_GET_ALL,
+    ARG_GET,
+    ARG_POST,
+    ARG_PATCH,
+    ARG_DELETE,
+    ARG_SEARCH,
+    ARG_IMPORT,
+    ARG_EXPORT,
+    ARG_STATS,
+    ARG_CONVERT,
+)
 
 LONG_ARG_ID: Final[str] = "--id"
 ID_FIELD_HELP_TEXT: Final[str] = "Идентификатор книги в json."
+ID_LIST_HELP_TEXT: Final[str] = (
+    "Идентификаторы книг через запятую и диапазоны, например 1,5,10-200."
+)
 
 LONG_ARG_TITLE: Final[str] = "--title"
 TITLE_FIELD_HELP_TEXT: Final[str] = "Название книги."
@@ -43,12 +139,80 @@ NAME_FIELD_HELP_TEXT: Final[str] = "Имя поля."
 
 SHORT_ARG_VALUE: Final[str] = "-v"
 LONG_ARG_VALUE: Final[str] = "--value"
-VALUE_HELP_TEXT: Final[str] = "Значение для поиска."
+VALUE_HELP_TEXT: Final[str] = (
+    "Значение для поиска. Пары -f/-v можно передать несколько раз."
+)
+
+LONG_ARG_YEAR_FROM: Final[str] = "--year-from"
+YEAR_FROM_HELP_TEXT: Final[str] = "Год издания не раньше."
+
+LONG_ARG_YEAR_TO: Final[str] = "--year-to"
+YEAR_TO_HELP_TEXT: Final[str] = "Год издания не позже."
+
+LONG_ARG_CLIENT: Final[str] = "--client"
+CLIENT_HELP_TEXT: Final[str] = (
+    f"Передать команду запущенному серверу ({ARG_SERVE})."
+)
+
+LONG_ARG_PROFILE: Final[str] = "--profile"
+PROFILE_HELP_TEXT: Final[str] = (
+    "Вывести время этапов команды в stderr. С флагом"
+    f" {LONG_ARG_CLIENT} выводит время этапов сервера."
+)
+LONG_ARG_PROFILE_FILE: Final[str] = "--profile-file"
+PROFILE_FILE_HELP_TEXT: Final[str] = (
+    "Записать профиль cProfile команды в файл."
+)
+
+LONG_ARG_FILE: Final[str] = "--file"
+FILE_HELP_TEXT: Final[str] = "Путь к файлу .csv или .jsonl."
+
+LONG_ARG_TEXT: Final[str] = "--text"
+TEXT_HELP_TEXT: Final[str] = "Слова или части слов в названии и авторе."
+
+LONG_ARG_LIMIT: Final[str] = "--limit"
+LIMIT_HELP_TEXT: Final[str] = "Сколько книг вывести."
+LONG_ARG_OFFSET: Final[str] = "--offset"
+OFFSET_HELP_TEXT: Final[str] = "Сколько первых книг пропустить."
+
+LONG_ARG_SORT_BY: Final[str] = "--sort-by"
+SORT_FIELDS: Final[tuple[str, ...]] = ("id", "title", "author", "year")
+SORT_BY_HELP_TEXT: Final[str] = f"Поле для сортировки книг {SORT_FIELDS}."
+LONG_ARG_ORDER: Final[str] = "--order"
+ORDER_ASC: Final[str] = "asc"
+ORDER_DESC: Final[str] = "desc"
+ORDER_HELP_TEXT: Final[str] = (
+    f"Порядок сортировки: {ORDER_ASC} - по возрастанию,"
+    f" {ORDER_DESC} - по убыванию."
+)
+
+# output formats of books lists
+OUTPUT_FORMAT_TABLE: Final[str] = "table"
+OUTPUT_FORMAT_TSV: Final[str] = "tsv"
+OUTPUT_FORMAT_JSONL: Final[str] = "jsonl"
+OUTPUT_FORMATS: Final[tuple[str, ...]] = (
+    OUTPUT_FORMAT_TABLE,
+    OUTPUT_FORMAT_TSV,
+    OUTPUT_FORMAT_JSONL,
+)
+# table is printed by parts of this many books
+OUTPUT_TABLE_PAGE_SIZE: Final[int] = 1000
+LONG_ARG_FORMAT: Final[str] = "--format"
+FORMAT_HELP_TEXT: Final[str] = (
+    f"Формат вывода списка книг: {OUTPUT_FORMAT_TABLE} - таблица,"
+    f" {OUTPUT_FORMAT_TSV} - строки через табуляцию,"
+    f" {OUTPUT_FORMAT_JSONL} - json lines."
+)
 
 CRUD_ARGUMENTS_HELD_TEXT: Final[str] = (
     f"{ARG_GET_ALL} - Получение всех книг.\n"
+    f" Поля ({LONG_ARG_LIMIT}={LIMIT_HELP_TEXT},"
+    f" {LONG_ARG_OFFSET}={OFFSET_HELP_TEXT},\n"
+    f" {LONG_ARG_FORMAT}={OUTPUT_FORMATS},\n"
+    f" {LONG_ARG_SORT_BY}={SORT_FIELDS},"
+    f" {LONG_ARG_ORDER}={ORDER_ASC}/{ORDER_DESC})\n"
     f"{ARG_GET} - Получение книг по айди. \n"
-    f" Обязательные поля ({LONG_ARG_ID}={ID_FIELD_HELP_TEXT})\n"
+    f" Обязательные поля ({LONG_ARG_ID}={ID_LIST_HELP_TEXT})\n"
     f"{ARG_POST} - Создание книги. \n"
     " Обязательные поля\n"
     f" ({LONG_ARG_TITLE}={TITLE_FIELD_HELP_TEXT},"
@@ -56,14 +220,40 @@ CRUD_ARGUMENTS_HELD_TEXT: Final[str] = (
     f" {LONG_ARG_YEAR}={YEAR_FIELD_HELP_TEXT},"
     f" {LONG_ARG_AVAILABILITY}={AVAILABILITY_FIELD_HELP_TEXT}) \n"
     f"{ARG_PATCH} - Обновление книги. Обязательные поля(--id=Идентификатор) \n"
+    f" или все книги по условиям ({SHORT_ARG_NAME_FIELD}/{SHORT_ARG_VALUE},"
+    f" {LONG_ARG_YEAR_FROM}, {LONG_ARG_YEAR_TO})\n"
     f" ({LONG_ARG_TITLE}={TITLE_FIELD_HELP_TEXT},"
     f" {LONG_ARG_AUTHOR}={AUTHOR_FIELD_HELP_TEXT}, \n"
     f" {LONG_ARG_YEAR}={YEAR_FIELD_HELP_TEXT},"
     f" {LONG_ARG_AVAILABILITY}={AVAILABILITY_FIELD_HELP_TEXT}) \n"
     f"{ARG_DELETE} - Удаление книги. \n"
-    f" Обязательные поля ({LONG_ARG_ID}={ID_FIELD_HELP_TEXT})\n"
+    f" Обязательные поля ({LONG_ARG_ID}={ID_LIST_HELP_TEXT})\n"
+    f" или все книги по условиям ({SHORT_ARG_NAME_FIELD}/{SHORT_ARG_VALUE},"
+    f" {LONG_ARG_YEAR_FROM}, {LONG_ARG_YEAR_TO})\n"
     f"{ARG_SEARCH} - Поиск книги по полю и ключевому слову.\n"
-    f" Обязательные поля("
+    f" Поля("
     f"{SHORT_ARG_NAME_FIELD}/{LONG_ARG_NAME_FIELD}={NAME_FIELD_HELP_TEXT},"
-    f" {SHORT_ARG_VALUE}/{LONG_ARG_VALUE}={VALUE_HELP_TEXT})"
+    f" {SHORT_ARG_VALUE}/{LONG_ARG_VALUE}={VALUE_HELP_TEXT})\n"
+    f" Все условия объединяются через И, можно добавить\n"
+    f" ({LONG_ARG_TITLE}, {LONG_ARG_AUTHOR}, {LONG_ARG_YEAR},"
+    f" {LONG_ARG_AVAILABILITY},\n"
+    f" {LONG_ARG_YEAR_FROM}={YEAR_FROM_HELP_TEXT},"
+    f" {LONG_ARG_YEAR_TO}={YEAR_TO_HELP_TEXT},\n"
+    f" {LONG_ARG_TEXT}={TEXT_HELP_TEXT})\n"
+    f" Вывод как у {ARG_GET_ALL}"
+    f" ({LONG_ARG_LIMIT}, {LONG_ARG_OFFSET}, {LONG_ARG_FORMAT},"
+    f" {LONG_ARG_SORT_BY}, {LONG_ARG_ORDER})\n"
+    f"{ARG_IMPORT} - Импорт книг из файла за одну запись в json.\n"
+    f" Обязательные поля ({LONG_ARG_FILE}={FILE_HELP_TEXT})\n"
+    f"{ARG_EXPORT} - Экспорт всех книг в файл.\n"
+    f" Обязательные поля ({LONG_ARG_FILE}={FILE_HELP_TEXT})\n"
+    f"{ARG_CONVERT} - Запись всех книг с их айди в файл снимка"
+    f" {SNAPSHOT_SUFFIXES}.\n"
+    f" Обязательные поля ({LONG_ARG_FILE}=Путь к файлу снимка)\n"
+    f"{ARG_STATS} - Статистика книг: наличие, книги по авторам и годам.\n"
+    f" Поля ({LONG_ARG_LIMIT}=Сколько авторов с наибольшим числом книг"
+    " вывести)\n"
+    f"{ARG_SERVE} - Запуск сервера, который держит книги в памяти.\n"
+    f" Команды передаются ему с флагом {LONG_ARG_CLIENT}.\n"
+    f"{ARG_HTTP} - Запуск http json api на {HTTP_HOST}:{HTTP_PORT}."
 )
@@ -0,0 +1,173 @@
+import json
+import logging
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from pathlib import Path
+from typing import Any, Iterable
+
+from book_library.schemas import BookSchema
+from book_library.snapshot import atomic_write
+
+FULLTEXT_INDEX_VERSION = 1
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+MATCH_EXACT = 3
+MATCH_PREFIX = 2
+MATCH_INFIX = 1
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text in case folded unicode words."""
+    text = unicodedata.normalize("NFKC", text).casefold().replace("ё", "е")
+    return TOKEN_PATTERN.findall(text)
+
+
+class FullTextIndex:
+    """Inverted index of words in text fields of books.
+
+    Every word keeps ids of books with bit mask of fields where
+    the word occurs, so search can be limited to some fields.
+    """
+
+    def __init__(self, fields: tuple[str, ...]):
+        self.fields = fields
+        self.__docs: dict[int, dict[str, int]] = {}
+        self.__postings: dict[str, dict[int, int]] = {}
+        self.__terms: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.__docs)
+
+    def __field_mask(self, fields: Iterable[str]) -> int:
+        mask = 0
+        for field in fields:
+            mask |= 1 << self.fields.index(field)
+        return mask
+
+    def __tokenize_book(self, book: BookSchema) -> dict[str, int]:
+        tokens: dict[str, int] = {}
+        for number, field in enumerate(self.fields):
+            for token in tokenize(getattr(book, field)):
+                tokens[token] = tokens.get(token, 0) | 1 << number
+        return tokens
+
+    def __add_doc(
+        self, obj_id: int, tokens: dict[str, int], sort_terms: bool = True
+    ) -> None:
+        self.__docs[obj_id] = tokens
+        for token, mask in tokens.items():
+            postings = self.__postings.get(token)
+            if postings is None:
+                postings = self.__postings[token] = {}
+                if sort_terms:
+                    insort(self.__terms, token)
+            postings[obj_id] = mask
+
+    def __bulk_add_docs(
+        self, docs: Iterable[tuple[int, dict[str, int]]]
+    ) -> None:
+        """Add many documents and sort words only once."""
+        for obj_id, tokens in docs:
+            self.__add_doc(obj_id, tokens, sort_terms=False)
+        self.__terms = sorted(self.__postings)
+
+    def build(self, books: Iterable[BookSchema]) -> None:
+        """Fill index from all books."""
+        self.__bulk_add_docs(
+            (book.id, self.__tokenize_book(book)) for book in books
+        )
+
+    def add(self, book: BookSchema) -> None:
+        self.discard(book.id)
+        self.__add_doc(book.id, self.__tokenize_book(book))
+
+    def discard(self, obj_id: int) -> None:
+        tokens = self.__docs.pop(obj_id, None)
+        if tokens is None:
+            return
+        for token in tokens:
+            postings = self.__postings[token]
+            postings.pop(obj_id, None)
+            if not postings:
+                del self.__postings[token]
+                del self.__terms[bisect_left(self.__terms, token)]
+
+    def __match_terms(self, token: str) -> Iterable[tuple[str, int]]:
+        """Get words of index matching query word with match quality."""
+        if token in self.__postings:
+            yield token, MATCH_EXACT
+        position = bisect_left(self.__terms, token)
+        while position < len(self.__terms):
+            term = self.__terms[position]
+            if not term.startswith(token):
+                break
+            if term != token:
+                yield term, MATCH_PREFIX
+            position += 1
+        for term in self.__terms:
+            if token in term and not term.startswith(token):
+                yield term, MATCH_INFIX
+
+    def search(
+        self, query: str, fields: Iterable[str] | None = None
+    ) -> list[int]:
+        """Get ids of books containing all query words ranked by match."""
+        mask = self.__field_mask(fields or self.fields)
+        scores: dict[int, int] | None = None
+        for token in dict.fromkeys(tokenize(query)):
+            token_scores: dict[int, int] = {}
+            for term, quality in self.__match_terms(token):
+                for obj_id, field_mask in self.__postings[term].items():
+                    if field_mask & mask and (
+                        token_scores.get(obj_id, 0) < quality
+                    ):
+                        token_scores[obj_id] = quality
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    obj_id: score + token_scores[obj_id]
+                    for obj_id, score in scores.items()
+                    if obj_id in token_scores
+                }
+            if not scores:
+                return []
+        if scores is None:
+            return []
+        return sorted(scores, key=lambda obj_id: (-scores[obj_id], obj_id))
+
+    def save(self, path_index: Path, stamp: dict[str, Any]) -> None:
+        """Write index in file with stamp of data it was built from."""
+        index_data = {
+            "version": FULLTEXT_INDEX_VERSION,
+            "fields": self.fields,
+            "stamp": stamp,
+            "docs": self.__docs,
+        }
+        with atomic_write(path_index, mode="w", encoding="utf-8") as file:
+            json.dump(index_data, file, ensure_ascii=False)
+        logging.info(f"Сохранен полнотекстовый индекс {path_index.name}.")
+
+    @classmethod
+    def load(
+        cls, path_index: Path, fields: tuple[str, ...]
+    ) -> tuple["FullTextIndex", dict[str, Any]] | None:
+        """Read index and its stamp from file, None if file is unusable."""
+        try:
+            with open(path_index, mode="r", encoding="utf-8") as index_file:
+                index_data = json.load(index_file)
+        except (OSError, ValueError):
+            return None
+        if index_data.get("version") != FULLTEXT_INDEX_VERSION or tuple(
+            index_data.get("fields", ())
+        ) != tuple(fields):
+            return None
+
+        index = cls(fields)
+        index.__bulk_add_docs(
+            (int(obj_id), tokens)
+            for obj_id, tokens in index_data["docs"].items()
+        )
+        return index, index_data["stamp"]
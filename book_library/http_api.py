@@ -0,0 +1,329 @@
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, Callable, Iterable
+from urllib.parse import parse_qs, urlsplit
+
+from pydantic_core import ValidationError
+
+from book_library.base_repository import BaseRepositoryBook, not_found_error
+from book_library.constants import ORDER_ASC, ORDER_DESC, SORT_FIELDS
+from book_library.metrics import metrics
+from book_library.query import (
+    EqualPredicate,
+    Predicate,
+    RangePredicate,
+    SortOrder,
+)
+from book_library.schemas import BookSchema, BookSchemaUpdate
+
+BOOKS_PATH = "/books"
+SEARCH_PATH = "/books/search"
+STATS_PATH = "/books/stats"
+METRICS_PATH = "/metrics"
+
+
+class HttpError(Exception):
+    """Error answered to client with http status."""
+
+    def __init__(self, status: HTTPStatus, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+class BookHttpApi:
+    """Asyncio http json api over repository of books.
+
+    Reads are answered from memory right in the event loop, so many
+    clients are served concurrently. Writes go through a queue to one
+    writer task, which runs them one by one in a separate thread and
+    holds readers back only while a write changes data.
+    """
+
+    def __init__(self, repository: BaseRepositoryBook):
+        self.repository = repository
+        self.__write_queue: asyncio.Queue | None = None
+        self.__write_idle: asyncio.Event | None = None
+        self.__writer_task: asyncio.Task | None = None
+        self.__executor = ThreadPoolExecutor(max_workers=1)
+
+    async def start(self, host: str, port: int) -> asyncio.Server:
+        """Start http server and writer task."""
+        self.__write_queue = asyncio.Queue()
+        self.__write_idle = asyncio.Event()
+        self.__write_idle.set()
+        self.__writer_task = asyncio.create_task(self.__writer())
+        server = await asyncio.start_server(self.__handle_client, host, port)
+        logging.info(f"Http сервер запущен на {host}:{port}.")
+        return server
+
+    async def stop(self) -> None:
+        """Stop writer task after all queued writes."""
+        await self.__write_queue.join()
+        self.__writer_task.cancel()
+        self.__executor.shutdown()
+
+    async def __writer(self) -> None:
+        """Run queued writes one by one."""
+        loop = asyncio.get_running_loop()
+        while True:
+            func, future = await self.__write_queue.get()
+            self.__write_idle.clear()
+            try:
+                result = await loop.run_in_executor(self.__executor, func)
+            except Exception as error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+            finally:
+                self.__write_idle.set()
+                self.__write_queue.task_done()
+
+    async def write(self, func: Callable[[], Any]) -> Any:
+        """Queue write in repository and wait for its result."""
+        future = asyncio.get_running_loop().create_future()
+        await self.__write_queue.put((func, future))
+        return await future
+
+    async def read(self, func: Callable[[], Any]) -> Any:
+        """Run read from repository when no write is in progress."""
+        await self.__write_idle.wait()
+        return func()
+
+    async def __handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answer http requests of one connection with keep alive."""
+        try:
+            while True:
+                request = await self.__read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                status, payload = await self.__dispatch(method, target, body)
+                keep_alive = headers.get("connection", "") != "close"
+                self.__write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def __read_request(
+        self, reader: asyncio.StreamReader
+    ) -> tuple[str, str, dict[str, str], bytes] | None:
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", 0))
+        body = await reader.readexactly(length) if length else b""
+        return method, target, headers, body
+
+    def __write_response(
+        self,
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        payload: Any,
+        keep_alive: bool,
+    ) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        connection = "keep-alive" if keep_alive else "close"
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {connection}\r\n\r\n"
+        )
+        writer.write(head.encode() + body)
+
+    async def __dispatch(
+        self, method: str, target: str, body: bytes
+    ) -> tuple[HTTPStatus, Any]:
+        """Call route for request and convert errors in http statuses."""
+        url = urlsplit(target)
+        try:
+            return await self.__route(method, url.path, url.query, body)
+        except HttpError as error:
+            return error.status, {"detail": error.detail}
+        except ValidationError as error:
+            return HTTPStatus.UNPROCESSABLE_ENTITY, {
+                "detail": json.loads(error.json())
+            }
+        except ValueError as error:
+            return HTTPStatus.NOT_FOUND, {"detail": str(error)}
+        except Exception:
+            # error of one handler is answered, connection stays alive
+            logging.exception(f"Ошибка обработки запроса {method} {target}.")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {
+                "detail": "Внутренняя ошибка сервера."
+            }
+
+    async def __route(
+        self, method: str, path: str, query: str, body: bytes
+    ) -> tuple[HTTPStatus, Any]:
+        repository = self.repository
+        if path == BOOKS_PATH:
+            if method == "GET":
+                offset, limit, order = self.__parse_page(query)
+                books = await self.read(
+                    lambda: list(repository.iter_all(offset, limit, order))
+                )
+                return HTTPStatus.OK, [book.model_dump() for book in books]
+            if method == "POST":
+                fields = self.__parse_body(body, BookSchema.model_fields)
+                book = await self.write(lambda: repository.create(**fields))
+                return HTTPStatus.CREATED, book.model_dump()
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, "Метод запрещен.")
+
+        if path == SEARCH_PATH and method == "GET":
+            predicates, text = self.__parse_search(query)
+            offset, limit, order = self.__parse_page(query)
+            books = await self.read(
+                lambda: list(
+                    repository.iter_search(
+                        predicates, text, offset, limit, order
+                    )
+                )
+            )
+            if not books and not offset:
+                raise not_found_error(predicates, text)
+            return HTTPStatus.OK, [book.model_dump() for book in books]
+
+        if path == STATS_PATH and method == "GET":
+            stats = await self.read(repository.stats)
+            return HTTPStatus.OK, stats.model_dump()
+
+        if path == METRICS_PATH and method == "GET":
+            return HTTPStatus.OK, metrics.snapshot()
+
+        prefix, _, obj_id = path.rpartition("/")
+        if prefix != BOOKS_PATH or not obj_id.isdigit():
+            raise HttpError(HTTPStatus.NOT_FOUND, "Путь не найден.")
+        obj_id = int(obj_id)
+        if method == "GET":
+            book = await self.read(lambda: repository.get(obj_id))
+            return HTTPStatus.OK, book.model_dump()
+        if method == "PATCH":
+            fields = self.__parse_body(body, BookSchemaUpdate.model_fields)
+            book = await self.write(
+                lambda: repository.update(obj_id, **fields)
+            )
+            return HTTPStatus.OK, book.model_dump()
+        if method == "DELETE":
+            await self.write(lambda: repository.remove(obj_id))
+            return HTTPStatus.OK, {"id": obj_id}
+        raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, "Метод запрещен.")
+
+    def __parse_body(
+        self, body: bytes, schema_fields: Iterable[str]
+    ) -> dict[str, Any]:
+        """Get fields of book from json body, id of body is ignored."""
+        try:
+            fields = json.loads(body or b"{}")
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Тело не является json.")
+        if not isinstance(fields, dict):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Тело должно быть json.")
+        fields.pop("id", None)
+        unknown_fields = set(fields) - set(schema_fields)
+        if unknown_fields:
+            raise HttpError(
+                HTTPStatus.BAD_REQUEST, f"Неизвестные поля {unknown_fields}."
+            )
+        return fields
+
+    def __parse_page(
+        self, query: str
+    ) -> tuple[int, int | None, SortOrder | None]:
+        params = parse_qs(query)
+        try:
+            offset = int(params["offset"][0]) if "offset" in params else 0
+            limit = int(params["limit"][0]) if "limit" in params else None
+        except ValueError:
+            raise HttpError(
+                HTTPStatus.BAD_REQUEST, "Лимит и смещение должны быть числами."
+            )
+        if offset < 0 or (limit is not None and limit < 0):
+            raise HttpError(
+                HTTPStatus.BAD_REQUEST,
+                "Лимит и смещение не могут быть отрицательными.",
+            )
+
+        order = None
+        if "sort_by" in params:
+            field = params["sort_by"][0]
+            direction = params.get("order", [ORDER_ASC])[0]
+            if field not in SORT_FIELDS or direction not in (
+                ORDER_ASC,
+                ORDER_DESC,
+            ):
+                raise HttpError(
+                    HTTPStatus.BAD_REQUEST,
+                    f"Сортировка возможна по полям {SORT_FIELDS}"
+                    f" в порядке {ORDER_ASC} или {ORDER_DESC}.",
+                )
+            order = SortOrder(field, direction == ORDER_DESC)
+        return offset, limit, order
+
+    def __parse_search(self, query: str) -> tuple[list[Predicate], str | None]:
+        params = parse_qs(query)
+        fields = params.pop("field", [])
+        values = params.pop("value", [])
+        unknown_fields = set(fields) - set(BookSchema.model_fields)
+        if unknown_fields:
+            raise HttpError(
+                HTTPStatus.BAD_REQUEST, f"Неизвестные поля {unknown_fields}."
+            )
+        if len(fields) != len(values):
+            raise HttpError(
+                HTTPStatus.BAD_REQUEST,
+                "Каждому полю должно соответствовать одно значение.",
+            )
+        predicates: list[Predicate] = [
+            EqualPredicate(field, value)
+            for field, value in zip(fields, values)
+        ]
+        try:
+            year_from, year_to = (
+                int(params[name][0]) if name in params else None
+                for name in ("year_from", "year_to")
+            )
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Год должен быть числом.")
+        if year_from is not None or year_to is not None:
+            predicates.append(RangePredicate("year", year_from, year_to))
+        text = params["text"][0] if "text" in params else None
+        if not predicates and text is None:
+            raise HttpError(
+                HTTPStatus.BAD_REQUEST, "Не переданы условия для поиска."
+            )
+        return predicates, text
+
+
+async def serve_http(
+    repository: BaseRepositoryBook, host: str, port: int
+) -> None:
+    """Serve http api until cancel."""
+    api = BookHttpApi(repository)
+    server = await api.start(host, port)
+    print(f"Http сервер запущен на http://{host}:{port}{BOOKS_PATH}.")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await api.stop()
@@ -0,0 +1,121 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Iterable, Iterator
+
+from book_library.schemas import BookSchema
+
+
+class HashIndex:
+    """Index for exact match of field value to ids of books."""
+
+    def __init__(self, field: str):
+        self.field = field
+        self.__ids: dict[str, dict[int, None]] = {}
+
+    def build(self, books: Iterable[BookSchema]) -> None:
+        """Fill index from all books."""
+        for book in books:
+            self.add(book)
+
+    def add(self, book: BookSchema) -> None:
+        key = str(getattr(book, self.field))
+        self.__ids.setdefault(key, {})[book.id] = None
+
+    def discard(self, book: BookSchema) -> None:
+        key = str(getattr(book, self.field))
+        ids = self.__ids.get(key)
+        if ids is None:
+            return
+        ids.pop(book.id, None)
+        if not ids:
+            del self.__ids[key]
+
+    def count(self, arg: Any) -> int:
+        """Count books with field value equal to argument."""
+        return len(self.__ids.get(str(arg), ()))
+
+    def find(self, arg: Any) -> list[int]:
+        """Get ids of books with field value equal to argument."""
+        return list(self.__ids.get(str(arg), ()))
+
+
+class SortedIndex:
+    """Index of integer field value sorted for exact and range lookups."""
+
+    def __init__(self, field: str):
+        self.field = field
+        self.__keys: list[tuple[int, int]] = []
+
+    def build(self, books: Iterable[BookSchema]) -> None:
+        """Fill index from all books."""
+        self.__keys = sorted(
+            (getattr(book, self.field), book.id) for book in books
+        )
+
+    def add(self, book: BookSchema) -> None:
+        insort(self.__keys, (getattr(book, self.field), book.id))
+
+    def discard(self, book: BookSchema) -> None:
+        key = (getattr(book, self.field), book.id)
+        position = bisect_left(self.__keys, key)
+        if position < len(self.__keys) and self.__keys[position] == key:
+            del self.__keys[position]
+
+    def iter_ids(self, descending: bool = False) -> Iterator[int]:
+        """Iterate ids of books in order of field value and id."""
+        keys = reversed(self.__keys) if descending else iter(self.__keys)
+        return (obj_id for _, obj_id in keys)
+
+    def __bounds(
+        self, value_from: int | None, value_to: int | None
+    ) -> tuple[int, int]:
+        """Get positions of closed range in sorted keys."""
+        start = 0
+        if value_from is not None:
+            start = bisect_left(self.__keys, (value_from,))
+        end = len(self.__keys)
+        if value_to is not None:
+            end = bisect_right(self.__keys, (value_to, float("inf")))
+        return start, max(start, end)
+
+    def __exact_value(self, arg: Any) -> int | None:
+        try:
+            value = int(arg)
+        except (TypeError, ValueError):
+            return None
+        if str(value) != str(arg):
+            return None
+        return value
+
+    def count(self, arg: Any) -> int:
+        """Count books with field value equal to argument."""
+        value = self.__exact_value(arg)
+        if value is None:
+            return 0
+        return self.count_range(value, value)
+
+    def find(self, arg: Any) -> list[int]:
+        """Get ids of books with field value equal to argument."""
+        value = self.__exact_value(arg)
+        if value is None:
+            return []
+        return self.find_range(value, value)
+
+    def count_range(self, value_from: int | None, value_to: int | None) -> int:
+        """Count books with field value in closed range."""
+        start, end = self.__bounds(value_from, value_to)
+        return end - start
+
+    def find_range(
+        self, value_from: int | None, value_to: int | None
+    ) -> list[int]:
+        """Get ids of books with field value in closed range."""
+        start, end = self.__bounds(value_from, value_to)
+        return [obj_id for _, obj_id in self.__keys[start:end]]
+
+
+FIELD_INDEXES: dict[str, type[HashIndex] | type[SortedIndex]] = {
+    "title": HashIndex,
+    "author": HashIndex,
+    "availability": HashIndex,
+    "year": SortedIndex,
+}
@@ -0,0 +1,132 @@
+import json
+import logging
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from book_library.constants import JOURNAL_OP_NEXT_ID
+from book_library.metrics import metrics
+
+
+class Journal:
+    """Append-only log of book mutations stored next to the json snapshot."""
+
+    def __init__(self, path_journal: Path):
+        self.path_journal = path_journal
+        self.count_records = 0
+
+    def __len__(self) -> int:
+        return self.count_records
+
+    def append(self, records: Iterable[dict[str, Any]]) -> None:
+        """Append compact records to the end of journal file."""
+        with metrics.span("serialize"):
+            lines = [
+                json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+                for record in records
+            ]
+        if not lines:
+            return
+
+        with open(self.path_journal, mode="a", encoding="utf-8") as journal:
+            journal.write("\n".join(lines) + "\n")
+            journal.flush()
+            with metrics.span("fsync"):
+                os.fsync(journal.fileno())
+        self.count_records += len(lines)
+
+    def replay(self) -> Iterator[dict[str, Any]]:
+        """Read records from journal file in order of writing."""
+        self.count_records = 0
+        if not self.path_journal.is_file():
+            return
+
+        valid_size = 0
+        with open(self.path_journal, mode="rb") as journal:
+            for number, line in enumerate(journal, start=1):
+                if not line.endswith(b"\n"):
+                    logging.warning(
+                        f"Пропущена недописанная запись {number} журнала "
+                        f"{self.path_journal.name}."
+                    )
+                    break
+                valid_size += len(line)
+                if not line.strip():
+                    continue
+                self.count_records += 1
+                yield json.loads(line)
+
+        if valid_size != self.path_journal.stat().st_size:
+            os.truncate(self.path_journal, valid_size)
+
+    def size(self) -> int:
+        """Get size of journal file in bytes."""
+        if not self.path_journal.is_file():
+            return 0
+        return self.path_journal.stat().st_size
+
+    def records_from(self, offset: int) -> Iterator[dict[str, Any]]:
+        """Read complete records written after byte offset."""
+        if not self.path_journal.is_file():
+            return
+
+        with open(self.path_journal, mode="rb") as journal:
+            journal.seek(offset)
+            for line in journal:
+                if not line.endswith(b"\n"):
+                    break
+                if line.strip():
+                    yield json.loads(line)
+
+    def last_record_of(self, obj_id: int) -> dict[str, Any] | None:
+        """Find the last complete record of book id from end of journal.
+
+        Id is searched in bytes of records, so only records with id
+        are decoded, not every record of journal.
+        """
+        if not self.size():
+            return None
+        patterns = (f'"id":{obj_id},'.encode(), f'"id":{obj_id}}}'.encode())
+        with (
+            open(self.path_journal, mode="rb") as journal,
+            mmap.mmap(journal.fileno(), 0, access=mmap.ACCESS_READ) as data,
+        ):
+            # torn record after the last line break is not written yet
+            end = data.rfind(b"\n") + 1
+            while True:
+                position = max(
+                    data.rfind(pattern, 0, end) for pattern in patterns
+                )
+                if position < 0:
+                    return None
+                start = data.rfind(b"\n", 0, position) + 1
+                record = json.loads(data[start : data.find(b"\n", position)])
+                record_id = record.get("book", record)["id"]
+                if record_id == obj_id and record["op"] != JOURNAL_OP_NEXT_ID:
+                    return record
+                end = start
+
+    def clear(self, records: Iterable[dict[str, Any]] = ()) -> None:
+        """Remove all records after compaction in snapshot, records
+        kept after compaction replace journal at once."""
+        lines = [
+            json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+            for record in records
+        ]
+        self.count_records = len(lines)
+        if not lines:
+            self.path_journal.unlink(missing_ok=True)
+            return
+
+        path_tmp = self.path_journal.with_name(
+            f"{self.path_journal.name}.{os.getpid()}.tmp"
+        )
+        try:
+            with open(path_tmp, mode="w", encoding="utf-8") as journal:
+                journal.write("\n".join(lines) + "\n")
+                journal.flush()
+                os.fsync(journal.fileno())
+            os.replace(path_tmp, self.path_journal)
+        finally:
+            path_tmp.unlink(missing_ok=True)
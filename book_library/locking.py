@@ -0,0 +1,61 @@
+import os
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - windows
+    fcntl = None
+    import msvcrt
+
+WINDOWS_LOCK_OFFSET = 1 << 30
+
+
+class FileLock:
+    """Lock between processes on file next to the storage.
+
+    Exclusive lock is taken by writers, shared lock by readers of
+    storage files, so reader never sees half written journal record.
+    Windows has only exclusive locks, shared lock is exclusive there.
+    """
+
+    def __init__(self, path_lock: Path):
+        self.path_lock = path_lock
+        self.__fd: int | None = None
+        self.__depth = 0
+
+    def acquire(self, shared: bool = False) -> None:
+        """Block until lock is taken, nested acquire only counts depth."""
+        self.__depth += 1
+        if self.__depth > 1:
+            return
+        self.__fd = os.open(self.path_lock, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            fcntl.flock(self.__fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            return
+        # lock byte far after counter of writes kept in the same file
+        os.lseek(self.__fd, WINDOWS_LOCK_OFFSET, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(self.__fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+    def release(self) -> None:
+        self.__depth -= 1
+        if self.__depth > 0:
+            return
+        if fcntl is not None:
+            fcntl.flock(self.__fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self.__fd, WINDOWS_LOCK_OFFSET, os.SEEK_SET)
+            msvcrt.locking(self.__fd, msvcrt.LK_UNLCK, 1)
+        os.close(self.__fd)
+        self.__fd = None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.release()
@@ -0,0 +1,121 @@
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+# hook gets name of finished span and its duration in seconds
+SpanHook = Callable[[str, float], None]
+
+
+class Metrics:
+    """Durations of named spans of work and counters of records.
+
+    Spans are kept as count, total and max duration, so metrics of
+    long running server take constant memory. Hooks get every finished
+    span, for example to send it in outer monitoring.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__spans: dict[str, list[float]] = {}
+        self.__counters: dict[str, int] = {}
+        self.__hooks: list[SpanHook] = []
+
+    def add_hook(self, hook: SpanHook) -> None:
+        self.__hooks.append(hook)
+
+    def remove_hook(self, hook: SpanHook) -> None:
+        self.__hooks.remove(hook)
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add duration of finished span."""
+        with self.__lock:
+            span = self.__spans.get(name)
+            if span is None:
+                self.__spans[name] = [1, seconds, seconds]
+            else:
+                span[0] += 1
+                span[1] += seconds
+                span[2] = max(span[2], seconds)
+        for hook in self.__hooks:
+            hook(name, seconds)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Measure duration of work in context."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + value
+
+    def snapshot(self) -> dict[str, Any]:
+        """Get copy of spans in ms and counters."""
+        with self.__lock:
+            return {
+                "spans": {
+                    name: {
+                        "count": count,
+                        "total_ms": round(total * 1000, 3),
+                        "max_ms": round(longest * 1000, 3),
+                    }
+                    for name, (count, total, longest) in self.__spans.items()
+                },
+                "counters": dict(self.__counters),
+            }
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__spans = {}
+            self.__counters = {}
+
+    def summary(self) -> str:
+        """Get table of spans from the longest and counters as text."""
+        snapshot = self.snapshot()
+        lines = [
+            f"{'Этап':<24} {'Вызовов':>8} {'Всего мс':>10} {'Макс мс':>10}"
+        ]
+        for name, span in sorted(
+            snapshot["spans"].items(), key=lambda item: -item[1]["total_ms"]
+        ):
+            lines.append(
+                f"{name:<24} {span['count']:>8} {span['total_ms']:>10.3f}"
+                f" {span['max_ms']:>10.3f}"
+            )
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"{name:<24} {value:>8}")
+        return "\n".join(lines)
+
+
+# metrics of the whole process, storages and outputs write in them
+metrics = Metrics()
+
+
+@contextmanager
+def profile(summary: bool, path_dump: Path | None = None) -> Iterator[None]:
+    """Print summary of spans after work in context to stderr and
+    write cProfile dump of the work in file."""
+    profiler = None
+    if path_dump is not None:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(path_dump)
+            logging.info(f"Профиль команды записан в {path_dump}.")
+        if summary:
+            text = metrics.summary()
+            logging.info(f"Время этапов команды:\n{text}")
+            print(text, file=sys.stderr)
@@ -1,19 +1,34 @@
+import heapq
 import logging
+import os
+import sys
+from itertools import islice
+from typing import TYPE_CHECKING, Iterable
 
-from prettytable import PrettyTable
+from book_library.constants import (
+    OUTPUT_FORMAT_JSONL,
+    OUTPUT_FORMAT_TABLE,
+    OUTPUT_FORMAT_TSV,
+    OUTPUT_TABLE_PAGE_SIZE,
+)
+from book_library.metrics import metrics
 
-from book_library.repository import BookSchema
+if TYPE_CHECKING:
+    from book_library.schemas import BookSchema, BookStatsSchema
 
+OUTPUT_FIELDS = ("id", "title", "author", "year", "availability")
+TSV_ESCAPES = str.maketrans(
+    {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"}
+)
+
+
+@metrics.span("render")
+def pretty_books_output(books: list["BookSchema"]) -> None:
+    # prettytable is imported only by commands printing books
+    from prettytable import PrettyTable
 
-def pretty_books_output(books: list[BookSchema]) -> None:
     task_table = PrettyTable()
-    task_table.field_names = (
-        "id",
-        "title",
-        "author",
-        "year",
-        "availability",
-    )
+    task_table.field_names = OUTPUT_FIELDS
     task_table.align = "l"
     for book in books:
         rows = (
@@ -26,3 +41,87 @@ def pretty_books_output(books: list[BookSchema]) -> None:
         task_table.add_row(rows)
     logging.info(f"Выведено {len(books)} книг")
     print(task_table)
+
+
+def tsv_book_line(book: "BookSchema") -> str:
+    return "\t".join(
+        str(getattr(book, field)).translate(TSV_ESCAPES)
+        for field in OUTPUT_FIELDS
+    )
+
+
+@metrics.span("render.stream")
+def stream_books_output(
+    books: Iterable["BookSchema"],
+    output_format: str = OUTPUT_FORMAT_TABLE,
+    empty_table: bool = True,
+) -> int:
+    """Print books as they are produced and get count of printed books.
+
+    Table is printed by parts, tsv and json lines by one line for book,
+    so output starts before all books are read. Time of lazy reading of
+    books is included in span of output.
+    """
+    count_books = 0
+    books = iter(books)
+    try:
+        if output_format == OUTPUT_FORMAT_TABLE:
+            while page := list(islice(books, OUTPUT_TABLE_PAGE_SIZE)):
+                pretty_books_output(page)
+                count_books += len(page)
+            if not count_books and empty_table:
+                pretty_books_output([])
+            return count_books
+
+        write = sys.stdout.write
+        if output_format == OUTPUT_FORMAT_TSV:
+            write("\t".join(OUTPUT_FIELDS) + "\n")
+        for book in books:
+            if output_format == OUTPUT_FORMAT_JSONL:
+                write(book.model_dump_json() + "\n")
+            else:
+                write(tsv_book_line(book) + "\n")
+            count_books += 1
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # reader of pipe, for example head, does not need more books
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        logging.info("Вывод книг прерван закрытым каналом.")
+    logging.info(f"Выведено {count_books} книг в формате {output_format}")
+    return count_books
+
+
+@metrics.span("render")
+def stats_output(stats: "BookStatsSchema", limit: int | None = None) -> None:
+    """Print totals of books, books of authors and books of years.
+
+    Authors are printed from the one with the most books, limit keeps
+    only this many authors.
+    """
+    from prettytable import PrettyTable
+
+    totals_table = PrettyTable()
+    totals_table.field_names = ("Всего книг", "В наличии", "Нет в наличии")
+    totals_table.add_row((stats.total, stats.available, stats.unavailable))
+    print(totals_table)
+
+    authors = stats.authors.items()
+    if limit is None:
+        authors = sorted(authors, key=lambda item: (-item[1], item[0]))
+    else:
+        authors = heapq.nsmallest(
+            limit, authors, key=lambda item: (-item[1], item[0])
+        )
+    authors_table = PrettyTable()
+    authors_table.field_names = ("Автор", "Книг")
+    authors_table.align = "l"
+    authors_table.add_rows(authors)
+    print(authors_table)
+
+    years_table = PrettyTable()
+    years_table.field_names = ("Год", "Книг")
+    years_table.align = "l"
+    years_table.add_rows(stats.years.items())
+    print(years_table)
+    logging.info(f"Выведена статистика {stats.total} книг")
@@ -0,0 +1,177 @@
+from bisect import bisect_right
+from itertools import chain
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+from book_library.indexes import HashIndex, SortedIndex
+from book_library.schemas import BookSchema
+
+Index = HashIndex | SortedIndex
+
+
+class EqualPredicate:
+    """Condition of exact match of field value with argument."""
+
+    def __init__(self, field: str, arg: Any):
+        self.field = field
+        self.arg = arg
+
+    def __repr__(self) -> str:
+        return f"{self.field}={self.arg}"
+
+    def match(self, book: BookSchema) -> bool:
+        return str(getattr(book, self.field)) == str(self.arg)
+
+    def estimate(self, index: Index) -> int:
+        return index.count(self.arg)
+
+    def lookup(self, index: Index) -> list[int]:
+        return index.find(self.arg)
+
+
+class RangePredicate:
+    """Condition of integer field value in closed range."""
+
+    def __init__(
+        self, field: str, value_from: int | None, value_to: int | None
+    ):
+        self.field = field
+        self.value_from = value_from
+        self.value_to = value_to
+
+    def __repr__(self) -> str:
+        return f"{self.value_from}<={self.field}<={self.value_to}"
+
+    def match(self, book: BookSchema) -> bool:
+        value = getattr(book, self.field)
+        if self.value_from is not None and value < self.value_from:
+            return False
+        if self.value_to is not None and value > self.value_to:
+            return False
+        return True
+
+    def estimate(self, index: Index) -> int | None:
+        if not isinstance(index, SortedIndex):
+            return None
+        return index.count_range(self.value_from, self.value_to)
+
+    def lookup(self, index: SortedIndex) -> list[int]:
+        return index.find_range(self.value_from, self.value_to)
+
+
+class IdRanges:
+    """Set of ids kept as sorted ranges, ranges are not expanded.
+
+    Part of ids is one id or pair of the first and the last ids.
+    """
+
+    def __init__(self, parts: Iterable[int | Sequence[int]]):
+        ranges = sorted(
+            (
+                (
+                    range(part, part + 1)
+                    if isinstance(part, int)
+                    else range(part[0], part[1] + 1)
+                )
+                for part in parts
+            ),
+            key=lambda part: part.start,
+        )
+        self.ranges: list[range] = []
+        for part in ranges:
+            if not part:
+                continue
+            if self.ranges and part.start <= self.ranges[-1].stop:
+                last = self.ranges[-1]
+                self.ranges[-1] = range(last.start, max(last.stop, part.stop))
+            else:
+                self.ranges.append(part)
+        self.__starts = [part.start for part in self.ranges]
+
+    def __repr__(self) -> str:
+        return ",".join(
+            f"{part.start}-{part.stop - 1}" for part in self.ranges
+        )
+
+    def __contains__(self, value: Any) -> bool:
+        if not isinstance(value, int):
+            return False
+        number = bisect_right(self.__starts, value) - 1
+        return number >= 0 and value in self.ranges[number]
+
+    def __iter__(self) -> Iterator[int]:
+        return chain.from_iterable(self.ranges)
+
+    def __len__(self) -> int:
+        return sum(map(len, self.ranges))
+
+    def first(self) -> int:
+        return self.ranges[0].start
+
+
+class InPredicate:
+    """Condition of field value in set of values, ids of ranges
+    are kept as ranges."""
+
+    def __init__(self, field: str, values: Iterable[Any]):
+        self.field = field
+        self.values = values if isinstance(values, IdRanges) else set(values)
+
+    def __repr__(self) -> str:
+        return f"{self.field} in {len(self.values)} values"
+
+    def match(self, book: BookSchema) -> bool:
+        return getattr(book, self.field) in self.values
+
+    def estimate(self, index: Index) -> int:
+        return sum(map(index.count, self.values))
+
+    def lookup(self, index: Index) -> list[int]:
+        return sorted(
+            obj_id for value in self.values for obj_id in index.find(value)
+        )
+
+
+Predicate = EqualPredicate | RangePredicate | InPredicate
+
+
+class SortOrder:
+    """Order of books by field value, books with equal value by id."""
+
+    def __init__(self, field: str, descending: bool = False):
+        self.field = field
+        self.descending = descending
+
+    def __repr__(self) -> str:
+        return f"{self.field} {'desc' if self.descending else 'asc'}"
+
+    def key(self, book: BookSchema) -> tuple[Any, int]:
+        return getattr(book, self.field), book.id
+
+
+def plan_query(
+    predicates: list[Predicate],
+    get_index: Callable[[str], Index | None],
+) -> tuple[Predicate | None, list[Predicate]]:
+    """Choose predicate with the most selective index.
+
+    Returns predicate for index lookup (None for full scan) and
+    the rest predicates for filtering of candidates.
+    """
+    best_predicate = None
+    best_estimate = None
+    for predicate in predicates:
+        index = get_index(predicate.field)
+        if index is None:
+            continue
+        estimate = predicate.estimate(index)
+        if estimate is None:
+            continue
+        if best_estimate is None or estimate < best_estimate:
+            best_predicate, best_estimate = predicate, estimate
+
+    rest_predicates = [
+        predicate
+        for predicate in predicates
+        if predicate is not best_predicate
+    ]
+    return best_predicate, rest_predicates
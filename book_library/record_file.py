@@ -0,0 +1,464 @@
+"""File of book records of fixed size read through memory map.
+
+File starts with header: magic bytes, version of format and sizes of
+record and of its title and author fields. Record of book with id N is
+the N-th record after the header, so book is read and changed in place
+without reading other records. Record with zero id is empty, ids of
+removed books are not reused. Title or author longer than its field
+is appended to overflow file, the field keeps offset of the string.
+All numbers are little endian.
+
+Change of records is atomic with undo journal: at start of change
+journal keeps sizes of both files, old bytes of records changed in
+place are written to it before the records. Journal left by crash is
+rolled back when file is opened.
+"""
+
+import logging
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import IO, Iterable
+
+from book_library.columnar import construct_book
+from book_library.constants import (
+    RECORD_AUTHOR_BYTES,
+    RECORD_MAX_ID_GAP,
+    RECORD_OVERFLOW_SUFFIX,
+    RECORD_TITLE_BYTES,
+    RECORD_UNDO_SUFFIX,
+)
+from book_library.schemas import BookSchema
+
+RECORD_MAGIC = b"BOOKREC\x00"
+RECORD_VERSION = 1
+# magic, version, size of record, size of title and author fields
+HEADER = struct.Struct("<8sHHHH")
+EMPTY_ID = 0
+AVAILABLE = 1
+TITLE_OVERFLOW = 2
+AUTHOR_OVERFLOW = 4
+OVERFLOW_OFFSET = struct.Struct("<Q")
+# records read at once by scan of file
+SCAN_CHUNK = 4096
+# sizes of records file and overflow file before change
+UNDO_HEADER = struct.Struct("<QQ")
+# position and length of old bytes following the entry
+UNDO_ENTRY = struct.Struct("<QI")
+
+# count of changes, size of records file and size of overflow file
+Savepoint = tuple[int, int, int]
+
+
+def record_struct(title_bytes: int, author_bytes: int) -> struct.Struct:
+    """Get layout of record: id, year, flags, lengths of strings and
+    fields of title and author."""
+    return struct.Struct(f"<qqB3xII{title_bytes}s{author_bytes}s")
+
+
+def overflow_path(path_file: Path) -> Path:
+    return path_file.with_name(path_file.name + RECORD_OVERFLOW_SUFFIX)
+
+
+def undo_path(path_file: Path) -> Path:
+    return path_file.with_name(path_file.name + RECORD_UNDO_SUFFIX)
+
+
+def _open(path_file: Path) -> IO[bytes]:
+    """Open file for reading and writing, create it if it is missing."""
+    fd = os.open(
+        path_file, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644
+    )
+    return os.fdopen(fd, mode="r+b", buffering=0)
+
+
+def _sync_directory(path_dir: Path) -> None:
+    """Sync entries of directory, so new file is found after crash,
+    directory can not be opened for sync on Windows."""
+    if os.name == "nt":
+        return
+    fd = os.open(path_dir, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _size(file: IO[bytes]) -> int:
+    return os.fstat(file.fileno()).st_size
+
+
+def write_records(path_file: Path, books: Iterable[BookSchema]) -> None:
+    """Write books in new file of records and replace old file with it."""
+    path_tmp = path_file.with_name(f"{path_file.name}.{os.getpid()}.tmp")
+    try:
+        records = RecordFile(path_tmp)
+        try:
+            records.write_many(books)
+            records.commit()
+        except ValueError as error:
+            logging.error(f"Файл записей {path_file.name} не записан: {error}")
+            raise
+        finally:
+            records.close()
+        os.replace(undo_path(path_tmp), undo_path(path_file))
+        os.replace(overflow_path(path_tmp), overflow_path(path_file))
+        os.replace(path_tmp, path_file)
+    finally:
+        path_tmp.unlink(missing_ok=True)
+        overflow_path(path_tmp).unlink(missing_ok=True)
+        undo_path(path_tmp).unlink(missing_ok=True)
+
+
+class RecordFile:
+    """Records of books in file with position computed from book id.
+
+    Records changed in place are kept in memory until commit, records
+    after the end of file are appended at once, so rollback forgets
+    changed records and cuts length of files.
+    """
+
+    def __init__(self, path_file: Path):
+        self.path_file = path_file
+        self.__map: mmap.mmap | None = None
+        # new bytes of records changed in place by their positions and
+        # log of old values of them for rollback to savepoint
+        self.__changes: dict[int, bytes] = {}
+        self.__changes_log: list[tuple[int, bytes | None]] = []
+        self.__begin: Savepoint | None = None
+        self.__file = _open(path_file)
+        self.__overflow = _open(overflow_path(path_file))
+        undo_created = not undo_path(path_file).exists()
+        self.__undo = _open(undo_path(path_file))
+        try:
+            if undo_created:
+                _sync_directory(path_file.parent)
+            self.__read_header()
+            self.__recover()
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+        self.__file.close()
+        self.__overflow.close()
+        self.__undo.close()
+
+    def __read_header(self) -> None:
+        """Read sizes of fields from header, write header in new file."""
+        header = self.__file.read(HEADER.size)
+        if not header:
+            self.__title_bytes = RECORD_TITLE_BYTES
+            self.__author_bytes = RECORD_AUTHOR_BYTES
+            self.__record = record_struct(
+                self.__title_bytes, self.__author_bytes
+            )
+            self.__file.write(
+                HEADER.pack(
+                    RECORD_MAGIC,
+                    RECORD_VERSION,
+                    self.__record.size,
+                    self.__title_bytes,
+                    self.__author_bytes,
+                )
+            )
+            return
+        if len(header) < HEADER.size:
+            raise ValueError("Файл короче заголовка.")
+        magic, version, size, self.__title_bytes, self.__author_bytes = (
+            HEADER.unpack(header)
+        )
+        if magic != RECORD_MAGIC:
+            raise ValueError("Файл не является файлом записей книг.")
+        if version != RECORD_VERSION:
+            raise ValueError(f"Версия формата {version} не поддерживается.")
+        self.__record = record_struct(self.__title_bytes, self.__author_bytes)
+        if self.__record.size != size:
+            raise ValueError(f"Неверный размер записи {size}.")
+
+    @property
+    def slots(self) -> int:
+        """Number of records in file, including empty ones."""
+        return (_size(self.__file) - HEADER.size) // self.__record.size
+
+    def __mapping(self) -> mmap.mmap:
+        """Get memory map of the whole file, map it again if it grew."""
+        size = _size(self.__file)
+        if self.__map is None or len(self.__map) != size:
+            self.__unmap()
+            self.__map = mmap.mmap(self.__file.fileno(), size)
+        return self.__map
+
+    def __unmap(self) -> None:
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+
+    def __position(self, obj_id: int) -> int:
+        return HEADER.size + (obj_id - 1) * self.__record.size
+
+    def __read_string(self, field: bytes, length: int, overflow: int) -> str:
+        if not overflow:
+            return field[:length].decode()
+        self.__overflow.seek(OVERFLOW_OFFSET.unpack_from(field)[0])
+        return self.__overflow.read(length).decode()
+
+    def __to_book(self, fields: tuple) -> BookSchema | None:
+        obj_id, year, flags, title_length, author_length, title, author = (
+            fields
+        )
+        if obj_id == EMPTY_ID:
+            return None
+        return construct_book(
+            obj_id,
+            self.__read_string(title, title_length, flags & TITLE_OVERFLOW),
+            self.__read_string(author, author_length, flags & AUTHOR_OVERFLOW),
+            year,
+            bool(flags & AVAILABLE),
+        )
+
+    def read(self, obj_id: int) -> BookSchema | None:
+        """Read book by id from its record only."""
+        if not 1 <= obj_id <= self.slots:
+            return None
+        position = self.__position(obj_id)
+        data = self.__changes.get(position)
+        if data is not None:
+            return self.__to_book(self.__record.unpack(data))
+        return self.__to_book(
+            self.__record.unpack_from(self.__mapping(), position)
+        )
+
+    def read_chunk(self, first_id: int, count: int) -> list[BookSchema]:
+        """Read books of records from first id, empty ones are skipped."""
+        count = max(0, min(count, self.slots - first_id + 1))
+        start = self.__position(first_id)
+        end = start + count * self.__record.size
+        data = self.__mapping()[start:end]
+        if self.__changes:
+            data = bytearray(data)
+            positions = (
+                range(start, end, self.__record.size)
+                if len(self.__changes) > count
+                else self.__changes
+            )
+            for position in positions:
+                record = self.__changes.get(position)
+                if record is not None and start <= position < end:
+                    data[position - start : position - start + len(record)] = (
+                        record
+                    )
+        books = map(self.__to_book, self.__record.iter_unpack(data))
+        return [book for book in books if book is not None]
+
+    def __pack_string(self, value: str, size: int) -> tuple[bytes, bool]:
+        """Get bytes of field, append long string to overflow file."""
+        data = value.encode()
+        if len(data) <= size:
+            return data, False
+        self.__start()
+        self.__overflow.seek(0, os.SEEK_END)
+        offset = self.__overflow.tell()
+        self.__overflow.write(data)
+        return OVERFLOW_OFFSET.pack(offset), True
+
+    def __pack(self, book: BookSchema) -> bytes:
+        title, title_overflow = self.__pack_string(
+            book.title, self.__title_bytes
+        )
+        author, author_overflow = self.__pack_string(
+            book.author, self.__author_bytes
+        )
+        flags = (
+            AVAILABLE * book.availability
+            | TITLE_OVERFLOW * title_overflow
+            | AUTHOR_OVERFLOW * author_overflow
+        )
+        try:
+            return self.__record.pack(
+                book.id,
+                book.year,
+                flags,
+                len(book.title.encode()),
+                len(book.author.encode()),
+                title,
+                author,
+            )
+        except struct.error:
+            raise ValueError(f"Год {book.year} не помещается в запись.")
+
+    def savepoint(self) -> Savepoint:
+        """Get mark of changes for rollback of later changes only."""
+        return (
+            len(self.__changes_log),
+            _size(self.__file),
+            _size(self.__overflow),
+        )
+
+    def __start(self) -> None:
+        """Remember sizes of files before the first change in journal,
+        it is on disk before any appended byte."""
+        if self.__begin is not None:
+            return
+        self.__begin = self.savepoint()
+        self.__undo.seek(0)
+        self.__undo.truncate()
+        self.__undo.write(UNDO_HEADER.pack(*self.__begin[1:]))
+        os.fsync(self.__undo.fileno())
+
+    def __write_record(self, obj_id: int, data: bytes) -> None:
+        """Write record, record of file before change is kept in memory
+        until commit.
+
+        Record after the end of file is appended, records between
+        are left empty, so id must not be far after the end of file.
+        """
+        if obj_id < 1:
+            raise ValueError(f"Айди {obj_id} меньше 1.")
+        if obj_id > self.slots + RECORD_MAX_ID_GAP:
+            raise ValueError(
+                f"Айди {obj_id} больше последней записи {self.slots}"
+                f" больше чем на {RECORD_MAX_ID_GAP}."
+            )
+        self.__start()
+        position = self.__position(obj_id)
+        if position < self.__begin[1]:
+            self.__changes_log.append((position, self.__changes.get(position)))
+            self.__changes[position] = data
+            return
+        end = position + len(data)
+        if end <= _size(self.__file):
+            self.__mapping()[position:end] = data
+            return
+        self.__file.seek(position)
+        self.__file.write(data)
+
+    def write(self, book: BookSchema) -> None:
+        """Write book in its record, file grows for new ids."""
+        self.__write_record(book.id, self.__pack(book))
+
+    def write_many(self, books: Iterable[BookSchema]) -> None:
+        """Write books, records of new ids in a row are appended at once."""
+        first_id = 0
+        chunk: list[bytes] = []
+        for book in books:
+            if chunk and book.id == first_id + len(chunk):
+                chunk.append(self.__pack(book))
+                if len(chunk) < SCAN_CHUNK:
+                    continue
+            if chunk:
+                self.__write_record(first_id, b"".join(chunk))
+                if book.id == first_id + len(chunk) - 1:
+                    chunk = []
+                    continue
+                chunk = []
+            if book.id > self.slots:
+                first_id, chunk = book.id, [self.__pack(book)]
+            else:
+                self.write(book)
+        if chunk:
+            self.__write_record(first_id, b"".join(chunk))
+
+    def clear(self, obj_id: int) -> None:
+        """Mark record of book as empty."""
+        self.__write_record(obj_id, bytes(self.__record.size))
+
+    def commit(self) -> None:
+        """Write changed records on disk and clear journal.
+
+        Old bytes of records changed in place are written to journal
+        and synced before the records, so crash in the middle of
+        commit is rolled back on the next open.
+        """
+        if self.__begin is None:
+            return
+        if self.__changes:
+            mapping = self.__mapping()
+            self.__undo.seek(0, os.SEEK_END)
+            self.__undo.write(
+                b"".join(
+                    UNDO_ENTRY.pack(position, len(data))
+                    + mapping[position : position + len(data)]
+                    for position, data in self.__changes.items()
+                )
+            )
+            os.fsync(self.__undo.fileno())
+            for position, data in self.__changes.items():
+                mapping[position : position + len(data)] = data
+        if self.__map is not None:
+            self.__map.flush()
+        os.fsync(self.__file.fileno())
+        os.fsync(self.__overflow.fileno())
+        self.__clear_journal()
+
+    def __clear_journal(self) -> None:
+        """Cut journal on disk, old entries left after crash would roll
+        back change already written."""
+        self.__undo.truncate(0)
+        os.fsync(self.__undo.fileno())
+        self.__changes = {}
+        self.__changes_log = []
+        self.__begin = None
+
+    def __truncate(self, size: int, overflow_size: int) -> None:
+        """Cut records and strings appended after sizes of files."""
+        if _size(self.__file) > size:
+            self.__unmap()
+            self.__file.truncate(size)
+        if _size(self.__overflow) > overflow_size:
+            self.__overflow.truncate(overflow_size)
+
+    def rollback(self, savepoint: Savepoint | None = None) -> None:
+        """Forget records changed after savepoint and cut records and
+        strings appended after it, all changes since commit are rolled
+        back without savepoint."""
+        if savepoint is None:
+            if self.__begin is None:
+                return
+            self.__truncate(*self.__begin[1:])
+            os.fsync(self.__file.fileno())
+            os.fsync(self.__overflow.fileno())
+            self.__clear_journal()
+            return
+        count_changes, size, overflow_size = savepoint
+        while len(self.__changes_log) > count_changes:
+            position, data = self.__changes_log.pop()
+            if data is None:
+                del self.__changes[position]
+            else:
+                self.__changes[position] = data
+        self.__truncate(size, overflow_size)
+
+    def __recover(self) -> None:
+        """Roll back change interrupted by crash with journal left by it.
+
+        Journal shorter than its header was written before any change.
+        Old bytes are written back only for complete entries, because
+        records are changed only after all entries are synced.
+        """
+        journal = self.__undo.read()
+        if len(journal) < UNDO_HEADER.size:
+            self.__undo.truncate(0)
+            return
+        offset = UNDO_HEADER.size
+        while offset + UNDO_ENTRY.size <= len(journal):
+            position, length = UNDO_ENTRY.unpack_from(journal, offset)
+            offset += UNDO_ENTRY.size
+            data = journal[offset : offset + length]
+            if len(data) < length:
+                break
+            self.__file.seek(position)
+            self.__file.write(data)
+            offset += length
+        self.__truncate(*UNDO_HEADER.unpack_from(journal))
+        os.fsync(self.__file.fileno())
+        os.fsync(self.__overflow.fileno())
+        self.__undo.truncate(0)
+        os.fsync(self.__undo.fileno())
+        logging.warning(
+            f"Прерванное изменение файла {self.path_file.name} отменено."
+        )
@@ -0,0 +1,415 @@
+import logging
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from pydantic_core import ValidationError
+
+from book_library.base_repository import (
+    BaseRepositoryBook,
+    not_found_error,
+    order_books,
+)
+from book_library.constants import (
+    BATCH_FLUSH_CHANGES,
+    BATCH_FLUSH_SECONDS,
+    FULLTEXT_FIELDS,
+    IMPORT_BATCH_SIZE,
+    LOCK_SUFFIX,
+)
+from book_library.fulltext import FullTextIndex, tokenize
+from book_library.locking import FileLock
+from book_library.metrics import metrics
+from book_library.query import (
+    EqualPredicate,
+    IdRanges,
+    InPredicate,
+    Predicate,
+    RangePredicate,
+    SortOrder,
+)
+from book_library.record_file import SCAN_CHUNK, RecordFile
+from book_library.schemas import BookSchema, BookSchemaUpdate, BookStatsSchema
+from book_library.snapshot import books_adapter
+from book_library.stats import BookStats
+
+
+class RecordRepositoryBook(BaseRepositoryBook):
+    """CRUD operations for Book objects in file of fixed size records.
+
+    Books are not loaded in memory: book is read and changed by id in
+    its own record, search and statistics read records by chunks.
+    Every call writes its changes on disk on exit, error in call
+    restores old records.
+    """
+
+    __book_adapter = books_adapter
+
+    def __init__(self, path_file: Path):
+        self.path_json = path_file
+        self.__batch: tuple[int | None, float | None] | None = None
+        self.__batch_changes = 0
+        self.__flushed_at = time.monotonic()
+        self.lock = FileLock(path_file.with_name(path_file.name + LOCK_SUFFIX))
+        with self.lock:
+            try:
+                self.records = RecordFile(path_file)
+            except ValueError as error:
+                except_message = (
+                    f"Файл {path_file.name} имеет невалидные данные: {error}"
+                )
+                logging.error(except_message)
+                raise ValueError(except_message)
+        logging.info(f"Открыт файл записей {path_file.name}.")
+
+    def close(self) -> None:
+        self.records.close()
+
+    @contextmanager
+    def __read_lock(self) -> Iterator[None]:
+        """Take shared lock, so reader does not see half written record."""
+        self.lock.acquire(shared=True)
+        try:
+            yield
+        finally:
+            self.lock.release()
+
+    def __commit(self) -> None:
+        with metrics.span("flush"):
+            self.records.commit()
+        self.__batch_changes = 0
+        self.__flushed_at = time.monotonic()
+
+    def __auto_flush(self) -> None:
+        """Write changes of batch when policy limit of batch is reached."""
+        max_changes, max_seconds = self.__batch
+        self.__batch_changes += 1
+        if (
+            max_changes is not None and self.__batch_changes >= max_changes
+        ) or (
+            max_seconds is not None
+            and time.monotonic() - self.__flushed_at >= max_seconds
+        ):
+            self.__commit()
+
+    @contextmanager
+    def batch(
+        self,
+        max_changes: int | None = BATCH_FLUSH_CHANGES,
+        max_seconds: float | None = BATCH_FLUSH_SECONDS,
+    ) -> Iterator["RecordRepositoryBook"]:
+        """Keep file locked and write changes on disk once on exit.
+
+        Changes are written earlier when batch has max_changes calls
+        or max_seconds passed. Error in batch restores records changed
+        after the last write.
+        """
+        if self.__batch is not None:
+            yield self
+            return
+
+        with self.lock:
+            self.__batch = (max_changes, max_seconds)
+            self.__batch_changes = 0
+            self.__flushed_at = time.monotonic()
+            try:
+                yield self
+            except BaseException:
+                self.records.rollback()
+                raise
+            finally:
+                self.__batch = None
+            self.__commit()
+
+    def update_data_transaction(func):
+        """Decorator transaction for change of records."""
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            self: RecordRepositoryBook = args[0]
+
+            if self.__batch is not None:
+                savepoint = self.records.savepoint()
+                try:
+                    with metrics.span("mutation"):
+                        result = func(*args, **kwargs)
+                except BaseException:
+                    self.records.rollback(savepoint)
+                    raise
+                self.__auto_flush()
+                return result
+
+            with self.lock:
+                try:
+                    with metrics.span("mutation"):
+                        result = func(*args, **kwargs)
+                except BaseException:
+                    self.records.rollback()
+                    raise
+                self.__commit()
+                return result
+
+        return wrapper
+
+    def __scan(self) -> Iterator[BookSchema]:
+        """Iterate all books, lock is taken for every chunk of records."""
+        first_id = 1
+        while True:
+            with self.__read_lock():
+                if first_id > self.records.slots:
+                    return
+                books = self.records.read_chunk(first_id, SCAN_CHUNK)
+            yield from books
+            first_id += SCAN_CHUNK
+
+    def iter_all(
+        self,
+        offset: int = 0,
+        limit: int | None = None,
+        order: SortOrder | None = None,
+    ) -> Iterator[BookSchema]:
+        """Iterate page of books reading records by chunks."""
+        return order_books(self.__scan(), order, offset, limit)
+
+    def __read(self, obj_id: Any) -> BookSchema | None:
+        """Read book of id from its record, id may be passed as string
+        of number like in json storage, any other value is no id."""
+        try:
+            number = int(obj_id)
+        except (TypeError, ValueError):
+            return None
+        if str(number) != str(obj_id):
+            return None
+        with self.__read_lock():
+            return self.records.read(number)
+
+    def get(self, obj_id: int) -> BookSchema:
+        """Get book for id reading only its record."""
+        book = self.__read(obj_id)
+        if book is None:
+            raise not_found_error([EqualPredicate("id", obj_id)], None)
+        return book
+
+    def get_many(self, obj_ids: Iterable[int]) -> list[BookSchema]:
+        """Get books for all ids reading only their records, ranges of
+        ids are cut by the last record and read by chunks."""
+        if not isinstance(obj_ids, IdRanges):
+            books = map(self.__read, sorted(set(obj_ids)))
+            return [book for book in books if book is not None]
+        found_books: list[BookSchema] = []
+        for part in obj_ids.ranges:
+            first_id = max(part.start, 1)
+            while first_id < part.stop:
+                with self.__read_lock():
+                    if first_id > self.records.slots:
+                        break
+                    found_books.extend(
+                        self.records.read_chunk(
+                            first_id, min(SCAN_CHUNK, part.stop - first_id)
+                        )
+                    )
+                first_id += SCAN_CHUNK
+        return found_books
+
+    @update_data_transaction
+    def create(self, **kwargs) -> BookSchema:
+        """Create book in record after the last one."""
+        book_new_obj = BookSchema(id=self.records.slots + 1, **kwargs)
+        self.records.write(book_new_obj)
+
+        logging.info(f"Создана книга {book_new_obj}.")
+        return book_new_obj
+
+    @update_data_transaction
+    def create_many(
+        self, books_data: Iterable[dict[str, Any]]
+    ) -> list[BookSchema]:
+        """Create books from many records in one transaction.
+
+        Invalid record restores file with all written books.
+        """
+        next_id = self.records.slots + 1
+        new_books: list[BookSchema] = []
+        batch: list[dict[str, Any]] = []
+        for number, book_data in enumerate(books_data):
+            batch.append({**book_data, "id": next_id + number})
+            if len(batch) == IMPORT_BATCH_SIZE:
+                new_books.extend(self.__insert_batch(batch, len(new_books)))
+                batch = []
+        if batch:
+            new_books.extend(self.__insert_batch(batch, len(new_books)))
+
+        logging.info(f"Создано {len(new_books)} книг.")
+        return new_books
+
+    def __insert_batch(
+        self, batch: list[dict[str, Any]], offset: int
+    ) -> list[BookSchema]:
+        """Validate and write batch, report number of invalid record."""
+        try:
+            books = self.__book_adapter.validate_python(batch)
+        except ValidationError as error:
+            number = offset + error.errors()[0]["loc"][0] + 1
+            except_message = (
+                f"Запись {number} имеет невалидные данные: {error.errors()[0]}"
+            )
+            logging.error(except_message)
+            raise ValueError(except_message)
+        self.records.write_many(books)
+        return books
+
+    @update_data_transaction
+    def update(self, obj_id: int, **kwargs) -> BookSchema:
+        """Update book in place of its record."""
+        obj_db = self.get(obj_id)
+
+        obj_update = BookSchemaUpdate(**kwargs)
+        obj_update_data = obj_update.model_dump(exclude_none=True)
+        obj_db = obj_db.model_copy(update=obj_update_data)
+        self.records.write(obj_db)
+
+        logging.info(f"Изменена книга id {obj_id} поля {obj_update_data}.")
+        return obj_db
+
+    @update_data_transaction
+    def update_many(self, predicates: list[Predicate], **kwargs) -> int:
+        """Update all books matching predicates with one write.
+
+        Returns count of updated books.
+        """
+        obj_update = BookSchemaUpdate(**kwargs)
+        obj_update_data = obj_update.model_dump(exclude_none=True)
+        books = list(self.iter_search(predicates))
+        for obj_db in books:
+            self.records.write(obj_db.model_copy(update=obj_update_data))
+
+        logging.info(
+            f"Изменено {len(books)} книг по условиям {predicates}"
+            f" поля {obj_update_data}."
+        )
+        return len(books)
+
+    @update_data_transaction
+    def remove(self, obj_id: int) -> None:
+        """Delete book marking its record empty."""
+        self.records.clear(self.get(obj_id).id)
+        logging.info(f"Книга под id {obj_id} удалена.")
+
+    @update_data_transaction
+    def remove_many(self, predicates: list[Predicate]) -> int:
+        """Delete all books matching predicates with one write.
+
+        Returns count of deleted books.
+        """
+        books = list(self.iter_search(predicates))
+        for book in books:
+            self.records.clear(book.id)
+
+        logging.info(f"Удалено {len(books)} книг по условиям {predicates}.")
+        return len(books)
+
+    def stats(self) -> BookStatsSchema:
+        """Count books reading all records, counters are not stored."""
+        stats = BookStats()
+        stats.build(self.__scan())
+        return stats.summary()
+
+    @metrics.span("lookup")
+    def __get_candidates(
+        self, predicates: list[Predicate]
+    ) -> tuple[Iterable[BookSchema], list[Predicate]]:
+        """Read records of ids of id predicate or scan all records."""
+        for predicate in predicates:
+            if predicate.field != "id" or isinstance(
+                predicate, RangePredicate
+            ):
+                continue
+            rest_predicates = [
+                predicate_
+                for predicate_ in predicates
+                if predicate_ is not predicate
+            ]
+            if isinstance(predicate, InPredicate):
+                return self.get_many(predicate.values), rest_predicates
+            try:
+                obj_id = int(predicate.arg)
+            except (TypeError, ValueError):
+                return [], rest_predicates
+            return self.get_many([obj_id]), predicates
+        return self.__scan(), predicates
+
+    @staticmethod
+    def __filter(
+        candidates: Iterable[BookSchema], predicates: list[Predicate]
+    ) -> Iterator[BookSchema]:
+        """Check candidates, count checked and matched books."""
+        count_scanned = count_matched = 0
+        try:
+            for book in candidates:
+                count_scanned += 1
+                if all(predicate.match(book) for predicate in predicates):
+                    count_matched += 1
+                    yield book
+        finally:
+            metrics.count("records.scanned", count_scanned)
+            metrics.count("records.matched", count_matched)
+
+    def __text_search(
+        self,
+        query: str,
+        fields: Iterable[str] | None,
+        predicates: list[Predicate],
+    ) -> list[BookSchema]:
+        """Select books with all words in scan and rank them by match."""
+        fields = tuple(fields or FULLTEXT_FIELDS)
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        def has_tokens(book: BookSchema) -> bool:
+            texts = [
+                " ".join(tokenize(getattr(book, field))) for field in fields
+            ]
+            return all(
+                any(token in text for text in texts) for token in tokens
+            )
+
+        candidates = {
+            book.id: book
+            for book in self.__filter(*self.__get_candidates(predicates))
+            if has_tokens(book)
+        }
+        index = FullTextIndex(FULLTEXT_FIELDS)
+        index.build(candidates.values())
+        return [candidates[obj_id] for obj_id in index.search(query, fields)]
+
+    def full_text_search(
+        self, query: str, fields: Iterable[str] | None = None
+    ) -> list[BookSchema]:
+        """Get books with all query words in text fields ranked by match."""
+        return self.__text_search(query, fields, [])
+
+    def iter_search(
+        self,
+        predicates: list[Predicate],
+        text: str | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+        order: SortOrder | None = None,
+    ) -> Iterator[BookSchema]:
+        """Iterate page of books matching predicates and full text query."""
+        if text is not None:
+            return order_books(
+                self.__text_search(text, None, predicates),
+                order,
+                offset,
+                limit,
+            )
+        return order_books(
+            self.__filter(*self.__get_candidates(predicates)),
+            order,
+            offset,
+            limit,
+        )
@@ -1,57 +1,414 @@
 import logging
+import time
+from contextlib import contextmanager
 from functools import wraps
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator, MutableMapping
 
-from pydantic import TypeAdapter
 from pydantic_core import ValidationError
 
-from book_library.schemas import BookSchema, BookSchemaUpdate
+from book_library.base_repository import (
+    BaseRepositoryBook,
+    order_books,
+    paginate,
+)
+from book_library.columnar import ColumnarBookStore
+from book_library.constants import (
+    BATCH_FLUSH_CHANGES,
+    BATCH_FLUSH_SECONDS,
+    BINARY_SNAPSHOT_SUFFIX,
+    FULLTEXT_FIELDS,
+    FULLTEXT_SUFFIX,
+    IMPORT_BATCH_SIZE,
+    JOURNAL_COMPACT_THRESHOLD,
+    JOURNAL_OP_CREATE,
+    JOURNAL_OP_NEXT_ID,
+    JOURNAL_OP_REMOVE,
+    JOURNAL_OP_UPDATE,
+    JOURNAL_SUFFIX,
+    JSON_INDENT,
+    JSONL_SNAPSHOT_SUFFIX,
+    LOCK_SUFFIX,
+    SNAPSHOT_CACHE,
+    SNAPSHOT_CACHE_SUFFIX,
+)
+from book_library.fulltext import FullTextIndex
+from book_library.indexes import FIELD_INDEXES, HashIndex, SortedIndex
+from book_library.journal import Journal
+from book_library.locking import FileLock
+from book_library.metrics import metrics
+from book_library.query import (
+    IdRanges,
+    InPredicate,
+    Predicate,
+    RangePredicate,
+    SortOrder,
+    plan_query,
+)
+from book_library.schemas import BookSchema, BookSchemaUpdate, BookStatsSchema
+from book_library.snapshot import (
+    books_adapter,
+    invalid_snapshot_error,
+    iter_snapshot,
+    read_binary_snapshot,
+    read_jsonl_parallel,
+    read_snapshot_cache,
+    snapshot_key,
+    write_snapshot,
+    write_snapshot_cache,
+)
+from book_library.stats import BookStats
 
 
-class RepositoryBook:
-    """Base CRUD operations for Book objects."""
+class RepositoryBook(BaseRepositoryBook):
+    """Base CRUD operations for Book objects in json file."""
 
-    __book_adapter = TypeAdapter(list[BookSchema])
+    __book_adapter = books_adapter
 
-    def __init__(self, path_json: Path):
+    def __init__(
+        self,
+        path_json: Path,
+        journal: bool = False,
+        columnar: bool = False,
+        indent: int | None = JSON_INDENT,
+        cache: bool = SNAPSHOT_CACHE,
+    ):
         self.path_json = self.__get_or_create_json(path_json)
-        self.data = self.__get_data()
+        self.journal_mode = journal
+        self.journal = Journal(
+            self.path_json.with_name(self.path_json.name + JOURNAL_SUFFIX)
+        )
+        self.__changes: list[dict[str, Any]] = []
+        self.__indexes: dict[str, HashIndex | SortedIndex] = {}
+        self.path_fulltext = self.path_json.with_name(
+            self.path_json.name + FULLTEXT_SUFFIX
+        )
+        self.columnar = columnar
+        self.indent = indent
+        # binary snapshot is read by columns as fast as cache
+        self.cache = cache and path_json.suffix != BINARY_SNAPSHOT_SUFFIX
+        self.path_cache = self.path_json.with_name(
+            self.path_json.name + SNAPSHOT_CACHE_SUFFIX
+        )
+        self.__batch: tuple[int | None, float | None] | None = None
+        self.__flushed_at = time.monotonic()
+        self.lock = FileLock(
+            self.path_json.with_name(self.path_json.name + LOCK_SUFFIX)
+        )
+        self.lock.acquire(shared=True)
+        try:
+            self.__load()
+        finally:
+            self.lock.release()
+
+    @metrics.span("load")
+    def __load(self) -> None:
+        """Read snapshot and journal, drop indexes built for old data."""
+        self.__indexes = {}
+        self.__fulltext = None
+        self.__stats = BookStats()
+        self.books: MutableMapping[int, BookSchema] = self.__get_data()
+        self.__next_id = max(self.books, default=0) + 1
+        self.__replay_journal()
+        self.__stamp = self.__storage_stamp()
+
+    def __storage_version(self) -> int:
+        """Get counter of writes kept in lock file."""
+        try:
+            return int(self.lock.path_lock.read_text() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def __storage_stamp(self) -> tuple[int, ...]:
+        """Get version of snapshot and journal files written on disk.
+
+        Every write under lock increments counter in lock file, stat of
+        files catches changes of files made without the counter.
+        """
+        stat = self.path_json.stat()
+        return (
+            self.__storage_version(),
+            stat.st_ino,
+            stat.st_size,
+            stat.st_mtime_ns,
+            self.journal.size(),
+        )
 
     @property
     def __autoincrement_id(self) -> int:
         """Property method for unique id in objects."""
-        if not self.data:
-            return 1
-        ids = map(lambda book: book.id, self.data)
-        return max(ids) + 1
+        return self.__next_id
 
     def __get_or_create_json(self, path_file: Path) -> Path:
         """Private method for check or create json file."""
         if not path_file.is_file():
-            with open(path_file, mode="w", encoding="utf-8"):
+            # append mode never truncates file created by other process
+            with open(path_file, mode="a", encoding="utf-8"):
                 logging.info(f"Создан json файл {path_file.name}.")
         return path_file
 
-    def __get_data(self) -> list[BookSchema]:
-        """Get data in json file."""
-        with open(self.path_json, mode="r", encoding="utf-8") as json_file:
-            json_data = json_file.read()
-            if not json_data:
-                return []
+    def __get_data(self) -> MutableMapping[int, BookSchema]:
+        """Get data in json file indexed by book id and count books.
 
-            try:
-                obj_data = self.__book_adapter.validate_json(json_data)
-            except ValidationError:
-                except_message = (
-                    f"Файл {self.path_json.name} в корне проекта имеет"
-                    " невалидные данные, получение данных из него невозможно,"
-                    " пожалуйста перенесите его в другое место."
+        Unchanged snapshot is read from cache without validation,
+        counters of books are read from the same cache.
+        """
+        if self.path_json.suffix == BINARY_SNAPSHOT_SUFFIX:
+            with metrics.span("load.validate"):
+                store, self.__stats = read_binary_snapshot(self.path_json)
+            if self.columnar:
+                return store
+            return {book.id: book for book in store.values()}
+
+        with metrics.span("load.cache"):
+            key = snapshot_key(self.path_json) if self.cache else None
+            cache_data = (
+                read_snapshot_cache(self.path_cache, key)
+                if self.cache
+                else None
+            )
+        if cache_data is not None:
+            store, self.__stats = cache_data
+            logging.info(f"Книги прочитаны из кэша {self.path_cache.name}.")
+            if self.columnar:
+                return store
+            return {book.id: book for book in store.values()}
+
+        books = ColumnarBookStore() if self.columnar else {}
+        with metrics.span("load.validate"):
+            store_data = (
+                read_jsonl_parallel(self.path_json)
+                if self.path_json.suffix == JSONL_SNAPSHOT_SUFFIX
+                else None
+            )
+            if store_data is not None:
+                books, self.__stats = store_data
+                if not self.columnar:
+                    books = {book.id: book for book in books.values()}
+            else:
+                for number, book in enumerate(
+                    iter_snapshot(self.path_json), 1
+                ):
+                    if book.id in books:
+                        raise invalid_snapshot_error(self.path_json, number)
+                    books[book.id] = book
+                    self.__stats.add(book)
+        if self.cache:
+            write_snapshot_cache(self.path_cache, key, books, self.__stats)
+        return books
+
+    @metrics.span("load.journal")
+    def __replay_journal(self) -> None:
+        """Apply journal records written after the last snapshot."""
+        for record in self.journal.replay():
+            operation = record["op"]
+            if operation in (JOURNAL_OP_CREATE, JOURNAL_OP_UPDATE):
+                book = BookSchema.model_validate(record["book"])
+                self.__discard_stats(book.id)
+                self.books[book.id] = book
+                self.__stats.add(book)
+                self.__next_id = max(self.__next_id, book.id + 1)
+            elif operation == JOURNAL_OP_REMOVE:
+                self.__discard_stats(record["id"])
+                self.books.pop(record["id"], None)
+            elif operation == JOURNAL_OP_NEXT_ID:
+                self.__next_id = max(self.__next_id, record["id"])
+        if self.journal:
+            logging.info(
+                f"Из журнала применено {len(self.journal)} изменений."
+            )
+
+    def __discard_stats(self, obj_id: int) -> None:
+        """Uncount stored book with id if it exists."""
+        book = self.books.get(obj_id)
+        if book is not None:
+            self.__stats.discard(book)
+
+    def __get_index(self, field: str) -> HashIndex | SortedIndex | None:
+        """Get secondary index for field, build it on first use."""
+        if field not in FIELD_INDEXES:
+            return None
+        if field not in self.__indexes:
+            index = FIELD_INDEXES[field](field)
+            with metrics.span("index.build"):
+                index.build(self.books.values())
+            self.__indexes[field] = index
+            logging.info(f"Построен индекс по полю {field}.")
+        return self.__indexes[field]
+
+    def __fulltext_stamp(self) -> dict[str, Any]:
+        """Get stamp of snapshot and journal state books in memory were
+        read from, stamp of files on disk may be newer."""
+        _, inode, size, mtime_ns, journal_offset = self.__stamp
+        return {
+            "snapshot": [inode, size, mtime_ns],
+            "journal_offset": journal_offset,
+        }
+
+    def __load_fulltext(self) -> FullTextIndex | None:
+        """Load saved full text index and apply journal written after it."""
+        loaded = FullTextIndex.load(self.path_fulltext, FULLTEXT_FIELDS)
+        if loaded is None:
+            return None
+        index, stamp = loaded
+        current_stamp = self.__fulltext_stamp()
+        if (
+            stamp["snapshot"] != current_stamp["snapshot"]
+            or stamp["journal_offset"] > current_stamp["journal_offset"]
+        ):
+            return None
+
+        for record in self.journal.records_from(stamp["journal_offset"]):
+            if record["op"] == JOURNAL_OP_REMOVE:
+                index.discard(record["id"])
+            elif record["op"] != JOURNAL_OP_NEXT_ID:
+                index.add(BookSchema.model_validate(record["book"]))
+        return index
+
+    def __get_fulltext(self) -> FullTextIndex:
+        """Get full text index, build and save it if saved one is stale.
+
+        Books are reread under lock before index is loaded or saved,
+        so saved index matches its stamp. Index of batch with changes
+        not written yet is built from memory and is not saved.
+        """
+        if self.__fulltext is not None:
+            return self.__fulltext
+        with self.lock:
+            written = not self.__changes
+            if written:
+                self.__refresh()
+            index = self.__load_fulltext() if written else None
+            if index is None:
+                index = FullTextIndex(FULLTEXT_FIELDS)
+                with metrics.span("index.build"):
+                    index.build(self.books.values())
+                if written:
+                    index.save(self.path_fulltext, self.__fulltext_stamp())
+                logging.info("Построен полнотекстовый индекс.")
+            self.__fulltext = index
+        return self.__fulltext
+
+    def __index_book(self, book: BookSchema) -> None:
+        self.__stats.add(book)
+        for index in self.__indexes.values():
+            index.add(book)
+        if self.__fulltext is not None:
+            self.__fulltext.add(book)
+
+    def __unindex_book(self, book: BookSchema) -> None:
+        self.__stats.discard(book)
+        for index in self.__indexes.values():
+            index.discard(book)
+        if self.__fulltext is not None:
+            self.__fulltext.discard(book.id)
+
+    def __log_change(self, operation: str, **payload: Any) -> None:
+        """Remember mutation for the next write in storage."""
+        self.__changes.append({"op": operation, **payload})
+
+    def __write_snapshot(self) -> None:
+        """Rewrite json file with all books.
+
+        Cache is written with hash of written bytes, books kept in
+        dict are not put in columns for it on every write, cache of
+        such snapshot is written on the next load.
+        """
+        digest = write_snapshot(self.path_json, self.iter_all(), self.indent)
+        if self.cache and isinstance(self.books, ColumnarBookStore):
+            write_snapshot_cache(
+                self.path_cache,
+                snapshot_key(self.path_json, digest),
+                self.books,
+                self.__stats,
+            )
+        logging.info(f"В json перезаписано {len(self.books)} элементов.")
+
+    def compact(self) -> None:
+        """Fold journal records in json snapshot."""
+        with self.lock:
+            self.__write_snapshot()
+            # ids of removed books after the last one are not in snapshot,
+            # counter of ids is kept in journal for them
+            next_id_records = (
+                [{"op": JOURNAL_OP_NEXT_ID, "id": self.__next_id}]
+                if self.__next_id > max(self.books, default=0) + 1
+                else []
+            )
+            self.journal.clear(next_id_records)
+            self.__stamp = self.__storage_stamp()
+            if self.__fulltext is not None:
+                self.__fulltext.save(
+                    self.path_fulltext, self.__fulltext_stamp()
                 )
-                logging.error(except_message)
-                raise ValueError(except_message)
 
-        return obj_data
+    def __refresh(self) -> None:
+        """Reload data if other process changed storage files."""
+        if self.__stamp != self.__storage_stamp():
+            logging.info(
+                f"Файл {self.path_json.name} изменен другим "
+                "процессом, данные перечитаны."
+            )
+            self.__load()
+
+    @metrics.span("flush")
+    def __flush(self) -> None:
+        """Write changes remembered since the last write in storage."""
+        changes, self.__changes = self.__changes, []
+        self.__flushed_at = time.monotonic()
+        if not changes:
+            return
+        self.lock.path_lock.write_text(str(self.__storage_version() + 1))
+        if not self.journal_mode:
+            self.compact()
+            return
+
+        self.journal.append(changes)
+        logging.info(f"В журнал записано {len(changes)} изменений.")
+        if len(self.journal) > max(JOURNAL_COMPACT_THRESHOLD, len(self.books)):
+            self.compact()
+        self.__stamp = self.__storage_stamp()
+
+    def __auto_flush(self) -> None:
+        """Write changes of batch when policy limit of batch is reached."""
+        max_changes, max_seconds = self.__batch
+        if (
+            max_changes is not None and len(self.__changes) >= max_changes
+        ) or (
+            max_seconds is not None
+            and time.monotonic() - self.__flushed_at >= max_seconds
+        ):
+            self.__flush()
+
+    @contextmanager
+    def batch(
+        self,
+        max_changes: int | None = BATCH_FLUSH_CHANGES,
+        max_seconds: float | None = BATCH_FLUSH_SECONDS,
+    ) -> Iterator["RepositoryBook"]:
+        """Keep changes in memory and write them once on exit.
+
+        Storage stays locked for the whole batch. Changes are written
+        earlier when batch has max_changes of them or max_seconds passed
+        from the last write. Error in batch drops changes not written.
+        """
+        if self.__batch is not None:
+            yield self
+            return
+
+        with self.lock:
+            self.__refresh()
+            self.__batch = (max_changes, max_seconds)
+            self.__flushed_at = time.monotonic()
+            try:
+                yield self
+            except BaseException:
+                self.__changes = []
+                self.__load()
+                raise
+            finally:
+                self.__batch = None
+            self.__flush()
 
     def update_data_transaction(func):
         """Decorator transaction for change json file."""
@@ -60,76 +417,269 @@ class RepositoryBook:
         def wrapper(*args, **kwargs):
             self: RepositoryBook = args[0]
 
-            result = func(*args, **kwargs)
-            with open(self.path_json, mode="w", encoding="utf-8") as json_file:
-                json_data = self.__book_adapter.dump_json(
-                    self.data, indent=4
-                ).decode()
-                json_file.write(json_data)
+            if self.__batch is not None:
+                with metrics.span("mutation"):
+                    result = func(*args, **kwargs)
+                self.__auto_flush()
+                return result
 
-                logging.info(
-                    f"В json перезаписано {len(self.data)} элементов."
-                )
-            return result
+            with self.lock:
+                self.__refresh()
+                try:
+                    with metrics.span("mutation"):
+                        result = func(*args, **kwargs)
+                except BaseException:
+                    self.__changes = []
+                    raise
+                self.__flush()
+                return result
 
         return wrapper
 
-    def get(self, obj_id: int) -> BookSchema | list[BookSchema]:
-        """Get book model for id or category."""
-        return self.get_obj_for_field_arg("id", obj_id, False)
+    def iter_all(
+        self,
+        offset: int = 0,
+        limit: int | None = None,
+        order: SortOrder | None = None,
+    ) -> Iterator[BookSchema]:
+        """Iterate page of books without copy of all books in list.
 
-    def get_all(self) -> list[BookSchema]:
-        return self.data
+        Order field with sorted index is read in order of index, other
+        fields are sorted or selected with heap. Page with limit does
+        not build missing index, all books are sorted at the same cost
+        as sorted index is built.
+        """
+        if order is None:
+            return paginate(self.books.values(), offset, limit)
+        if limit is None and FIELD_INDEXES.get(order.field) is SortedIndex:
+            index = self.__get_index(order.field)
+        else:
+            index = self.__indexes.get(order.field)
+        if isinstance(index, SortedIndex):
+            obj_ids = index.iter_ids(order.descending)
+            return paginate(
+                (self.books[obj_id] for obj_id in obj_ids), offset, limit
+            )
+        return order_books(self.books.values(), order, offset, limit)
 
     @update_data_transaction
     def create(self, **kwargs) -> BookSchema:
         """Create book."""
         book_new_obj = BookSchema(id=self.__autoincrement_id, **kwargs)
-        self.data.append(book_new_obj)
+        self.__add_book(book_new_obj)
 
         logging.info(f"Создана книга {book_new_obj}.")
         return book_new_obj
 
     @update_data_transaction
-    def update(self, obj_id: int, **kwargs) -> BookSchema:
-        """Update book for id or other fields."""
-        obj_db = self.get(obj_id)
-        obj_data = obj_db.model_dump()
+    def create_many(
+        self, books_data: Iterable[dict[str, Any]]
+    ) -> list[BookSchema]:
+        """Create books from many records in one transaction.
 
-        obj_update = BookSchemaUpdate(**kwargs)
-        obj_update_data = obj_update.model_dump()
+        Records are validated in batches before any book is added,
+        so invalid record leaves repository unchanged.
+        """
+        new_books: list[BookSchema] = []
+        batch: list[dict[str, Any]] = []
+        for number, book_data in enumerate(books_data):
+            batch.append({**book_data, "id": self.__autoincrement_id + number})
+            if len(batch) == IMPORT_BATCH_SIZE:
+                new_books.extend(self.__validate_batch(batch, len(new_books)))
+                batch = []
+        if batch:
+            new_books.extend(self.__validate_batch(batch, len(new_books)))
+
+        for book in new_books:
+            self.__add_book(book)
+
+        logging.info(f"Создано {len(new_books)} книг.")
+        return new_books
+
+    def __validate_batch(
+        self, batch: list[dict[str, Any]], offset: int
+    ) -> list[BookSchema]:
+        """Validate batch of records, report number of invalid record."""
+        try:
+            return self.__book_adapter.validate_python(batch)
+        except ValidationError as error:
+            number = offset + error.errors()[0]["loc"][0] + 1
+            except_message = (
+                f"Запись {number} имеет невалидные данные: {error.errors()[0]}"
+            )
+            logging.error(except_message)
+            raise ValueError(except_message)
 
+    def __add_book(self, book: BookSchema) -> None:
+        self.books[book.id] = book
+        self.__next_id = book.id + 1
+        self.__index_book(book)
+        self.__log_change(JOURNAL_OP_CREATE, book=book.model_dump())
+
+    def __update_book(
+        self, obj_db: BookSchema, obj_update_data: dict[str, Any]
+    ) -> BookSchema:
+        obj_data = obj_db.model_dump()
+        self.__unindex_book(obj_db)
         for field in obj_data:
             if field not in obj_update_data:
                 continue
             if obj_update_data.get(field) is not None:
                 setattr(obj_db, field, obj_update_data[field])
+        self.books[obj_db.id] = obj_db
+        self.__index_book(obj_db)
+        self.__log_change(JOURNAL_OP_UPDATE, book=obj_db.model_dump())
+        return obj_db
+
+    @update_data_transaction
+    def update(self, obj_id: int, **kwargs) -> BookSchema:
+        """Update book for id or other fields."""
+        obj_db = self.get(obj_id)
+
+        obj_update = BookSchemaUpdate(**kwargs)
+        obj_update_data = obj_update.model_dump()
+        self.__update_book(obj_db, obj_update_data)
 
         logging.info(f"Изменена книга id {obj_id} поля {obj_update_data}.")
         return obj_db
 
+    @update_data_transaction
+    def update_many(self, predicates: list[Predicate], **kwargs) -> int:
+        """Update all books matching predicates with one write.
+
+        Returns count of updated books.
+        """
+        obj_update = BookSchemaUpdate(**kwargs)
+        obj_update_data = obj_update.model_dump()
+        books = list(self.iter_search(predicates))
+        for obj_db in books:
+            self.__update_book(obj_db, obj_update_data)
+
+        logging.info(
+            f"Изменено {len(books)} книг по условиям {predicates}"
+            f" поля {obj_update_data}."
+        )
+        return len(books)
+
+    def __remove_book(self, book: BookSchema) -> None:
+        self.__unindex_book(book)
+        del self.books[book.id]
+        self.__log_change(JOURNAL_OP_REMOVE, id=book.id)
+
     @update_data_transaction
     def remove(self, obj_id: int) -> None:
         """Delete book for id or category."""
-        self.get_obj_for_field_arg("id", obj_id, False)
-        self.data = list(filter(lambda book: book.id != obj_id, self.data))
+        self.__remove_book(self.get(obj_id))
         logging.info(f"Книга под id {obj_id} удалена.")
 
-    def get_obj_for_field_arg(self, field: str, arg: Any, many: bool):
-        """Get book for keyword argument."""
-        filter_data = list(
-            filter(
-                lambda book: str(getattr(book, field)) == str(arg), self.data
+    @update_data_transaction
+    def remove_many(self, predicates: list[Predicate]) -> int:
+        """Delete all books matching predicates with one write.
+
+        Returns count of deleted books.
+        """
+        books = list(self.iter_search(predicates))
+        for book in books:
+            self.__remove_book(book)
+
+        logging.info(f"Удалено {len(books)} книг по условиям {predicates}.")
+        return len(books)
+
+    def __get_for_id(self, arg: Any) -> list[BookSchema]:
+        """Get book from id index without scan of all books."""
+        try:
+            book = self.books.get(int(arg))
+        except (TypeError, ValueError):
+            return []
+        if book is None or str(book.id) != str(arg):
+            return []
+        return [book]
+
+    def __get_for_ids(self, obj_ids: set[Any] | IdRanges) -> list[BookSchema]:
+        """Get books from id index for ids of set, set larger than
+        catalog is intersected with ids of catalog instead."""
+        if len(obj_ids) > len(self.books):
+            found_ids = sorted(
+                obj_id for obj_id in self.books if obj_id in obj_ids
             )
+        else:
+            found_ids = [
+                obj_id for obj_id in sorted(obj_ids) if obj_id in self.books
+            ]
+        return [self.books[obj_id] for obj_id in found_ids]
+
+    @metrics.span("lookup")
+    def __get_candidates(
+        self, predicates: list[Predicate], text: str | None
+    ) -> tuple[Iterable[BookSchema], list[Predicate]]:
+        """Get books for check by query plan and predicates left to check."""
+        if text is not None:
+            return self.full_text_search(text), predicates
+
+        for predicate in predicates:
+            if predicate.field != "id" or isinstance(
+                predicate, RangePredicate
+            ):
+                continue
+            rest_predicates = [
+                predicate_
+                for predicate_ in predicates
+                if predicate_ is not predicate
+            ]
+            if isinstance(predicate, InPredicate):
+                return self.__get_for_ids(predicate.values), rest_predicates
+            return self.__get_for_id(predicate.arg), rest_predicates
+
+        index_predicate, rest_predicates = plan_query(
+            predicates, self.__get_index
         )
+        if index_predicate is None:
+            return self.books.values(), rest_predicates
 
-        if not filter_data:
-            except_message = (
-                f"Элементы по полю: {field} и аргументу: {arg} не найдены."
-            )
-            logging.error(except_message)
-            raise ValueError(except_message)
+        index = self.__get_index(index_predicate.field)
+        obj_ids = index_predicate.lookup(index)
+        return (self.books[obj_id] for obj_id in obj_ids), rest_predicates
+
+    def stats(self) -> BookStatsSchema:
+        """Get counts of books by availability, author and year."""
+        return self.__stats.summary()
+
+    def full_text_search(
+        self, query: str, fields: Iterable[str] | None = None
+    ) -> list[BookSchema]:
+        """Get books with all query words in text fields ranked by match."""
+        obj_ids = self.__get_fulltext().search(query, fields)
+        return [self.books[obj_id] for obj_id in obj_ids]
+
+    def iter_search(
+        self,
+        predicates: list[Predicate],
+        text: str | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+        order: SortOrder | None = None,
+    ) -> Iterator[BookSchema]:
+        """Iterate page of books matching predicates and full text query.
+
+        Books are checked lazily, so first books of the page are ready
+        before the rest of candidates is checked.
+        """
+        candidates, rest_predicates = self.__get_candidates(predicates, text)
+        filter_data = self.__filter(candidates, rest_predicates)
+        return order_books(filter_data, order, offset, limit)
 
-        if many:
-            return filter_data
-        return filter_data[0]
+    @staticmethod
+    def __filter(
+        candidates: Iterable[BookSchema], predicates: list[Predicate]
+    ) -> Iterator[BookSchema]:
+        """Check candidates, count checked and matched books."""
+        count_scanned = count_matched = 0
+        try:
+            for book in candidates:
+                count_scanned += 1
+                if all(predicate.match(book) for predicate in predicates):
+                    count_matched += 1
+                    yield book
+        finally:
+            metrics.count("records.scanned", count_scanned)
+            metrics.count("records.matched", count_matched)
@@ -59,3 +59,23 @@ class BookSchemaUpdate(BaseModel):
 
     def __str__(self) -> str:
         return f"Book {self.title}"
+
+
+class BookStatsSchema(BaseModel):
+    """Pydantic schema for statistics of books."""
+
+    total: int = Field(
+        title="Всего книг",
+    )
+    available: int = Field(
+        title="Книг в наличии",
+    )
+    unavailable: int = Field(
+        title="Книг нет в наличии",
+    )
+    authors: dict[str, int] = Field(
+        title="Книг у автора",
+    )
+    years: dict[int, int] = Field(
+        title="Книг по году издания",
+    )
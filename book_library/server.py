@@ -0,0 +1,93 @@
+import json
+import logging
+import socket
+import socketserver
+from argparse import Namespace
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+
+from book_library.metrics import metrics
+
+if TYPE_CHECKING:
+    from book_library.base_repository import BaseRepositoryBook
+
+Handler = Callable[["BaseRepositoryBook", Namespace], None]
+
+
+class BookRequestHandler(socketserver.StreamRequestHandler):
+    """Run one CRUD command from json line and answer with its output."""
+
+    server: "BookServer"
+
+    def handle(self) -> None:
+        request = json.loads(self.rfile.readline())
+        crud = request["crud"]
+        namespace = Namespace(**request["args"])
+        logging.info(
+            f"Сервер получил команду {crud} с аргументами {namespace}"
+        )
+
+        output = StringIO()
+        with redirect_stdout(output):
+            handler = self.server.handlers.get(crud)
+            if handler is None:
+                print(f"Команда {crud} не поддерживается сервером.")
+            else:
+                try:
+                    handler(self.server.repository, namespace)
+                    if getattr(namespace, "profile", False):
+                        print(metrics.summary())
+                except Exception:
+                    logging.exception(f"Ошибка выполнения команды {crud}.")
+                    print(f"Ошибка выполнения команды {crud} на сервере.")
+
+        response = json.dumps({"output": output.getvalue()}) + "\n"
+        self.wfile.write(response.encode())
+
+
+class BookServer(socketserver.UnixStreamServer):
+    """Unix socket server keeping repository of books in memory."""
+
+    def __init__(
+        self,
+        path_socket: Path,
+        repository: "BaseRepositoryBook",
+        handlers: dict[str, Handler],
+    ):
+        self.repository = repository
+        self.handlers = handlers
+        path_socket.unlink(missing_ok=True)
+        super().__init__(str(path_socket), BookRequestHandler)
+
+
+def serve(
+    path_socket: Path,
+    repository: "BaseRepositoryBook",
+    handlers: dict[str, Handler],
+) -> None:
+    """Serve CRUD commands on unix socket until interrupt."""
+    if not hasattr(socket, "AF_UNIX"):
+        raise OSError("Режим сервера требует поддержки unix сокетов.")
+
+    with BookServer(path_socket, repository, handlers) as server:
+        logging.info(f"Сервер запущен на сокете {path_socket}.")
+        print(f"Сервер запущен на сокете {path_socket}.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logging.info("Сервер остановлен.")
+        finally:
+            path_socket.unlink(missing_ok=True)
+
+
+def send_request(path_socket: Path, crud: str, args: dict[str, Any]) -> str:
+    """Send CRUD command to server and get its output."""
+    request = json.dumps({"crud": crud, "args": args}, default=str) + "\n"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(path_socket))
+        client.sendall(request.encode())
+        with client.makefile("rb") as response_file:
+            response = json.loads(response_file.readline())
+    return response["output"]
@@ -0,0 +1,453 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import pickle
+import re
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from contextlib import contextmanager
+from itertools import repeat
+from pathlib import Path
+from typing import IO, Iterable, Iterator, MutableMapping
+
+from pydantic import TypeAdapter
+from pydantic_core import ValidationError
+
+from book_library.binary_snapshot import BinarySnapshot, write_binary
+from book_library.columnar import (
+    BitColumn,
+    ColumnarBookStore,
+    IntColumn,
+    StringColumn,
+    int_column,
+)
+from book_library.constants import (
+    BINARY_SNAPSHOT_SUFFIX,
+    JSON_INDENT,
+    JSONL_SNAPSHOT_SUFFIX,
+    LOAD_CHUNK_BYTES,
+    LOAD_WORKERS,
+    RECORD_FILE_SUFFIX,
+    STREAM_CHUNK_CHARS,
+)
+from book_library.metrics import metrics
+from book_library.record_file import write_records
+from book_library.schemas import BookSchema
+from book_library.stats import BookStats
+
+books_adapter = TypeAdapter(list[BookSchema])
+
+JSON_WHITESPACE = re.compile(r"[ \t\r\n]*")
+
+# cache is pickle of trusted local file, version changes with its layout
+SNAPSHOT_CACHE_VERSION = 3
+
+# books of part of snapshot: ids, years, availability and distinct
+# titles and authors with their codes in rows
+ChunkColumns = tuple[
+    IntColumn,
+    IntColumn,
+    bytes,
+    tuple[list[str], array],
+    tuple[list[str], array],
+]
+
+
+def invalid_snapshot_error(
+    path_file: Path, number: int | None, chunk: int | None = None
+) -> ValueError:
+    """Log and make error of invalid snapshot with number of record
+    and number of part validated in process."""
+    record_message = f" (запись {number})" if number is not None else ""
+    if chunk is not None:
+        record_message = f" (часть {chunk}, запись {number})"
+    except_message = (
+        f"Файл {path_file.name} в корне проекта имеет"
+        f" невалидные данные{record_message}, получение данных из него"
+        " невозможно, пожалуйста перенесите его в другое место."
+    )
+    logging.error(except_message)
+    return ValueError(except_message)
+
+
+def _iter_jsonl(path_file: Path) -> Iterator[BookSchema]:
+    """Validate json lines snapshot record by record."""
+    with open(path_file, mode="rb") as snapshot:
+        yield from _validate_jsonl_lines(path_file, snapshot)
+
+
+def _validate_jsonl_lines(
+    path_file: Path, snapshot: IO[bytes]
+) -> Iterator[BookSchema]:
+    for number, line in enumerate(snapshot, start=1):
+        if not line.strip():
+            continue
+        try:
+            book = BookSchema.model_validate_json(line)
+        except ValidationError:
+            raise invalid_snapshot_error(path_file, number)
+        yield book
+
+
+def _stream_json(path_file: Path, snapshot: IO[str]) -> Iterator[BookSchema]:
+    """Parse json array snapshot item by item reading file by chunks,
+    so first books are ready before the whole file is read."""
+    decoder = json.JSONDecoder()
+    buffer, position, number, opened = "", 0, 0, False
+    while True:
+        position = JSON_WHITESPACE.match(buffer, position).end()
+        if position == len(buffer):
+            chunk = snapshot.read(STREAM_CHUNK_CHARS)
+            if not chunk:
+                break
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        char = buffer[position]
+        if not opened:
+            if char != "[":
+                raise invalid_snapshot_error(path_file, None)
+            opened, position = True, position + 1
+            continue
+        if char == "]":
+            return
+        if char == "," and number:
+            position += 1
+            continue
+        try:
+            book_data, end = decoder.raw_decode(buffer, position)
+        except ValueError:
+            # item is cut by end of chunk or is not json
+            chunk = snapshot.read(STREAM_CHUNK_CHARS)
+            if not chunk:
+                raise invalid_snapshot_error(path_file, number + 1)
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        number += 1
+        try:
+            book = BookSchema.model_validate(book_data)
+        except ValidationError:
+            raise invalid_snapshot_error(path_file, number)
+        yield book
+        position = end
+    if opened:
+        raise invalid_snapshot_error(path_file, number + 1)
+
+
+def _iter_json(path_file: Path) -> Iterator[BookSchema]:
+    """Validate json array snapshot in one call."""
+    json_data = path_file.read_bytes()
+    if not json_data.strip():
+        return
+    try:
+        books = books_adapter.validate_json(json_data)
+    except ValidationError as error:
+        location = error.errors()[0]["loc"]
+        number = location[0] + 1 if location else None
+        raise invalid_snapshot_error(path_file, number)
+    yield from books
+
+
+def split_jsonl(path_file: Path, chunk_bytes: int) -> list[tuple[int, int]]:
+    """Split json lines file in ranges of bytes ending on end of line."""
+    size = path_file.stat().st_size
+    ranges = []
+    with open(path_file, mode="rb") as snapshot:
+        start = 0
+        while start < size:
+            snapshot.seek(start + chunk_bytes - 1)
+            snapshot.readline()
+            end = min(snapshot.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _validate_jsonl_chunk(
+    path_file: Path, start: int, end: int
+) -> tuple[ChunkColumns | None, int | None]:
+    """Validate part of json lines snapshot in worker process.
+
+    Every line is validated as one record, as _iter_jsonl does. Books
+    are sent back by arrays of columns, they are passed between
+    processes much faster than models. Invalid part returns number of
+    its first invalid line instead.
+    """
+    with open(path_file, mode="rb") as snapshot:
+        snapshot.seek(start)
+        lines = snapshot.read(end - start).split(b"\n")
+    books = []
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            books.append(BookSchema.model_validate_json(line))
+        except ValidationError:
+            return None, number
+    titles = StringColumn.from_strings([book.title for book in books])
+    authors = StringColumn.from_strings([book.author for book in books])
+    columns = (
+        int_column([book.id for book in books]),
+        int_column([book.year for book in books]),
+        bytes([book.availability for book in books]),
+        (titles.values, titles.codes),
+        (authors.values, authors.codes),
+    )
+    return columns, None
+
+
+def read_jsonl_parallel(
+    path_file: Path,
+    workers: int | None = LOAD_WORKERS,
+    chunk_bytes: int = LOAD_CHUNK_BYTES,
+) -> tuple[ColumnarBookStore, BookStats] | None:
+    """Validate parts of json lines snapshot in processes, join their
+    books by columns in order of file and count them.
+
+    None means that snapshot has one part or there is one core,
+    such snapshot is read by iter_snapshot.
+    """
+    ranges = split_jsonl(path_file, chunk_bytes)
+    workers = min(workers or os.cpu_count() or 1, len(ranges))
+    if workers < 2:
+        return None
+    from concurrent.futures import ProcessPoolExecutor
+
+    ids: list[int] = []
+    years: list[int] = []
+    availability = bytearray()
+    titles, authors = StringColumn(), StringColumn()
+    # first row of every part
+    chunk_rows: list[int] = []
+    executor = ProcessPoolExecutor(workers)
+    try:
+        results = executor.map(
+            _validate_jsonl_chunk, repeat(path_file), *zip(*ranges)
+        )
+        for chunk, (chunk_columns, line) in enumerate(results, start=1):
+            if chunk_columns is None:
+                with open(path_file, mode="rb") as snapshot:
+                    lines_before = snapshot.read(ranges[chunk - 1][0])
+                raise invalid_snapshot_error(
+                    path_file, lines_before.count(b"\n") + line, chunk
+                )
+            chunk_rows.append(len(ids))
+            ids.extend(chunk_columns[0])
+            years.extend(chunk_columns[1])
+            availability.extend(chunk_columns[2])
+            titles.extend(*chunk_columns[3])
+            authors.extend(*chunk_columns[4])
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+    store = ColumnarBookStore.from_columns(
+        int_column(ids),
+        int_column(years),
+        BitColumn.from_values(availability),
+        titles,
+        authors,
+    )
+    if len(store) != len(ids):
+        seen: set[int] = set()
+        for row, obj_id in enumerate(ids):
+            if obj_id in seen:
+                raise invalid_snapshot_error(
+                    path_file, row + 1, bisect_right(chunk_rows, row)
+                )
+            seen.add(obj_id)
+
+    stats = BookStats()
+    stats.total = len(ids)
+    stats.available = sum(availability)
+    stats.authors = {
+        authors.values[code]: count
+        for code, count in Counter(authors.codes).items()
+    }
+    stats.years = dict(Counter(years))
+    logging.info(
+        f"Файл {path_file.name} проверен по {len(ranges)} частям"
+        f" в {workers} процессах."
+    )
+    return store, stats
+
+
+def read_binary_snapshot(
+    path_file: Path,
+) -> tuple[ColumnarBookStore, BookStats]:
+    """Read books of binary snapshot by columns and count them.
+
+    Types of values are fixed by format, so books are not validated,
+    only structure of file is checked.
+    """
+    try:
+        with BinarySnapshot(path_file) as snapshot:
+            return snapshot.read()
+    except ValueError as error:
+        logging.error(f"Бинарный снимок {path_file.name}: {error}")
+        raise invalid_snapshot_error(path_file, None)
+
+
+def iter_snapshot(path_file: Path) -> Iterator[BookSchema]:
+    """Iterate validated books of snapshot file.
+
+    Json lines snapshot is read and validated one record at a time,
+    so books can be used before the whole file is read.
+    """
+    if path_file.suffix == JSONL_SNAPSHOT_SUFFIX:
+        return _iter_jsonl(path_file)
+    if path_file.suffix == BINARY_SNAPSHOT_SUFFIX:
+        return read_binary_snapshot(path_file)[0].values()
+    return _iter_json(path_file)
+
+
+def stream_snapshot(
+    path_file: Path, snapshot: IO[bytes]
+) -> Iterator[BookSchema]:
+    """Iterate validated books of open json or json lines snapshot
+    as file is read, unlike iter_snapshot json array is not validated
+    in one call."""
+    if path_file.suffix == JSONL_SNAPSHOT_SUFFIX:
+        return _validate_jsonl_lines(path_file, snapshot)
+    return _stream_json(path_file, io.TextIOWrapper(snapshot, "utf-8"))
+
+
+@contextmanager
+def atomic_write(path_file: Path, mode: str = "wb", **kwargs) -> Iterator[IO]:
+    """Write temp file and rename it over file only after full write.
+
+    Crash in the middle of writing leaves the old file untouched,
+    temp file name is unique for process writing it.
+    """
+    path_tmp = path_file.with_name(f"{path_file.name}.{os.getpid()}.tmp")
+    try:
+        with open(path_tmp, mode=mode, **kwargs) as file:
+            yield file
+            file.flush()
+            with metrics.span("fsync"):
+                os.fsync(file.fileno())
+        os.replace(path_tmp, path_file)
+    finally:
+        path_tmp.unlink(missing_ok=True)
+
+
+class _HashWriter:
+    """Writer to file which hashes written bytes on the way."""
+
+    def __init__(self, file: IO[bytes]):
+        self.file = file
+        self.hash = hashlib.blake2b()
+
+    def write(self, data: bytes) -> int:
+        self.hash.update(data)
+        return self.file.write(data)
+
+
+def write_snapshot(
+    path_file: Path,
+    books: Iterable[BookSchema],
+    indent: int | None = JSON_INDENT,
+) -> str | None:
+    """Rewrite snapshot file with all books in format chosen by suffix,
+    indent None writes compact json.
+
+    Returns hash of written file for snapshot_key, None for file
+    of records.
+    """
+    if path_file.suffix == RECORD_FILE_SUFFIX:
+        with metrics.span("serialize"):
+            write_records(path_file, books)
+        return None
+    with atomic_write(path_file) as file, metrics.span("serialize"):
+        snapshot = _HashWriter(file)
+        if path_file.suffix == JSONL_SNAPSHOT_SUFFIX:
+            for book in books:
+                snapshot.write(book.model_dump_json().encode() + b"\n")
+        elif path_file.suffix == BINARY_SNAPSHOT_SUFFIX:
+            write_binary(snapshot, books)
+        else:
+            snapshot.write(books_adapter.dump_json(list(books), indent=indent))
+    return snapshot.hash.hexdigest()
+
+
+def snapshot_key(
+    path_file: Path, digest: str | None = None
+) -> tuple[int, int, str]:
+    """Get size, modification time and hash of snapshot file.
+
+    Hash returned by write_snapshot is passed to not read just written
+    file again.
+    """
+    stat = path_file.stat()
+    if digest is None:
+        with open(path_file, mode="rb") as snapshot:
+            digest = hashlib.file_digest(snapshot, "blake2b").hexdigest()
+    return stat.st_size, stat.st_mtime_ns, digest
+
+
+def read_snapshot_cache(
+    path_cache: Path, key: tuple[int, int, str]
+) -> tuple[ColumnarBookStore, BookStats] | None:
+    """Read books and counters from cache of snapshot with the same key.
+
+    Books in cache were validated before writing, so they are not
+    validated again. None means that cache is missing, stale or was
+    written by code with other classes.
+    """
+    try:
+        with open(path_cache, mode="rb") as cache:
+            cache_data = pickle.load(cache)
+    except (
+        OSError,
+        pickle.UnpicklingError,
+        EOFError,
+        ValueError,
+        AttributeError,
+        ImportError,
+    ):
+        return None
+    if (
+        not isinstance(cache_data, dict)
+        or cache_data.get("version") != SNAPSHOT_CACHE_VERSION
+        or cache_data.get("key") != key
+    ):
+        return None
+    return cache_data["books"], cache_data["stats"]
+
+
+def write_snapshot_cache(
+    path_cache: Path,
+    key: tuple[int, int, str],
+    books: MutableMapping[int, BookSchema],
+    stats: BookStats,
+) -> None:
+    """Write validated books by columns and their counters in cache.
+
+    Cache only speeds up start, so error of its writing is logged
+    and books are used without cache.
+    """
+    try:
+        if not isinstance(books, ColumnarBookStore):
+            store = ColumnarBookStore()
+            for book in books.values():
+                store[book.id] = book
+            books = store
+        cache_data = {
+            "version": SNAPSHOT_CACHE_VERSION,
+            "key": key,
+            "books": books,
+            "stats": stats,
+        }
+        with atomic_write(path_cache) as cache:
+            pickle.dump(cache_data, cache, protocol=pickle.HIGHEST_PROTOCOL)
+    except (
+        OSError,
+        OverflowError,
+        TypeError,
+        ValueError,
+        pickle.PicklingError,
+    ) as error:
+        logging.warning(f"Кэш снимка {path_cache.name} не записан: {error}")
+        return
+    logging.info(f"Сохранен кэш снимка {path_cache.name}.")
@@ -0,0 +1,556 @@
+import json
+import logging
+import sqlite3
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from pydantic_core import ValidationError
+
+from book_library.base_repository import BaseRepositoryBook, order_books
+from book_library.columnar import construct_book
+from book_library.constants import (
+    BATCH_FLUSH_CHANGES,
+    BATCH_FLUSH_SECONDS,
+    FULLTEXT_FIELDS,
+    IMPORT_BATCH_SIZE,
+)
+from book_library.fulltext import FullTextIndex, tokenize
+from book_library.metrics import metrics
+from book_library.query import (
+    EqualPredicate,
+    IdRanges,
+    InPredicate,
+    Predicate,
+    RangePredicate,
+    SortOrder,
+)
+from book_library.schemas import BookSchema, BookSchemaUpdate, BookStatsSchema
+from book_library.snapshot import books_adapter
+
+BOOK_FIELDS = tuple(BookSchema.model_fields)
+SELECT_BOOKS = f"SELECT {', '.join(BOOK_FIELDS)} FROM books"
+# condition of predicate which no book can match
+FALSE_CONDITION = "0"
+
+CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    availability INTEGER NOT NULL
+)
+"""
+CREATE_INDEXES = tuple(
+    f"CREATE INDEX IF NOT EXISTS books_{field} ON books ({field})"
+    for field in BOOK_FIELDS
+    if field != "id"
+)
+
+# counts of books by value of field are kept in tables by triggers
+STATS_FIELDS = ("author", "year", "availability")
+CREATE_STATS_TABLES = tuple(
+    f"CREATE TABLE stats_{field} (value PRIMARY KEY, count INTEGER NOT NULL)"
+    for field in STATS_FIELDS
+)
+FILL_STATS_TABLES = tuple(
+    f"INSERT INTO stats_{field} SELECT {field}, COUNT(*) FROM books"
+    f" GROUP BY {field}"
+    for field in STATS_FIELDS
+)
+COUNT_NEW_BOOK = "".join(
+    f"INSERT INTO stats_{field} VALUES (NEW.{field}, 1)"
+    " ON CONFLICT (value) DO UPDATE SET count = count + 1;"
+    for field in STATS_FIELDS
+)
+UNCOUNT_OLD_BOOK = "".join(
+    f"UPDATE stats_{field} SET count = count - 1 WHERE value = OLD.{field};"
+    f"DELETE FROM stats_{field} WHERE value = OLD.{field} AND count = 0;"
+    for field in STATS_FIELDS
+)
+CREATE_STATS_TRIGGERS = (
+    "CREATE TRIGGER stats_insert AFTER INSERT ON books"
+    f" BEGIN {COUNT_NEW_BOOK} END",
+    "CREATE TRIGGER stats_delete AFTER DELETE ON books"
+    f" BEGIN {UNCOUNT_OLD_BOOK} END",
+    "CREATE TRIGGER stats_update AFTER UPDATE ON books"
+    f" BEGIN {COUNT_NEW_BOOK}{UNCOUNT_OLD_BOOK} END",
+)
+
+
+def fold_text(text: str) -> str:
+    """Case folded words of text for search of words in sqlite."""
+    return " ".join(tokenize(text))
+
+
+class SQLiteRepositoryBook(BaseRepositoryBook):
+    """CRUD operations for Book objects in sqlite database.
+
+    Books are not loaded in memory, every call runs own transaction
+    and search conditions are translated in sql query.
+    """
+
+    __book_adapter = books_adapter
+
+    def __init__(self, path_db: Path):
+        self.path_json = path_db
+        self.__batch: tuple[int | None, float | None] | None = None
+        self.__batch_changes = 0
+        self.__flushed_at = time.monotonic()
+        self.connection = sqlite3.connect(
+            path_db, isolation_level=None, check_same_thread=False
+        )
+        self.connection.create_function(
+            "fold", 1, fold_text, deterministic=True
+        )
+        self.connection.execute(CREATE_TABLE)
+        for create_index in CREATE_INDEXES:
+            self.connection.execute(create_index)
+        self.__create_stats()
+        logging.info(f"Открыта база sqlite {path_db.name}.")
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __create_stats(self) -> None:
+        """Create tables of counters and count books of older database."""
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            exists = self.connection.execute(
+                "SELECT 1 FROM sqlite_master"
+                " WHERE type = 'trigger' AND name = 'stats_insert'"
+            ).fetchone()
+            if not exists:
+                for statement in (
+                    *CREATE_STATS_TABLES,
+                    *FILL_STATS_TABLES,
+                    *CREATE_STATS_TRIGGERS,
+                ):
+                    self.connection.execute(statement)
+                logging.info("Созданы таблицы статистики книг.")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+    @staticmethod
+    def __to_book(row: tuple) -> BookSchema:
+        """Build book from stored row without validation."""
+        obj_id, title, author, year, availability = row
+        return construct_book(obj_id, title, author, year, bool(availability))
+
+    @staticmethod
+    def __to_row(book: BookSchema) -> tuple:
+        return tuple(getattr(book, field) for field in BOOK_FIELDS)
+
+    def __auto_flush(self) -> None:
+        """Commit changes of batch when policy limit of batch is reached."""
+        max_changes, max_seconds = self.__batch
+        self.__batch_changes += 1
+        if (
+            max_changes is not None and self.__batch_changes >= max_changes
+        ) or (
+            max_seconds is not None
+            and time.monotonic() - self.__flushed_at >= max_seconds
+        ):
+            self.connection.execute("COMMIT")
+            self.connection.execute("BEGIN IMMEDIATE")
+            self.__batch_changes = 0
+            self.__flushed_at = time.monotonic()
+
+    @contextmanager
+    def batch(
+        self,
+        max_changes: int | None = BATCH_FLUSH_CHANGES,
+        max_seconds: float | None = BATCH_FLUSH_SECONDS,
+    ) -> Iterator["SQLiteRepositoryBook"]:
+        """Run all changes in one transaction committed on exit.
+
+        Transaction is committed earlier when it has max_changes calls
+        or max_seconds passed. Error in batch rolls back changes.
+        """
+        if self.__batch is not None:
+            yield self
+            return
+
+        self.connection.execute("BEGIN IMMEDIATE")
+        self.__batch = (max_changes, max_seconds)
+        self.__batch_changes = 0
+        self.__flushed_at = time.monotonic()
+        try:
+            yield self
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        else:
+            self.connection.execute("COMMIT")
+        finally:
+            self.__batch = None
+
+    def update_data_transaction(func):
+        """Decorator transaction for change sqlite database."""
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            self: SQLiteRepositoryBook = args[0]
+
+            if self.__batch is not None:
+                self.connection.execute("SAVEPOINT change")
+                try:
+                    with metrics.span("mutation"):
+                        result = func(*args, **kwargs)
+                except BaseException:
+                    self.connection.execute("ROLLBACK TO change")
+                    raise
+                finally:
+                    self.connection.execute("RELEASE change")
+                self.__auto_flush()
+                return result
+
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                with metrics.span("mutation"):
+                    result = func(*args, **kwargs)
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            with metrics.span("flush"):
+                self.connection.execute("COMMIT")
+            return result
+
+        return wrapper
+
+    def __next_id(self) -> int:
+        """Get id of next book, ids of removed books are not reused."""
+        row = self.connection.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'books'"
+        ).fetchone()
+        return (row[0] if row else 0) + 1
+
+    def __query(
+        self,
+        where: str = "",
+        params: tuple = (),
+        offset: int = 0,
+        limit: int | None = None,
+        order: SortOrder | None = None,
+    ) -> Iterator[tuple]:
+        query = SELECT_BOOKS
+        if where:
+            query += f" WHERE {where}"
+        query += self.__order_by(order)
+        if offset or limit is not None:
+            # negative limit of sqlite means no limit
+            query += " LIMIT ? OFFSET ?"
+            params = (*params, -1 if limit is None else limit, offset)
+        with metrics.span("lookup"):
+            return self.connection.execute(query, params)
+
+    @staticmethod
+    def __order_by(order: SortOrder | None) -> str:
+        """Translate order in clause which uses index of field."""
+        if order is None:
+            return " ORDER BY id"
+        if order.field not in BOOK_FIELDS:
+            raise ValueError(f"Сортировка по полю {order.field} невозможна.")
+        direction = "DESC" if order.descending else "ASC"
+        return f" ORDER BY {order.field} {direction}, id {direction}"
+
+    def iter_all(
+        self,
+        offset: int = 0,
+        limit: int | None = None,
+        order: SortOrder | None = None,
+    ) -> Iterator[BookSchema]:
+        """Iterate page of books without copy of all books in list."""
+        return map(
+            self.__to_book,
+            self.__query(offset=offset, limit=limit, order=order),
+        )
+
+    def __insert(self, books: list[BookSchema]) -> None:
+        self.connection.executemany(
+            f"INSERT INTO books ({', '.join(BOOK_FIELDS)})"
+            f" VALUES ({', '.join('?' * len(BOOK_FIELDS))})",
+            map(self.__to_row, books),
+        )
+
+    @update_data_transaction
+    def create(self, **kwargs) -> BookSchema:
+        """Create book."""
+        book_new_obj = BookSchema(id=self.__next_id(), **kwargs)
+        self.__insert([book_new_obj])
+
+        logging.info(f"Создана книга {book_new_obj}.")
+        return book_new_obj
+
+    @update_data_transaction
+    def create_many(
+        self, books_data: Iterable[dict[str, Any]]
+    ) -> list[BookSchema]:
+        """Create books from many records in one transaction.
+
+        Invalid record rolls back transaction with all inserted books.
+        """
+        next_id = self.__next_id()
+        new_books: list[BookSchema] = []
+        batch: list[dict[str, Any]] = []
+        for number, book_data in enumerate(books_data):
+            batch.append({**book_data, "id": next_id + number})
+            if len(batch) == IMPORT_BATCH_SIZE:
+                new_books.extend(self.__insert_batch(batch, len(new_books)))
+                batch = []
+        if batch:
+            new_books.extend(self.__insert_batch(batch, len(new_books)))
+
+        logging.info(f"Создано {len(new_books)} книг.")
+        return new_books
+
+    def __insert_batch(
+        self, batch: list[dict[str, Any]], offset: int
+    ) -> list[BookSchema]:
+        """Validate and insert batch, report number of invalid record."""
+        try:
+            books = self.__book_adapter.validate_python(batch)
+        except ValidationError as error:
+            number = offset + error.errors()[0]["loc"][0] + 1
+            except_message = (
+                f"Запись {number} имеет невалидные данные: {error.errors()[0]}"
+            )
+            logging.error(except_message)
+            raise ValueError(except_message)
+        self.__insert(books)
+        return books
+
+    @update_data_transaction
+    def update(self, obj_id: int, **kwargs) -> BookSchema:
+        """Update book for id or other fields."""
+        obj_db = self.get(obj_id)
+
+        obj_update = BookSchemaUpdate(**kwargs)
+        obj_update_data = obj_update.model_dump(exclude_none=True)
+        if obj_update_data:
+            self.connection.execute(
+                "UPDATE books SET "
+                + ", ".join(f"{field} = ?" for field in obj_update_data)
+                + " WHERE id = ?",
+                (*obj_update_data.values(), obj_db.id),
+            )
+        obj_db = obj_db.model_copy(update=obj_update_data)
+
+        logging.info(f"Изменена книга id {obj_id} поля {obj_update_data}.")
+        return obj_db
+
+    @update_data_transaction
+    def update_many(self, predicates: list[Predicate], **kwargs) -> int:
+        """Update all books matching predicates with one query.
+
+        Returns count of updated books.
+        """
+        obj_update = BookSchemaUpdate(**kwargs)
+        obj_update_data = obj_update.model_dump(exclude_none=True)
+        where, params = self.__where(predicates)
+        query = "UPDATE books SET " + ", ".join(
+            f"{field} = ?" for field in obj_update_data
+        )
+        if where:
+            query += f" WHERE {where}"
+        if obj_update_data:
+            count_books = self.connection.execute(
+                query, (*obj_update_data.values(), *params)
+            ).rowcount
+        else:
+            count_books = self.__count(where, params)
+
+        logging.info(
+            f"Изменено {count_books} книг по условиям {predicates}"
+            f" поля {obj_update_data}."
+        )
+        return count_books
+
+    @update_data_transaction
+    def remove(self, obj_id: int) -> None:
+        """Delete book for id or category."""
+        self.connection.execute(
+            "DELETE FROM books WHERE id = ?", (self.get(obj_id).id,)
+        )
+        logging.info(f"Книга под id {obj_id} удалена.")
+
+    @update_data_transaction
+    def remove_many(self, predicates: list[Predicate]) -> int:
+        """Delete all books matching predicates with one query.
+
+        Returns count of deleted books.
+        """
+        where, params = self.__where(predicates)
+        query = "DELETE FROM books"
+        if where:
+            query += f" WHERE {where}"
+        count_books = self.connection.execute(query, params).rowcount
+
+        logging.info(f"Удалено {count_books} книг по условиям {predicates}.")
+        return count_books
+
+    def __count(self, where: str, params: tuple) -> int:
+        query = "SELECT COUNT(*) FROM books"
+        if where:
+            query += f" WHERE {where}"
+        return self.connection.execute(query, params).fetchone()[0]
+
+    def __counts(self, field: str) -> dict[Any, int]:
+        return dict(
+            self.connection.execute(
+                f"SELECT value, count FROM stats_{field} ORDER BY value"
+            )
+        )
+
+    def stats(self) -> BookStatsSchema:
+        """Get counts of books from tables kept by triggers."""
+        availability = self.__counts("availability")
+        available = availability.get(1, 0)
+        unavailable = availability.get(0, 0)
+        return BookStatsSchema.model_construct(
+            total=available + unavailable,
+            available=available,
+            unavailable=unavailable,
+            authors=self.__counts("author"),
+            years=self.__counts("year"),
+        )
+
+    @staticmethod
+    def __equal_condition(predicate: EqualPredicate) -> tuple[str, tuple]:
+        """Translate match of field value as string in sql condition."""
+        field, arg = predicate.field, str(predicate.arg)
+        if field == "availability":
+            if arg not in ("True", "False"):
+                return FALSE_CONDITION, ()
+            return f"{field} = ?", (arg == "True",)
+        if field in ("id", "year"):
+            try:
+                value = int(arg)
+            except ValueError:
+                return FALSE_CONDITION, ()
+            if str(value) != arg:
+                return FALSE_CONDITION, ()
+            return f"{field} = ?", (value,)
+        return f"{field} = ?", (arg,)
+
+    def __where(self, predicates: list[Predicate]) -> tuple[str, tuple]:
+        """Translate predicates in where clause with parameters."""
+        conditions: list[str] = []
+        params: list[Any] = []
+        for predicate in predicates:
+            if predicate.field not in BOOK_FIELDS:
+                conditions.append(FALSE_CONDITION)
+                continue
+            if isinstance(predicate, EqualPredicate):
+                condition, condition_params = self.__equal_condition(predicate)
+                conditions.append(condition)
+                params.extend(condition_params)
+                continue
+            if isinstance(predicate, InPredicate) and isinstance(
+                predicate.values, IdRanges
+            ):
+                # ranges are passed as one json parameter of pairs
+                conditions.append(
+                    "EXISTS (SELECT 1 FROM json_each(?) WHERE"
+                    f" books.{predicate.field}"
+                    " BETWEEN json_extract(value, '$[0]')"
+                    " AND json_extract(value, '$[1]'))"
+                )
+                params.append(
+                    json.dumps(
+                        [
+                            [part.start, part.stop - 1]
+                            for part in predicate.values.ranges
+                        ]
+                    )
+                )
+                continue
+            if isinstance(predicate, InPredicate):
+                # set of any size is passed as one json parameter
+                conditions.append(
+                    f"{predicate.field} IN" " (SELECT value FROM json_each(?))"
+                )
+                params.append(json.dumps(sorted(predicate.values)))
+                continue
+            if isinstance(predicate, RangePredicate):
+                if predicate.value_from is not None:
+                    conditions.append(f"{predicate.field} >= ?")
+                    params.append(predicate.value_from)
+                if predicate.value_to is not None:
+                    conditions.append(f"{predicate.field} <= ?")
+                    params.append(predicate.value_to)
+        return " AND ".join(conditions), tuple(params)
+
+    def __text_search(
+        self,
+        query: str,
+        fields: Iterable[str] | None,
+        predicates: list[Predicate],
+    ) -> list[BookSchema]:
+        """Select books with all words in sqlite and rank them in memory."""
+        fields = tuple(fields or FULLTEXT_FIELDS)
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        where, params = self.__where(predicates)
+        conditions = [where] if where else []
+        text_params: list[str] = []
+        for token in tokens:
+            conditions.append(
+                "("
+                + " OR ".join(
+                    f"instr(fold({field}), ?) > 0" for field in fields
+                )
+                + ")"
+            )
+            text_params.extend([token] * len(fields))
+        candidates = {
+            book.id: book
+            for book in map(
+                self.__to_book,
+                self.__query(
+                    " AND ".join(conditions), (*params, *text_params)
+                ),
+            )
+        }
+
+        index = FullTextIndex(FULLTEXT_FIELDS)
+        index.build(candidates.values())
+        books = [candidates[obj_id] for obj_id in index.search(query, fields)]
+        metrics.count("records.scanned", len(candidates))
+        metrics.count("records.matched", len(books))
+        return books
+
+    def full_text_search(
+        self, query: str, fields: Iterable[str] | None = None
+    ) -> list[BookSchema]:
+        """Get books with all query words in text fields ranked by match."""
+        return self.__text_search(query, fields, [])
+
+    def iter_search(
+        self,
+        predicates: list[Predicate],
+        text: str | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+        order: SortOrder | None = None,
+    ) -> Iterator[BookSchema]:
+        """Iterate page of books matching predicates and full text query."""
+        if text is not None:
+            return order_books(
+                self.__text_search(text, None, predicates),
+                order,
+                offset,
+                limit,
+            )
+        where, params = self.__where(predicates)
+        return map(
+            self.__to_book,
+            self.__query(where, params, offset, limit, order),
+        )
@@ -0,0 +1,52 @@
+from typing import Iterable
+
+from book_library.schemas import BookSchema, BookStatsSchema
+
+
+class BookStats:
+    """Counters of books by author, year and availability.
+
+    Counters change with every created, updated and removed book,
+    so statistics are got without scan of all books.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.available = 0
+        self.authors: dict[str, int] = {}
+        self.years: dict[int, int] = {}
+
+    def build(self, books: Iterable[BookSchema]) -> None:
+        """Count all books."""
+        for book in books:
+            self.add(book)
+
+    def add(self, book: BookSchema) -> None:
+        self.total += 1
+        self.available += book.availability
+        self.authors[book.author] = self.authors.get(book.author, 0) + 1
+        self.years[book.year] = self.years.get(book.year, 0) + 1
+
+    def discard(self, book: BookSchema) -> None:
+        self.total -= 1
+        self.available -= book.availability
+        self.__decrement(self.authors, book.author)
+        self.__decrement(self.years, book.year)
+
+    @staticmethod
+    def __decrement(counts: dict, key: str | int) -> None:
+        count = counts.get(key, 0) - 1
+        if count > 0:
+            counts[key] = count
+        else:
+            counts.pop(key, None)
+
+    def summary(self) -> BookStatsSchema:
+        """Get copy of counters."""
+        return BookStatsSchema.model_construct(
+            total=self.total,
+            available=self.available,
+            unavailable=self.total - self.available,
+            authors=dict(self.authors),
+            years=dict(sorted(self.years.items())),
+        )
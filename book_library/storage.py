@@ -0,0 +1,118 @@
+from pathlib import Path
+from typing import Iterator
+
+from book_library.base_repository import BaseRepositoryBook
+from book_library.constants import (
+    BINARY_SNAPSHOT_SUFFIX,
+    JOURNAL_OP_CREATE,
+    JOURNAL_OP_REMOVE,
+    JOURNAL_OP_UPDATE,
+    JOURNAL_SUFFIX,
+    LOCK_SUFFIX,
+    RECORD_FILE_SUFFIX,
+    SQLITE_SUFFIXES,
+)
+from book_library.schemas import BookSchema
+
+
+def open_repository(
+    path_file: Path, journal: bool = False, columnar: bool = False
+) -> BaseRepositoryBook:
+    """Open repository with backend chosen by suffix of storage file.
+
+    Journal and columnar options are used only by json storage.
+    Only module of chosen backend is imported.
+    """
+    if path_file.suffix in SQLITE_SUFFIXES:
+        from book_library.sqlite_repository import SQLiteRepositoryBook
+
+        return SQLiteRepositoryBook(path_file)
+    if path_file.suffix == RECORD_FILE_SUFFIX:
+        from book_library.record_repository import RecordRepositoryBook
+
+        return RecordRepositoryBook(path_file)
+
+    from book_library.repository import RepositoryBook
+
+    return RepositoryBook(path_file, journal=journal, columnar=columnar)
+
+
+def read_snapshot_book(path_file: Path, obj_id: int) -> BookSchema | None:
+    """Get book by id from its row of binary snapshot and the last
+    journal record of this id, catalog is not loaded."""
+    from book_library.binary_snapshot import BinarySnapshot
+    from book_library.journal import Journal
+    from book_library.locking import FileLock
+
+    book = None
+    lock = FileLock(path_file.with_name(path_file.name + LOCK_SUFFIX))
+    lock.acquire(shared=True)
+    try:
+        if path_file.is_file():
+            with BinarySnapshot(path_file) as snapshot:
+                book = snapshot.get(obj_id)
+        journal = Journal(path_file.with_name(path_file.name + JOURNAL_SUFFIX))
+        record = journal.last_record_of(obj_id)
+        if record is not None and record["op"] == JOURNAL_OP_REMOVE:
+            book = None
+        elif record is not None:
+            book = BookSchema.model_validate(record["book"])
+    finally:
+        lock.release()
+    return book
+
+
+def streams_snapshot(path_file: Path) -> bool:
+    """Check that books of storage can be printed as snapshot is read,
+    json and json lines snapshots are read so."""
+    return path_file.suffix not in (
+        *SQLITE_SUFFIXES,
+        RECORD_FILE_SUFFIX,
+        BINARY_SNAPSHOT_SUFFIX,
+    )
+
+
+def iter_snapshot_books(path_file: Path) -> Iterator[BookSchema]:
+    """Iterate books of json snapshot as it is read with journal records
+    applied, in the same order as books of loaded repository.
+
+    Snapshot is opened and journal is read under lock, snapshot
+    replaced later by other process stays open in old file.
+    """
+    from book_library.journal import Journal
+    from book_library.locking import FileLock
+    from book_library.snapshot import invalid_snapshot_error, stream_snapshot
+
+    # books of journal by ids, None for removed books
+    changes: dict[int, BookSchema | None] = {}
+    lock = FileLock(path_file.with_name(path_file.name + LOCK_SUFFIX))
+    lock.acquire(shared=True)
+    try:
+        snapshot = open(path_file, mode="rb") if path_file.is_file() else None
+        journal = Journal(path_file.with_name(path_file.name + JOURNAL_SUFFIX))
+        for record in journal.records_from(0):
+            operation = record["op"]
+            if operation in (JOURNAL_OP_CREATE, JOURNAL_OP_UPDATE):
+                book = BookSchema.model_validate(record["book"])
+                changes[book.id] = book
+            elif operation == JOURNAL_OP_REMOVE:
+                changes[record["id"]] = None
+    finally:
+        lock.release()
+
+    if snapshot is not None:
+        with snapshot:
+            obj_ids: set[int] = set()
+            for number, book in enumerate(
+                stream_snapshot(path_file, snapshot), 1
+            ):
+                if book.id in obj_ids:
+                    raise invalid_snapshot_error(path_file, number)
+                obj_ids.add(book.id)
+                if book.id in changes:
+                    book = changes.pop(book.id)
+                if book is not None:
+                    yield book
+    for book in changes.values():
+        if book is not None:
+            yield book
@@ -0,0 +1,52 @@
+import csv
+import json
+import logging
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from book_library.schemas import BookSchema
+
+CSV_SUFFIX = ".csv"
+JSONL_SUFFIX = ".jsonl"
+TRANSFER_SUFFIXES = (CSV_SUFFIX, JSONL_SUFFIX)
+
+
+def check_transfer_format(path_file: Path) -> None:
+    """Check that file format is supported for import and export."""
+    if path_file.suffix not in TRANSFER_SUFFIXES:
+        except_message = (
+            f"Формат файла {path_file.name} не поддерживается, "
+            f"используйте {', '.join(TRANSFER_SUFFIXES)}."
+        )
+        logging.error(except_message)
+        raise ValueError(except_message)
+
+
+def read_books(path_file: Path) -> Iterator[dict[str, Any]]:
+    """Read book records from csv or json lines file one by one."""
+    check_transfer_format(path_file)
+    with open(path_file, mode="r", encoding="utf-8", newline="") as file:
+        if path_file.suffix == CSV_SUFFIX:
+            yield from csv.DictReader(file)
+            return
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def write_books(books: Iterable[BookSchema], path_file: Path) -> int:
+    """Write books in csv or json lines file row by row."""
+    check_transfer_format(path_file)
+    count_books = 0
+    with open(path_file, mode="w", encoding="utf-8", newline="") as file:
+        if path_file.suffix == CSV_SUFFIX:
+            writer = csv.writer(file)
+            writer.writerow(BookSchema.model_fields)
+            for book in books:
+                writer.writerow(book.model_dump().values())
+                count_books += 1
+            return count_books
+        for book in books:
+            file.write(book.model_dump_json() + "\n")
+            count_books += 1
+    return count_books
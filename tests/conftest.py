@@ -2,13 +2,22 @@ from pathlib import Path
 
 import pytest
 
+from book_library.base_repository import BaseRepositoryBook
+from book_library.record_repository import RecordRepositoryBook
 from book_library.repository import BookSchema, RepositoryBook
+from book_library.sqlite_repository import SQLiteRepositoryBook
 
 
-@pytest.fixture
-def repository(tmpdir: Path) -> RepositoryBook:
+@pytest.fixture(params=["dict", "columnar", "sqlite", "records"])
+def repository(
+    tmpdir: Path, request: pytest.FixtureRequest
+) -> BaseRepositoryBook:
+    if request.param == "sqlite":
+        return SQLiteRepositoryBook(Path(tmpdir / "test_task.sqlite3"))
+    if request.param == "records":
+        return RecordRepositoryBook(Path(tmpdir / "test_task.rec"))
     json_path = Path(tmpdir / "test_task.json")
-    return RepositoryBook(json_path)
+    return RepositoryBook(json_path, columnar=request.param == "columnar")
 
 
 @pytest.fixture
@@ -2,9 +2,6 @@ from pathlib import Path
 from typing import Final
 
 BASE_DIR: Final[Path] = Path(__file__).resolve().parent.parent
-JSON_VALID_DATA: Final[Path] = (
-    BASE_DIR / r"tests\test_json_data\library_db_vlaid_data.json"
-)
-JSON_INVALID_DATA: Final[Path] = (
-    BASE_DIR / r"tests\test_json_data\library_db_invalid_data.json"
-)
+JSON_DATA_DIR: Final[Path] = BASE_DIR / "tests" / "test_json_data"
+JSON_VALID_DATA: Final[Path] = JSON_DATA_DIR / "library_db_vlaid_data.json"
+JSON_INVALID_DATA: Final[Path] = JSON_DATA_DIR / "library_db_invalid_data.json"
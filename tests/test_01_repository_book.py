@@ -1,3 +1,6 @@
+import shutil
+from pathlib import Path
+
 import pytest
 from pydantic_core import ValidationError
 
@@ -46,6 +49,7 @@ class TestRepository:
 
     def test_read_json_file_data(
         self,
+        tmpdir: Path,
         repository: RepositoryBook,
         book: BookSchema,
         book_update: BookSchema,
@@ -53,16 +57,21 @@ class TestRepository:
         count_elements_confirm = self.create_element_in_json(
             repository, book, book_update
         )
-        json_file = RepositoryBook(JSON_VALID_DATA)
+        # side files of storage are written next to copy of data file
+        json_path = Path(tmpdir / JSON_VALID_DATA.name)
+        shutil.copy(JSON_VALID_DATA, json_path)
+        json_file = RepositoryBook(json_path)
         count_elements = len(json_file.get_all())
         assert count_elements == count_elements_confirm, (
             "После чтения валидного файла, результатом должен быть список "
             f"из {count_elements_confirm} объектов, а сейчас {count_elements}."
         )
 
-    def test_read_json_file_invalid_data(self):
+    def test_read_json_file_invalid_data(self, tmpdir: Path):
+        json_path = Path(tmpdir / JSON_INVALID_DATA.name)
+        shutil.copy(JSON_INVALID_DATA, json_path)
         with pytest.raises(ValueError) as ex:
-            RepositoryBook(JSON_INVALID_DATA)
+            RepositoryBook(json_path)
             assert ex, (
                 "После чтения файла с невалидными данными должна появиться"
                 f" ошибка {ValueError.__name__}."
@@ -285,3 +294,25 @@ class TestRepository:
                 f"Значения поля {field} у всех найденных "
                 "элементов должны быть равны."
             )
+
+    def test_create_book_id_after_remove(
+        self,
+        repository: RepositoryBook,
+        book: BookSchema,
+        book_update: BookSchema,
+    ):
+        count_item = self.create_element_in_json(repository, book, book_update)
+        repository.remove(obj_id=count_item)
+
+        book_data = book.model_dump()
+        book_data.pop("id")
+        new_book = repository.create(**book_data)
+
+        assert new_book.id == count_item + 1, (
+            "Айди новой книги должен браться из счетчика, а не "
+            "повторять айди удаленной книги."
+        )
+        get_book = repository.get(obj_id=new_book.id)
+        assert (
+            get_book.model_dump() == new_book.model_dump()
+        ), "Новая книга должна сразу находиться по айди."
@@ -0,0 +1,102 @@
+from pathlib import Path
+
+import pytest
+
+from book_library.repository import RepositoryBook
+from book_library.schemas import BookSchema
+
+
+class TestJournal:
+    """Test class for journal mode of RepositoryBook.
+    It is testing replay and compaction of journal records."""
+
+    count_item = 10
+
+    def test_journal_replay(self, tmpdir: Path, book: BookSchema):
+        json_path = Path(tmpdir / "test_journal.json")
+        repository = RepositoryBook(json_path, journal=True)
+        book_data = book.model_dump()
+        book_data.pop("id")
+
+        for _ in range(self.count_item):
+            repository.create(**book_data)
+        repository.update(obj_id=1, title="Новое название")
+        repository.remove(obj_id=2)
+
+        assert not json_path.read_text(
+            encoding="utf-8"
+        ), "В режиме журнала изменения не должны перезаписывать json файл."
+        assert (
+            len(repository.journal) == self.count_item + 2
+        ), "Каждое изменение должно добавлять одну запись в журнал."
+
+        reopen_repository = RepositoryBook(json_path, journal=True)
+        assert [
+            book_.model_dump() for book_ in reopen_repository.get_all()
+        ] == [book_.model_dump() for book_ in repository.get_all()], (
+            "После повторного открытия данные из журнала должны "
+            "быть применены к снимку."
+        )
+
+    def test_journal_compact(self, tmpdir: Path, book: BookSchema):
+        json_path = Path(tmpdir / "test_journal.json")
+        repository = RepositoryBook(json_path, journal=True)
+        book_data = book.model_dump()
+        book_data.pop("id")
+        for _ in range(self.count_item):
+            repository.create(**book_data)
+
+        repository.compact()
+
+        assert (
+            not repository.journal.path_journal.is_file()
+        ), "После сжатия журнал должен быть очищен."
+        reopen_repository = RepositoryBook(json_path)
+        assert (
+            len(reopen_repository.get_all()) == self.count_item
+        ), "После сжатия все книги должны быть в json файле."
+
+    def test_journal_skip_torn_record(self, tmpdir: Path, book: BookSchema):
+        json_path = Path(tmpdir / "test_journal.json")
+        repository = RepositoryBook(json_path, journal=True)
+        book_data = book.model_dump()
+        book_data.pop("id")
+        repository.create(**book_data)
+        with open(repository.journal.path_journal, mode="a") as journal:
+            journal.write('{"op":"create","book":{"id":2,')
+
+        reopen_repository = RepositoryBook(json_path, journal=True)
+        reopen_repository.create(**book_data)
+
+        assert [book_.id for book_ in reopen_repository.get_all()] == [
+            1,
+            2,
+        ], "Недописанная запись журнала должна быть отброшена."
+        assert (
+            len(RepositoryBook(json_path).get_all()) == 2
+        ), "Запись после недописанной должна корректно читаться."
+
+    @pytest.mark.parametrize("journal", [False, True])
+    def test_next_id_after_reopen(
+        self, tmpdir: Path, book: BookSchema, journal: bool
+    ):
+        json_path = Path(tmpdir / "test_journal.json")
+        repository = RepositoryBook(json_path, journal=journal)
+        book_data = book.model_dump()
+        book_data.pop("id")
+        for _ in range(self.count_item):
+            repository.create(**book_data)
+        repository.remove(obj_id=self.count_item)
+        repository.remove(obj_id=self.count_item - 1)
+
+        reopen_repository = RepositoryBook(json_path, journal=journal)
+        assert (
+            reopen_repository.create(**book_data).id == self.count_item + 1
+        ), "Айди удаленных последних книг не должны повторяться."
+
+        reopen_repository.remove(obj_id=self.count_item + 1)
+        reopen_repository.compact()
+        assert (
+            RepositoryBook(json_path, journal=journal).create(**book_data).id
+            == self.count_item + 2
+        ), "Счетчик айди должен сохраняться при сжатии журнала."
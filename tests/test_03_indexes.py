@@ -0,0 +1,76 @@
+from book_library.query import EqualPredicate, RangePredicate
+from book_library.repository import RepositoryBook
+from book_library.schemas import BookSchema
+
+
+class TestIndexes:
+    """Test class for secondary indexes of RepositoryBook.
+    It is testing search results after changes of books."""
+
+    def test_search_after_update_and_remove(
+        self,
+        repository: RepositoryBook,
+        book: BookSchema,
+        book_update: BookSchema,
+    ):
+        book_data = book.model_dump()
+        book_data.pop("id")
+        for _ in range(3):
+            repository.create(**book_data)
+        for field in book_data:
+            repository.get_obj_for_field_arg(field, book_data[field], True)
+
+        update_book_data = book_update.model_dump()
+        update_book_data.pop("id")
+        repository.update(obj_id=1, **update_book_data)
+        repository.remove(obj_id=2)
+
+        for field, value in book_data.items():
+            books = repository.get_obj_for_field_arg(field, value, True)
+            assert [book_.id for book_ in books] == [3], (
+                f"Индекс по полю {field} должен учитывать "
+                "изменение и удаление книг."
+            )
+        for field, value in update_book_data.items():
+            books = repository.get_obj_for_field_arg(field, value, True)
+            assert [book_.id for book_ in books] == [1], (
+                f"Индекс по полю {field} должен находить "
+                "измененную книгу по новому значению."
+            )
+
+    def test_search_year_string_argument(
+        self, repository: RepositoryBook, book: BookSchema
+    ):
+        book_data = book.model_dump()
+        book_data.pop("id")
+        repository.create(**book_data)
+
+        books = repository.get_obj_for_field_arg("year", str(book.year), True)
+        assert len(books) == 1, (
+            "Поиск по году должен работать со строковым аргументом "
+            "из командной строки."
+        )
+
+    def test_search_compound_predicates(
+        self,
+        repository: RepositoryBook,
+        book: BookSchema,
+    ):
+        book_data = book.model_dump()
+        book_data.pop("id")
+        for year in range(1990, 2010):
+            repository.create(**{**book_data, "year": year})
+        repository.update(obj_id=5, availability=False)
+
+        books = repository.search(
+            [
+                EqualPredicate("author", book.author),
+                EqualPredicate("availability", True),
+                RangePredicate("year", 1992, 1996),
+            ]
+        )
+
+        assert [book_.year for book_ in books] == [1992, 1993, 1995, 1996], (
+            "Поиск по нескольким условиям должен вернуть книги, "
+            "подходящие под все условия сразу."
+        )
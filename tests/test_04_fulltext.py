@@ -0,0 +1,106 @@
+from pathlib import Path
+
+from book_library.fulltext import FullTextIndex
+from book_library.repository import RepositoryBook
+
+
+class TestFullText:
+    """Test class for full text search of RepositoryBook.
+    It is testing tokens, prefixes, ranking and saved index."""
+
+    books_data = (
+        dict(title="Изучаем Python", author="Лутц", year=2019),
+        dict(title="Основы Python", author="Лутц", year=2023),
+        dict(title="Pythonic код", author="Ёлкин", year=2020),
+        dict(title="Отцы и дети", author="Тургенев", year=1862),
+    )
+
+    def create_books(self, repository: RepositoryBook) -> None:
+        for book_data in self.books_data:
+            repository.create(availability=True, **book_data)
+
+    def test_full_text_ranking(self, repository: RepositoryBook):
+        self.create_books(repository)
+
+        books = repository.full_text_search("PYTHON")
+        assert [book.id for book in books] == [1, 2, 3], (
+            "Точное совпадение слова должно быть выше совпадения "
+            "по началу слова, регистр не должен учитываться."
+        )
+
+        books = repository.full_text_search("осн pyth")
+        assert [book.id for book in books] == [
+            2
+        ], "Поиск по нескольким словам должен вернуть книги со всеми словами."
+
+        books = repository.full_text_search("елкин", fields=["author"])
+        assert [book.id for book in books] == [
+            3
+        ], "Поиск по кириллице должен учитывать ё как е."
+
+    def test_full_text_saved_index(self, tmpdir: Path):
+        json_path = Path(tmpdir / "test_fulltext.json")
+        repository = RepositoryBook(json_path, journal=True)
+        self.create_books(repository)
+        repository.full_text_search("python")
+        assert (
+            repository.path_fulltext.is_file()
+        ), "Полнотекстовый индекс должен сохраняться рядом с json файлом."
+
+        repository.update(obj_id=4, title="Python для детей")
+        reopen_repository = RepositoryBook(json_path, journal=True)
+        books = reopen_repository.full_text_search("детей")
+
+        assert [book.id for book in books] == [
+            4
+        ], "Сохраненный индекс должен учитывать изменения из журнала."
+        assert FullTextIndex.load(
+            reopen_repository.path_fulltext, ("title", "author")
+        ), "Сохраненный индекс должен читаться без перестроения."
+
+    def test_saved_index_after_other_process(self, tmpdir: Path):
+        json_path = Path(tmpdir / "test_fulltext.json")
+        repository = RepositoryBook(json_path, journal=True)
+        self.create_books(repository)
+        other_repository = RepositoryBook(json_path, journal=True)
+        other_repository.create(
+            title="Новая книга", author="Автор", year=2024, availability=True
+        )
+
+        books = repository.full_text_search("новая")
+
+        assert [book.id for book in books] == [
+            5
+        ], "Поиск должен перечитывать книги, измененные другим процессом."
+        reopen_repository = RepositoryBook(json_path, journal=True)
+        assert [
+            book.id for book in reopen_repository.full_text_search("новая")
+        ] == [5], "Сохраненный индекс должен содержать книгу другого процесса."
+
+    def test_index_of_rolled_back_batch(self, tmpdir: Path):
+        json_path = Path(tmpdir / "test_fulltext.json")
+        repository = RepositoryBook(json_path, journal=True)
+        self.create_books(repository)
+
+        try:
+            with repository.batch():
+                repository.create(
+                    title="Откаченная книга",
+                    author="Автор",
+                    year=2024,
+                    availability=True,
+                )
+                assert [
+                    book.id for book in repository.full_text_search("откач")
+                ] == [5]
+                raise RuntimeError
+        except RuntimeError:
+            pass
+
+        reopen_repository = RepositoryBook(json_path, journal=True)
+        assert (
+            reopen_repository.full_text_search("откач") == []
+        ), "Индекс с книгой откаченного пакета не должен сохраняться."
+        assert [
+            book.id for book in reopen_repository.full_text_search("python")
+        ] == [1, 2, 3]
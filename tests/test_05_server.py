@@ -0,0 +1,52 @@
+import threading
+from pathlib import Path
+
+from book_library.commands import CRUD
+from book_library.repository import RepositoryBook
+from book_library.schemas import BookSchema
+from book_library.server import BookServer, send_request
+
+
+class TestServer:
+    """Test class for server mode.
+    It is testing CRUD commands sent to server over unix socket."""
+
+    def test_server_commands(
+        self, tmpdir: Path, repository: RepositoryBook, book: BookSchema
+    ):
+        path_socket = Path(tmpdir / "test.sock")
+        server = BookServer(path_socket, repository, CRUD)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        args = dict(
+            id=None,
+            title=book.title,
+            author=book.author,
+            year=book.year,
+            availability=book.availability,
+            field=None,
+            value=None,
+            year_from=None,
+            year_to=None,
+            text=None,
+        )
+        try:
+            post_output = send_request(path_socket, "post", args)
+            get_output = send_request(path_socket, "get", {**args, "id": 1})
+            unknown_output = send_request(path_socket, "serve", args)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert (
+            book.title in post_output
+        ), "Сервер должен вернуть вывод команды создания книги."
+        assert (
+            post_output == get_output
+        ), "Созданная через сервер книга должна находиться по айди."
+        assert (
+            repository.get(obj_id=1).title == book.title
+        ), "Сервер должен работать с переданным репозиторием."
+        assert (
+            "не поддерживается" in unknown_output
+        ), "Сервер не должен выполнять неизвестные команды."
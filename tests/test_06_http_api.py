@@ -0,0 +1,150 @@
+import asyncio
+import json
+from http import HTTPStatus
+from http.client import HTTPConnection
+from typing import Any
+from urllib.parse import urlencode
+
+from book_library.base_repository import BaseRepositoryBook
+from book_library.http_api import BookHttpApi
+from book_library.schemas import BookSchema
+from book_library.storage import open_repository
+
+
+def http_request(
+    port: int, method: str, path: str, body: Any = None
+) -> tuple[int, Any]:
+    connection = HTTPConnection("127.0.0.1", port)
+    try:
+        data = None if body is None else json.dumps(body)
+        connection.request(method, path, body=data)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+class TestHttpApi:
+    """Test class for http json api.
+    It is testing CRUD routes with concurrent requests."""
+
+    count_item = 20
+
+    def test_http_api_crud(
+        self, repository: BaseRepositoryBook, book: BookSchema
+    ):
+        book_data = book.model_dump()
+        book_data.pop("id")
+
+        async def scenario() -> dict[str, Any]:
+            api = BookHttpApi(repository)
+            server = await api.start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            loop = asyncio.get_running_loop()
+
+            def request(*args: Any):
+                return loop.run_in_executor(None, http_request, port, *args)
+
+            results = {}
+            results["post"] = await asyncio.gather(
+                *(
+                    request("POST", "/books", book_data)
+                    for _ in range(self.count_item)
+                )
+            )
+            results["patch"] = await request(
+                "PATCH", "/books/1", {"title": "Новое название"}
+            )
+            results["search"] = await request(
+                "GET",
+                "/books/search?"
+                + urlencode({"field": "title", "value": "Новое название"}),
+            )
+            results["delete"] = await request("DELETE", "/books/2")
+            results["get_deleted"] = await request("GET", "/books/2")
+            results["invalid"] = await request(
+                "POST", "/books", {**book_data, "year": "год"}
+            )
+            results["get_all"] = await request("GET", "/books")
+            results["page"] = await request(
+                "GET", "/books?" + urlencode({"offset": 5, "limit": 3})
+            )
+
+            server.close()
+            await server.wait_closed()
+            await api.stop()
+            return results
+
+        results = asyncio.run(scenario())
+
+        post_ids = sorted(body["id"] for _, body in results["post"])
+        assert post_ids == list(range(1, self.count_item + 1)), (
+            "Параллельные запросы на создание должны получить "
+            "уникальные айди по порядку."
+        )
+        assert results["patch"][0] == HTTPStatus.OK
+        assert [book_["id"] for book_ in results["search"][1]] == [
+            1
+        ], "Поиск через api должен находить измененную книгу."
+        assert results["delete"][0] == HTTPStatus.OK
+        assert (
+            results["get_deleted"][0] == HTTPStatus.NOT_FOUND
+        ), "Удаленная книга должна отвечать статусом 404."
+        assert (
+            results["invalid"][0] == HTTPStatus.UNPROCESSABLE_ENTITY
+        ), "Невалидные данные должны отвечать статусом 422."
+        assert len(results["get_all"][1]) == self.count_item - 1
+        assert [book_["id"] for book_ in results["page"][1]] == [
+            7,
+            8,
+            9,
+        ], "Страница книг через api должна учитывать смещение и лимит."
+        assert len(open_repository(repository.path_json).get_all()) == (
+            self.count_item - 1
+        ), "Все изменения через api должны быть записаны в json файл."
+
+    def test_http_api_errors(
+        self, repository: BaseRepositoryBook, book: BookSchema
+    ):
+        book_data = book.model_dump()
+        book_data.pop("id")
+        repository.create(**book_data)
+
+        def broken_stats():
+            raise RuntimeError("Ошибка обработчика")
+
+        repository.stats = broken_stats
+
+        async def scenario() -> dict[str, Any]:
+            api = BookHttpApi(repository)
+            server = await api.start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            loop = asyncio.get_running_loop()
+
+            def request(*args: Any):
+                return loop.run_in_executor(None, http_request, port, *args)
+
+            results = {}
+            results["patch"] = await request(
+                "PATCH", "/books/1", {"obj_id": 3}
+            )
+            results["post"] = await request(
+                "POST", "/books", {**book_data, "kwargs": 1}
+            )
+            results["stats"] = await request("GET", "/books/stats")
+
+            server.close()
+            await server.wait_closed()
+            await api.stop()
+            return results
+
+        results = asyncio.run(scenario())
+
+        assert (
+            results["patch"][0] == HTTPStatus.BAD_REQUEST
+            and results["post"][0] == HTTPStatus.BAD_REQUEST
+        ), "Неизвестные поля тела должны отвечать статусом 400."
+        assert (
+            results["stats"][0] == HTTPStatus.INTERNAL_SERVER_ERROR
+        ), "Ошибка обработчика должна отвечать статусом 500."
+        assert repository.get(1).model_dump() == {**book_data, "id": 1}
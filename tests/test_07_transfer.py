@@ -0,0 +1,60 @@
+from pathlib import Path
+
+import pytest
+
+from book_library.base_repository import BaseRepositoryBook
+from book_library.schemas import BookSchema
+from book_library.storage import open_repository
+from book_library.transfer import read_books, write_books
+
+
+class TestTransfer:
+    """Test class for import and export of books.
+    It is testing csv and json lines files in one transaction."""
+
+    count_item = 25
+
+    @pytest.mark.parametrize("suffix", [".csv", ".jsonl"])
+    def test_export_import(
+        self,
+        tmpdir: Path,
+        repository: BaseRepositoryBook,
+        book: BookSchema,
+        suffix: str,
+    ):
+        book_data = book.model_dump()
+        book_data.pop("id")
+        for _ in range(self.count_item):
+            repository.create(**book_data)
+        path_file = Path(tmpdir / f"books{suffix}")
+
+        count_books = write_books(repository.iter_all(), path_file)
+        new_books = repository.create_many(read_books(path_file))
+
+        assert count_books == self.count_item
+        assert [book_.id for book_ in new_books] == list(
+            range(self.count_item + 1, self.count_item * 2 + 1)
+        ), "Импортированные книги должны получить новые айди по порядку."
+        reopen_repository = open_repository(repository.path_json)
+        for book_ in reopen_repository.get_all():
+            assert (
+                book_.model_dump(exclude={"id"}) == book_data
+            ), "Импортированные книги должны совпадать с экспортированными."
+        assert len(reopen_repository.get_all()) == self.count_item * 2
+
+    def test_import_invalid_record(
+        self, repository: BaseRepositoryBook, book: BookSchema
+    ):
+        book_data = book.model_dump()
+        book_data.pop("id")
+        books_data = [book_data] * 5 + [{**book_data, "year": "год"}]
+
+        with pytest.raises(ValueError) as ex:
+            repository.create_many(books_data)
+
+        assert "Запись 6" in str(
+            ex.value
+        ), "Ошибка импорта должна содержать номер невалидной записи."
+        assert (
+            not repository.get_all()
+        ), "При невалидной записи ни одна книга не должна быть создана."
@@ -0,0 +1,176 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from book_library import snapshot
+from book_library.repository import RepositoryBook
+from book_library.schemas import BookSchema
+from book_library.snapshot import (
+    iter_snapshot,
+    snapshot_key,
+    stream_snapshot,
+    write_snapshot,
+)
+from book_library.storage import iter_snapshot_books
+
+
+class TestSnapshot:
+    """Test class for snapshot formats of RepositoryBook.
+    It is testing json lines snapshot and invalid record numbers."""
+
+    count_item = 10
+
+    def test_jsonl_snapshot(self, tmpdir: Path, book: BookSchema):
+        jsonl_path = Path(tmpdir / "test_snapshot.jsonl")
+        repository = RepositoryBook(jsonl_path)
+        book_data = book.model_dump()
+        book_data.pop("id")
+        for _ in range(self.count_item):
+            repository.create(**book_data)
+
+        lines = jsonl_path.read_text(encoding="utf-8").splitlines()
+        assert (
+            len(lines) == self.count_item
+        ), "Снимок в формате json lines должен хранить книгу в строке."
+        books = iter_snapshot(jsonl_path)
+        assert (
+            next(books).model_dump() == book.model_dump()
+        ), "Снимок json lines должен читаться по одной записи."
+        assert len(RepositoryBook(jsonl_path).get_all()) == self.count_item
+
+    def test_invalid_record_number(self, tmpdir: Path, book: BookSchema):
+        books_data = [book.model_dump()] * 3
+        books_data[1] = {**book.model_dump(), "id": 2, "year": "год"}
+        json_path = Path(tmpdir / "test_snapshot.json")
+        json_path.write_text(json.dumps(books_data), encoding="utf-8")
+        jsonl_path = Path(tmpdir / "test_snapshot.jsonl")
+        jsonl_path.write_text(
+            "\n".join(map(json.dumps, books_data)), encoding="utf-8"
+        )
+
+        for path_file in (json_path, jsonl_path):
+            with pytest.raises(ValueError) as ex:
+                RepositoryBook(path_file)
+            assert "запись 2" in str(ex.value), (
+                "Ошибка чтения снимка должна содержать номер "
+                "невалидной записи."
+            )
+
+    def test_snapshot_cache(self, tmpdir: Path, book: BookSchema):
+        json_path = Path(tmpdir / "test_snapshot.json")
+        repository = RepositoryBook(json_path)
+        book_data = book.model_dump()
+        book_data.pop("id")
+        with repository.batch():
+            for _ in range(self.count_item):
+                repository.create(**book_data)
+
+        assert (
+            repository.path_cache.is_file()
+        ), "После записи снимка должен появиться кэш снимка."
+        books = [book_.model_dump() for book_ in repository.get_all()]
+        assert [
+            book_.model_dump() for book_ in RepositoryBook(json_path).get_all()
+        ] == books, "Книги из кэша должны совпадать с книгами снимка."
+
+        books_data = json.loads(json_path.read_text(encoding="utf-8"))
+        books_data[0]["title"] = "Новое название"
+        json_path.write_text(json.dumps(books_data), encoding="utf-8")
+        assert (
+            RepositoryBook(json_path).get(obj_id=1).title == "Новое название"
+        ), "После изменения снимка кэш не должен использоваться."
+
+        repository.path_cache.write_bytes(b"broken")
+        assert len(RepositoryBook(json_path).get_all()) == self.count_item
+
+        repository.path_cache.write_bytes(b"cbook_library.missing\nBook\n.")
+        assert len(RepositoryBook(json_path).get_all()) == self.count_item
+
+    def test_cache_not_written(self, tmpdir: Path, book: BookSchema):
+        json_path = Path(tmpdir / "test_snapshot.json")
+        repository = RepositoryBook(json_path)
+        repository.path_cache.unlink(missing_ok=True)
+        repository.path_cache.mkdir()
+        book_data = book.model_dump(exclude={"id"})
+
+        repository.create(**book_data)
+        repository.create(**{**book_data, "year": 3_000_000_000})
+
+        assert [
+            book_.year for book_ in RepositoryBook(json_path).get_all()
+        ] == [
+            book.year,
+            3_000_000_000,
+        ], "Ошибка записи кэша не должна мешать записи и чтению снимка."
+
+    @pytest.mark.parametrize("file_name", ["test.json", "test.books"])
+    def test_written_snapshot_key(self, tmpdir: Path, file_name: str, book):
+        path_file = Path(tmpdir / file_name)
+        book_data = book.model_dump(exclude={"id"})
+        books = [BookSchema(id=obj_id, **book_data) for obj_id in (1, 2)]
+
+        digest = write_snapshot(path_file, books)
+
+        assert snapshot_key(path_file, digest) == snapshot_key(
+            path_file
+        ), "Хэш записанных байт должен совпадать с хэшем файла."
+
+    @pytest.mark.parametrize("indent", [None, 4])
+    def test_stream_json(
+        self,
+        tmpdir: Path,
+        book: BookSchema,
+        indent: int | None,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        monkeypatch.setattr(snapshot, "STREAM_CHUNK_CHARS", 50)
+        json_path = Path(tmpdir / "test_snapshot.json")
+        books = [
+            BookSchema(**{**book.model_dump(), "id": number})
+            for number in range(1, self.count_item + 1)
+        ]
+        write_snapshot(json_path, books, indent)
+
+        with open(json_path, mode="rb") as file:
+            assert [
+                book_.model_dump()
+                for book_ in stream_snapshot(json_path, file)
+            ] == [
+                book_.model_dump() for book_ in iter_snapshot(json_path)
+            ], "Массив json должен читаться по одной книге кусками файла."
+
+        books_data = [book_.model_dump() for book_ in books]
+        books_data[6]["year"] = "год"
+        json_path.write_text(json.dumps(books_data), encoding="utf-8")
+        with open(json_path, mode="rb") as file:
+            with pytest.raises(ValueError) as ex:
+                list(stream_snapshot(json_path, file))
+        assert "запись 7)" in str(ex.value)
+
+        json_path.write_text(json.dumps(books_data[:3])[:-1], encoding="utf-8")
+        with open(json_path, mode="rb") as file:
+            with pytest.raises(ValueError) as ex:
+                list(stream_snapshot(json_path, file))
+        assert "запись 4)" in str(ex.value), "Массив без конца не валиден."
+
+    @pytest.mark.parametrize("file_name", ["books.json", "books.jsonl"])
+    def test_snapshot_books_with_journal(
+        self, tmpdir: Path, book: BookSchema, file_name: str
+    ):
+        path_file = Path(tmpdir / file_name)
+        repository = RepositoryBook(path_file, journal=True)
+        book_data = book.model_dump(exclude={"id"})
+        with repository.batch():
+            for _ in range(self.count_item):
+                repository.create(**book_data)
+        repository.compact()
+        repository.update(3, title="Новое название")
+        repository.remove(5)
+        repository.create(**book_data)
+
+        assert [
+            book_.model_dump() for book_ in iter_snapshot_books(path_file)
+        ] == [
+            book_.model_dump() for book_ in repository.get_all()
+        ], "Книги снимка с журналом должны идти как книги хранилища."
@@ -0,0 +1,103 @@
+import json
+from pathlib import Path
+
+from book_library.columnar import (
+    BitColumn,
+    ColumnarBookStore,
+    StringColumn,
+    int_column,
+)
+from book_library.repository import RepositoryBook
+from book_library.schemas import BookSchema
+
+
+class TestColumnarBookStore:
+    """Test class for compact column storage of books.
+    It is testing order, updates and removed rows."""
+
+    count_item = 50
+
+    @staticmethod
+    def columns_of(book: BookSchema) -> tuple:
+        """Get columns of store with one book of id 1."""
+        return (
+            int_column([1]),
+            int_column([book.year]),
+            BitColumn.from_values([book.availability]),
+            StringColumn.from_strings([book.title]),
+            StringColumn.from_strings([book.author]),
+        )
+
+    def test_columnar_store(self, book: BookSchema):
+        store = ColumnarBookStore()
+        for obj_id in range(1, self.count_item + 1):
+            store[obj_id] = book.model_copy(
+                update={
+                    "id": obj_id,
+                    "year": obj_id,
+                    "availability": obj_id % 2,
+                }
+            )
+        store[5] = store[5].model_copy(update={"title": "Новое название"})
+        for obj_id in range(1, self.count_item + 1, 3):
+            del store[obj_id]
+        for obj_id in range(2, self.count_item + 1, 2):
+            store.pop(obj_id, None)
+
+        expected_ids = [
+            obj_id
+            for obj_id in range(1, self.count_item + 1)
+            if obj_id % 3 != 1 and obj_id % 2 != 0
+        ]
+        assert (
+            list(store) == expected_ids
+        ), "После удаления книг порядок остальных книг должен сохраниться."
+        assert len(store) == len(expected_ids)
+        for book_ in store.values():
+            assert book_.year == book_.id
+            assert book_.availability == bool(
+                book_.id % 2
+            ), "Наличие книги должно храниться в битах без искажений."
+        assert (
+            store[5].title == "Новое название"
+        ), "Изменение книги должно сохраниться в колонках."
+
+    def test_wide_numbers(self, book: BookSchema):
+        store = ColumnarBookStore.from_columns(*self.columns_of(book))
+        wide_books = [
+            book.model_copy(update={"id": 2, "year": 3_000_000_000}),
+            book.model_copy(update={"id": 2**70, "year": -(2**80)}),
+        ]
+        for wide_book in wide_books:
+            store[wide_book.id] = wide_book
+        store[1] = store[1].model_copy(update={"year": 2**65})
+
+        assert [book_.model_dump() for book_ in store.values()] == [
+            book.model_copy(update={"year": 2**65}).model_dump(),
+            *(wide_book.model_dump() for wide_book in wide_books),
+        ], "Айди и годы за пределами int32 должны храниться без ошибок."
+        assert list(store) == [1, 2, 2**70]
+
+    def test_zero_id(self, tmpdir: Path, book: BookSchema):
+        store = ColumnarBookStore()
+        for obj_id in (0, 1, 2):
+            store[obj_id] = book.model_copy(update={"id": obj_id})
+        del store[1]
+        store[1] = book.model_copy(update={"id": 1, "year": 1})
+
+        assert list(store) == [0, 2, 1], "Книга с айди 0 не должна теряться."
+        assert [book_.year for book_ in store.values()] == [
+            book.year,
+            book.year,
+            1,
+        ]
+
+        json_path = Path(tmpdir / "test_zero_id.json")
+        json_path.write_text(
+            json.dumps([{**book.model_dump(), "id": 0}]), encoding="utf-8"
+        )
+        for columnar in (True, False, True):
+            repository = RepositoryBook(json_path, columnar=columnar)
+            assert [book_.id for book_ in repository.get_all()] == [
+                0
+            ], "Книга с айди 0 должна читаться из кэша снимка."
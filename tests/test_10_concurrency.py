@@ -0,0 +1,64 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from book_library.repository import RepositoryBook
+from book_library.schemas import BookSchema
+
+
+def create_books(json_path: Path, journal: bool, count_item: int) -> None:
+    repository = RepositoryBook(json_path, journal=journal)
+    for number in range(count_item):
+        repository.create(
+            title=f"Книга {number}",
+            author="Автор",
+            year=2000 + number,
+            availability=True,
+        )
+
+
+class TestConcurrency:
+    """Test class for access of many processes to one json file.
+    It is testing that parallel writes are not lost."""
+
+    count_process = 8
+    count_item = 15
+
+    @pytest.mark.parametrize("journal", [False, True])
+    def test_parallel_create(
+        self, tmpdir: Path, book: BookSchema, journal: bool
+    ):
+        json_path = Path(tmpdir / "test_concurrency.json")
+        with ProcessPoolExecutor(self.count_process) as executor:
+            futures = [
+                executor.submit(
+                    create_books, json_path, journal, self.count_item
+                )
+                for _ in range(self.count_process)
+            ]
+            for future in futures:
+                future.result()
+
+        books = RepositoryBook(json_path, journal=journal).get_all()
+        count_books = self.count_process * self.count_item
+        assert len(books) == count_books, (
+            f"После записи из {self.count_process} процессов должно быть "
+            f"{count_books} книг, а сейчас {len(books)}."
+        )
+        assert sorted(book_.id for book_ in books) == list(
+            range(1, count_books + 1)
+        ), "Процессы не должны выдавать одинаковые айди книг."
+
+    def test_lock_file_mode(self, tmpdir: Path):
+        json_path = Path(tmpdir / "test_concurrency.json")
+        umask = os.umask(0o022)
+        try:
+            repository = RepositoryBook(json_path)
+        finally:
+            os.umask(umask)
+
+        assert (
+            repository.lock.path_lock.stat().st_mode & 0o777 == 0o644
+        ), "Файл блокировки не должен быть исполняемым."
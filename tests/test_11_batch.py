@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import pytest
+
+from book_library.base_repository import BaseRepositoryBook
+from book_library.repository import RepositoryBook
+from book_library.schemas import BookSchema
+from book_library.storage import open_repository
+
+
+class TestBatch:
+    """Test class for batch of changes in repository.
+    It is testing deferred write, rollback and auto flush of batch."""
+
+    count_item = 10
+
+    def create_books(self, repository: BaseRepositoryBook, book: BookSchema):
+        book_data = book.model_dump()
+        book_data.pop("id")
+        for _ in range(self.count_item):
+            repository.create(**book_data)
+
+    def test_batch_write_on_exit(
+        self, repository: BaseRepositoryBook, book: BookSchema
+    ):
+        with repository.batch():
+            self.create_books(repository, book)
+            repository.update(obj_id=1, title="Новое название")
+            repository.remove(obj_id=2)
+            if isinstance(repository, RepositoryBook):
+                assert not repository.path_json.read_text(
+                    encoding="utf-8"
+                ), "До выхода из пакета изменения не должны записываться."
+
+        books = open_repository(repository.path_json).get_all()
+        assert (
+            len(books) == self.count_item - 1
+        ), "После выхода из пакета все изменения должны быть записаны."
+        assert books[0].title == "Новое название"
+
+    def test_batch_rollback(
+        self, repository: BaseRepositoryBook, book: BookSchema
+    ):
+        self.create_books(repository, book)
+        with pytest.raises(ValueError):
+            with repository.batch():
+                self.create_books(repository, book)
+                repository.remove(obj_id=999)
+
+        assert (
+            len(repository.get_all()) == self.count_item
+        ), "Ошибка в пакете должна отменить его незаписанные изменения."
+        assert (
+            len(open_repository(repository.path_json).get_all())
+            == self.count_item
+        )
+
+    def test_batch_auto_flush(
+        self, repository: BaseRepositoryBook, book: BookSchema
+    ):
+        with pytest.raises(ValueError):
+            with repository.batch(max_changes=self.count_item):
+                self.create_books(repository, book)
+                repository.remove(obj_id=999)
+
+        assert len(repository.get_all()) == self.count_item, (
+            "Изменения, записанные по лимиту пакета, не должны "
+            "отменяться ошибкой в пакете."
+        )
+
+    def test_compact_json(self, tmpdir: Path, book: BookSchema):
+        json_path = Path(tmpdir / "test_compact.json")
+        repository = RepositoryBook(json_path, indent=None)
+        self.create_books(repository, book)
+
+        assert (
+            len(json_path.read_text(encoding="utf-8").splitlines()) == 1
+        ), "Json без отступов должен записываться одной строкой."
+        assert len(RepositoryBook(json_path).get_all()) == self.count_item
@@ -0,0 +1,60 @@
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from book_library.constants import BASE_DIR
+
+
+@pytest.fixture
+def project_dir(tmpdir: Path) -> Path:
+    """Copy of program, so its logs and files are not made in project."""
+    project_dir = Path(tmpdir)
+    shutil.copytree(
+        BASE_DIR / "book_library",
+        project_dir / "book_library",
+        ignore=shutil.ignore_patterns("__pycache__"),
+    )
+    shutil.copy(BASE_DIR / "main.py", project_dir)
+    return project_dir
+
+
+def imported_modules(project_dir: Path, *args: str) -> set[str]:
+    """Run python with import time log and get names of imported modules."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=project_dir,
+        capture_output=True,
+        text=True,
+    )
+    return {
+        line.rsplit("|", 1)[-1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+
+
+class TestStartup:
+    """Test class for imports made on start of program.
+    It is testing that commands load only modules they need."""
+
+    def test_help_without_pydantic(self, project_dir: Path):
+        for args in (["-h"], ["unknown_command"]):
+            modules = imported_modules(project_dir, "main.py", *args)
+            assert "book_library.console_parser" in modules
+            assert "pydantic" not in modules, (
+                f"Команда {args} не должна импортировать pydantic "
+                "до разбора аргументов."
+            )
+
+    def test_commands_without_prettytable(self, project_dir: Path):
+        modules = imported_modules(
+            project_dir, "-c", "import book_library.commands"
+        )
+        assert "prettytable" not in modules, (
+            "Модуль команд не должен импортировать prettytable, "
+            "он нужен только командам вывода книг."
+        )
+        assert "book_library.repository" not in modules
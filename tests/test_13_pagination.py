@@ -0,0 +1,131 @@
+import json
+import logging
+from pathlib import Path
+
+import pytest
+
+from book_library.base_repository import BaseRepositoryBook
+from book_library.outputs import stream_books_output
+from book_library.query import EqualPredicate, RangePredicate, SortOrder
+from book_library.repository import RepositoryBook
+from book_library.schemas import BookSchema
+
+
+class TestPagination:
+    """Test class for pages of books and streaming output.
+    It is testing limit, offset and output formats of books list."""
+
+    count_item = 30
+
+    def create_books(self, repository: BaseRepositoryBook, book: BookSchema):
+        book_data = book.model_dump()
+        book_data.pop("id")
+        with repository.batch():
+            for number in range(self.count_item):
+                repository.create(**{**book_data, "year": 2000 + number})
+
+    def test_pages(self, repository: BaseRepositoryBook, book: BookSchema):
+        self.create_books(repository, book)
+
+        page = [book_.id for book_ in repository.iter_all(offset=5, limit=10)]
+        assert page == list(
+            range(6, 16)
+        ), "Страница книг должна начинаться после смещения и иметь лимит."
+        assert len(list(repository.iter_all(offset=25))) == 5
+
+        predicates = [RangePredicate("year", 2010, None)]
+        page = [
+            book_.id
+            for book_ in repository.iter_search(predicates, None, 3, 4)
+        ]
+        assert page == list(
+            range(14, 18)
+        ), "Страница поиска должна считаться от найденных книг."
+        text_page = list(
+            repository.iter_search([], book.title.split()[0], 28, 10)
+        )
+        assert len(text_page) == 2
+
+    def test_sorted_pages(
+        self, repository: BaseRepositoryBook, book: BookSchema
+    ):
+        book_data = book.model_dump()
+        book_data.pop("id")
+        with repository.batch():
+            for number in range(self.count_item):
+                repository.create(
+                    **{
+                        **book_data,
+                        "title": f"Книга {number * 7 % self.count_item}",
+                        "year": 2000 + number % 7,
+                    }
+                )
+        books = repository.get_all()
+
+        for field in ("id", "title", "year"):
+            for descending in (False, True):
+                order = SortOrder(field, descending)
+                expected = sorted(books, key=order.key, reverse=descending)
+                for limit in (None, 5):
+                    page = list(repository.iter_all(2, limit, order))
+                    assert page == expected[2:][:limit], (
+                        f"Книги должны быть отсортированы по {order}"
+                        f" со страницей из {limit} книг."
+                    )
+
+        repository.search([RangePredicate("year", 2000, None)])
+        order = SortOrder("year", True)
+        assert (
+            list(repository.iter_all(0, 3, order))
+            == sorted(books, key=order.key, reverse=True)[:3]
+        ), "Порядок по построенному индексу должен совпадать с сортировкой."
+        newest = repository.search(
+            [EqualPredicate("author", book.author)], order=order
+        )
+        assert newest[0].year == 2006
+
+    def test_sort_without_hash_index(
+        self,
+        tmpdir: Path,
+        book: BookSchema,
+        caplog: pytest.LogCaptureFixture,
+    ):
+        repository = RepositoryBook(Path(tmpdir / "test_pages.json"))
+        self.create_books(repository, book)
+
+        with caplog.at_level(logging.INFO):
+            list(repository.iter_all(order=SortOrder("title")))
+            list(repository.iter_all(order=SortOrder("year")))
+        assert (
+            "Построен индекс по полю title" not in caplog.text
+        ), "Сортировка не должна строить хеш индекс без порядка."
+        assert "Построен индекс по полю year" in caplog.text
+
+    @pytest.mark.parametrize("output_format", ["table", "tsv", "jsonl"])
+    def test_stream_output(
+        self,
+        capsys: pytest.CaptureFixture,
+        book: BookSchema,
+        output_format: str,
+    ):
+        books = [
+            book.model_copy(update={"id": number, "title": "Табуляция\tи\n"})
+            for number in range(1, self.count_item + 1)
+        ]
+
+        count_books = stream_books_output(iter(books), output_format)
+
+        assert count_books == self.count_item
+        lines = capsys.readouterr().out.splitlines()
+        if output_format == "jsonl":
+            assert [
+                BookSchema.model_validate(json.loads(line)) for line in lines
+            ] == books, "Каждая строка json lines должна быть книгой."
+        elif output_format == "tsv":
+            assert len(lines) == self.count_item + 1
+            assert lines[1].split("\t")[:2] == [
+                "1",
+                "Табуляция\\tи\\n",
+            ], "Табуляция и перенос строки в tsv должны экранироваться."
+        else:
+            assert "Табуляция" in lines[3]
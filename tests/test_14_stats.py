@@ -0,0 +1,92 @@
+import sqlite3
+from collections import Counter
+from pathlib import Path
+
+from book_library.base_repository import BaseRepositoryBook
+from book_library.repository import RepositoryBook
+from book_library.schemas import BookSchema
+from book_library.sqlite_repository import SQLiteRepositoryBook
+from book_library.storage import open_repository
+
+
+def count_books(books: list[BookSchema]) -> dict:
+    """Count books by scan for comparison with counters."""
+    available = sum(book.availability for book in books)
+    return {
+        "total": len(books),
+        "available": available,
+        "unavailable": len(books) - available,
+        "authors": dict(Counter(book.author for book in books)),
+        "years": dict(sorted(Counter(book.year for book in books).items())),
+    }
+
+
+class TestStats:
+    """Test class for statistics of books.
+    It is testing counters after changes and after reopen of storage."""
+
+    count_item = 40
+
+    def create_books(self, repository: BaseRepositoryBook, book: BookSchema):
+        book_data = book.model_dump()
+        book_data.pop("id")
+        with repository.batch():
+            for number in range(self.count_item):
+                repository.create(
+                    **{
+                        **book_data,
+                        "author": f"Автор {number % 4}",
+                        "year": 2000 + number % 5,
+                        "availability": number % 3 == 0,
+                    }
+                )
+
+    def test_stats(self, repository: BaseRepositoryBook, book: BookSchema):
+        assert repository.stats().total == 0
+        self.create_books(repository, book)
+        repository.update(1, author="Новый автор", availability=False)
+        repository.update(2, year=1999)
+        for obj_id in range(3, self.count_item, 7):
+            repository.remove(obj_id)
+
+        stats = repository.stats().model_dump()
+        assert stats == count_books(
+            repository.get_all()
+        ), "Счетчики должны совпадать с подсчетом всех книг."
+        assert (
+            open_repository(repository.path_json).stats().model_dump() == stats
+        ), "Счетчики должны сохраняться вместе с книгами."
+
+    def test_stats_journal(self, tmpdir: Path, book: BookSchema):
+        json_path = Path(tmpdir / "test_stats.json")
+        repository = RepositoryBook(json_path, journal=True)
+        self.create_books(repository, book)
+        repository.compact()
+        repository.update(5, author="Новый автор")
+        repository.remove(6)
+
+        assert (
+            RepositoryBook(json_path, journal=True).stats()
+            == repository.stats()
+        ), "Счетчики из кэша должны учитывать изменения журнала."
+        assert RepositoryBook(
+            json_path, journal=True, cache=False
+        ).stats().model_dump() == count_books(repository.get_all())
+
+    def test_stats_old_sqlite(self, tmpdir: Path, book: BookSchema):
+        path_db = Path(tmpdir / "test_stats.sqlite3")
+        repository = SQLiteRepositoryBook(path_db)
+        self.create_books(repository, book)
+        repository.close()
+        connection = sqlite3.connect(path_db)
+        for name in ("insert", "delete", "update"):
+            connection.execute(f"DROP TRIGGER stats_{name}")
+        for field in ("author", "year", "availability"):
+            connection.execute(f"DROP TABLE stats_{field}")
+        connection.commit()
+        connection.close()
+
+        repository = SQLiteRepositoryBook(path_db)
+        assert repository.stats().model_dump() == count_books(
+            repository.get_all()
+        ), "Книги базы без таблиц статистики должны быть посчитаны."
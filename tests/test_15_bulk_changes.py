@@ -0,0 +1,179 @@
+from argparse import ArgumentTypeError, Namespace
+
+import pytest
+
+from book_library.base_repository import BaseRepositoryBook
+from book_library.commands import delete, get, patch
+from book_library.console_parser import ids_type
+from book_library.query import EqualPredicate, IdRanges, RangePredicate
+from book_library.schemas import BookSchema
+from book_library.storage import open_repository
+
+
+def make_namespace(**kwargs) -> Namespace:
+    args = dict(
+        id=None,
+        title=None,
+        author=None,
+        year=None,
+        availability=None,
+        field=None,
+        value=None,
+        year_from=None,
+        year_to=None,
+    )
+    return Namespace(**{**args, **kwargs})
+
+
+class TestBulkChanges:
+    """Test class for changes of many books by conditions.
+    It is testing update_many, remove_many and their commands."""
+
+    count_item = 30
+
+    def create_books(self, repository: BaseRepositoryBook, book: BookSchema):
+        book_data = book.model_dump()
+        book_data.pop("id")
+        with repository.batch():
+            for number in range(self.count_item):
+                repository.create(
+                    **{
+                        **book_data,
+                        "author": f"Автор {number % 3}",
+                        "year": 2000 + number,
+                    }
+                )
+
+    def test_update_many(
+        self, repository: BaseRepositoryBook, book: BookSchema
+    ):
+        self.create_books(repository, book)
+        predicates = [
+            EqualPredicate("author", "Автор 1"),
+            RangePredicate("year", None, 2015),
+        ]
+
+        count_books = repository.update_many(predicates, availability=False)
+
+        updated_ids = [
+            book_.id
+            for book_ in repository.get_all()
+            if not book_.availability
+        ]
+        expected_ids = list(range(2, 16, 3))
+        assert (
+            updated_ids == expected_ids
+        ), "Изменены должны быть все книги по условиям и только они."
+        assert count_books == len(updated_ids)
+        assert [
+            book_.id
+            for book_ in open_repository(repository.path_json).get_all()
+            if not book_.availability
+        ] == updated_ids, "Изменения книг должны быть записаны."
+        assert (
+            repository.update_many(
+                [EqualPredicate("author", "Никто")], title="Новое название"
+            )
+            == 0
+        ), "Без найденных книг ничего не должно меняться."
+
+    def test_remove_many(
+        self, repository: BaseRepositoryBook, book: BookSchema
+    ):
+        self.create_books(repository, book)
+
+        count_books = repository.remove_many(
+            [EqualPredicate("author", "Автор 0")]
+        )
+
+        assert count_books == self.count_item // 3
+        left_books = open_repository(repository.path_json).get_all()
+        assert len(left_books) == self.count_item - count_books
+        assert all(
+            book_.author != "Автор 0" for book_ in left_books
+        ), "Удалены должны быть все книги по условию."
+        assert repository.stats().authors == {
+            "Автор 1": 10,
+            "Автор 2": 10,
+        }, "Удаление книг должно менять статистику."
+
+    def test_bulk_commands(
+        self,
+        repository: BaseRepositoryBook,
+        book: BookSchema,
+        capsys: pytest.CaptureFixture,
+    ):
+        self.create_books(repository, book)
+
+        patch(
+            repository,
+            make_namespace(
+                field=["author"], value=["Автор 2"], availability=False
+            ),
+        )
+        assert "Изменено 10 книг" in capsys.readouterr().out
+        patch(repository, make_namespace(id=1, availability=False))
+        assert (
+            repository.get(1).availability is False
+        ), "Команда изменения должна менять наличие на False."
+
+        delete(repository, make_namespace(year_from=2020))
+        assert "Удалено 10 книг" in capsys.readouterr().out
+        delete(repository, make_namespace(field=["genre"], value=["роман"]))
+        assert "Неизвестные поля" in capsys.readouterr().out
+        assert len(repository.get_all()) == self.count_item - 10
+
+    def test_many_ids(
+        self,
+        repository: BaseRepositoryBook,
+        book: BookSchema,
+        capsys: pytest.CaptureFixture,
+    ):
+        self.create_books(repository, book)
+        obj_ids = IdRanges(ids_type("1,5,10-12,99"))
+
+        assert list(obj_ids) == [1, 5, 10, 11, 12, 99]
+        found_ids = [book_.id for book_ in repository.get_many(obj_ids)]
+        assert (
+            found_ids == list(obj_ids)[:-1]
+        ), "Книги должны находиться по всем существующим айди."
+
+        delete(repository, make_namespace(id=ids_type("2-4,30")))
+        assert "Удалено 4 книг" in capsys.readouterr().out
+        get(repository, make_namespace(id=[1, 2, 5], format="tsv"))
+        assert [
+            line.split("\t")[0]
+            for line in capsys.readouterr().out.splitlines()[1:]
+        ] == ["1", "5"], "Удаленные книги не должны находиться по айди."
+        assert len(open_repository(repository.path_json).get_all()) == (
+            self.count_item - 4
+        )
+        with pytest.raises(ArgumentTypeError):
+            ids_type("10-2")
+
+    def test_large_id_ranges(
+        self,
+        repository: BaseRepositoryBook,
+        book: BookSchema,
+        capsys: pytest.CaptureFixture,
+    ):
+        self.create_books(repository, book)
+        obj_ids = IdRanges(ids_type("25-1000000000000,3,1-2,2-4"))
+
+        assert obj_ids.ranges == [range(1, 5), range(25, 10**12 + 1)]
+        assert 10**12 in obj_ids and 5 not in obj_ids
+        assert [book_.id for book_ in repository.get_many(obj_ids)] == [
+            1,
+            2,
+            3,
+            4,
+            *range(25, self.count_item + 1),
+        ], "Диапазон айди должен пересекаться с каталогом без перебора."
+
+        patch(
+            repository,
+            make_namespace(id=ids_type("28-1000000000000"), year=1800),
+        )
+        assert "Изменено 3 книг" in capsys.readouterr().out
+        delete(repository, make_namespace(id=ids_type("1-1000000000000")))
+        assert f"Удалено {self.count_item} книг" in capsys.readouterr().out
@@ -0,0 +1,62 @@
+from pathlib import Path
+
+import pytest
+
+from book_library.base_repository import BaseRepositoryBook
+from book_library.metrics import Metrics, metrics, profile
+from book_library.outputs import pretty_books_output
+from book_library.schemas import BookSchema
+
+
+class TestMetrics:
+    """Test class for metrics of work stages.
+    It is testing spans and counters of storages, hooks and profile."""
+
+    count_item = 10
+
+    def test_spans(self, repository: BaseRepositoryBook, book: BookSchema):
+        book_data = book.model_dump()
+        book_data.pop("id")
+        metrics.reset()
+        for _ in range(self.count_item):
+            repository.create(**book_data)
+        books = list(repository.iter_search([], book.title[:3]))
+        pretty_books_output(books)
+
+        snapshot = metrics.snapshot()
+        spans = snapshot["spans"]
+        assert (
+            spans["mutation"]["count"] == self.count_item
+        ), "Каждое изменение должно измеряться."
+        for name in ("flush", "lookup", "render"):
+            assert name in spans, f"Этап {name} должен измеряться."
+            assert spans[name]["max_ms"] <= spans[name]["total_ms"]
+        assert snapshot["counters"]["records.matched"] == len(books)
+        assert (
+            snapshot["counters"]["records.scanned"] >= self.count_item
+        ), "Поиск по тексту должен считать просмотренные книги."
+
+    def test_hook(self):
+        local_metrics = Metrics()
+        finished = []
+        local_metrics.add_hook(lambda name, seconds: finished.append(name))
+
+        with local_metrics.span("work"):
+            pass
+        local_metrics.count("records.scanned", 5)
+
+        assert finished == ["work"], "Хук должен получать каждый этап."
+        assert local_metrics.snapshot()["counters"] == {"records.scanned": 5}
+        local_metrics.reset()
+        assert local_metrics.snapshot() == {"spans": {}, "counters": {}}
+
+    def test_profile(self, tmpdir: Path, capsys: pytest.CaptureFixture):
+        path_dump = Path(tmpdir / "command.prof")
+        metrics.reset()
+
+        with profile(True, path_dump):
+            with metrics.span("work"):
+                pass
+
+        assert path_dump.exists(), "Профиль должен записываться в файл."
+        assert "work" in capsys.readouterr().err
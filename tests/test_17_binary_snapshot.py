@@ -0,0 +1,168 @@
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+
+from book_library import journal
+from book_library.binary_snapshot import BINARY_MAGIC, BinarySnapshot
+from book_library.commands import convert, get, get_from_snapshot
+from book_library.repository import RepositoryBook
+from book_library.schemas import BookSchema
+from book_library.storage import read_snapshot_book
+
+
+class TestBinarySnapshot:
+    """Test class for binary snapshot format.
+    It is testing reading by columns, point reads and conversion."""
+
+    count_item = 20
+
+    def create_books(self, repository: RepositoryBook, book: BookSchema):
+        book_data = book.model_dump()
+        book_data.pop("id")
+        with repository.batch():
+            for number in range(self.count_item):
+                repository.create(
+                    **{
+                        **book_data,
+                        "title": f"Книга {number % 7}",
+                        "author": f"Автор {number % 3}",
+                        "year": 1990 + number,
+                        "availability": number % 2 == 0,
+                    }
+                )
+
+    @pytest.mark.parametrize("columnar", [False, True])
+    def test_binary_repository(
+        self, tmpdir: Path, book: BookSchema, columnar: bool
+    ):
+        path_file = Path(tmpdir / "test_binary.books")
+        repository = RepositoryBook(path_file, columnar=columnar)
+        self.create_books(repository, book)
+        repository.update(3, title="Новое название", availability=False)
+        repository.remove(5)
+
+        assert path_file.read_bytes().startswith(
+            BINARY_MAGIC
+        ), "Снимок должен записываться в бинарном формате."
+        reopened = RepositoryBook(path_file, columnar=columnar)
+        assert [book_.model_dump() for book_ in reopened.get_all()] == [
+            book_.model_dump() for book_ in repository.get_all()
+        ], "Книги бинарного снимка должны совпадать с записанными."
+        assert reopened.stats() == repository.stats()
+        assert not reopened.path_cache.exists()
+
+    def test_point_read(self, tmpdir: Path, book: BookSchema):
+        path_file = Path(tmpdir / "test_binary.books")
+        repository = RepositoryBook(path_file)
+        self.create_books(repository, book)
+        repository.remove(7)
+
+        with BinarySnapshot(path_file) as snapshot:
+            assert len(snapshot) == self.count_item - 1
+            assert (
+                snapshot.get(8).model_dump() == repository.get(8).model_dump()
+            ), "Книга должна читаться по айди без чтения всего снимка."
+            assert snapshot.get(7) is None
+            assert snapshot.get(self.count_item + 1) is None
+
+    def test_get_from_snapshot(
+        self,
+        tmpdir: Path,
+        book: BookSchema,
+        capsys: pytest.CaptureFixture,
+    ):
+        path_file = Path(tmpdir / "test_binary.books")
+        repository = RepositoryBook(path_file, journal=True)
+        self.create_books(repository, book)
+        repository.update(3, title="Новое название")
+        repository.remove(5)
+        assert repository.journal.size() > 0
+
+        for obj_id in (3, 5, 8):
+            get(repository, Namespace(id=[obj_id]))
+            expected = capsys.readouterr().out
+            get_from_snapshot(path_file, Namespace(id=[obj_id]))
+            assert (
+                capsys.readouterr().out == expected
+            ), "Книга снимка должна читаться по айди с учетом журнала."
+
+    def test_point_read_large_journal(
+        self,
+        tmpdir: Path,
+        book: BookSchema,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        path_file = Path(tmpdir / "test_binary.books")
+        repository = RepositoryBook(path_file, journal=True)
+        self.create_books(repository, book)
+        repository.compact()
+        with repository.batch():
+            for number in range(900):
+                repository.update(
+                    number % self.count_item + 1, title=f"Название {number}"
+                )
+        repository.remove(4)
+        repository.create(**book.model_dump(exclude={"id"}))
+        assert len(repository.journal) > 900
+
+        decoded = []
+        loads = journal.json.loads
+        monkeypatch.setattr(
+            journal.json,
+            "loads",
+            lambda data: decoded.append(data) or loads(data),
+        )
+        for obj_id in range(1, self.count_item + 2):
+            book_ = read_snapshot_book(path_file, obj_id)
+            expected = repository.books.get(obj_id)
+            assert (book_ and book_.model_dump()) == (
+                expected and expected.model_dump()
+            ), "Книга должна читаться с последней записью журнала."
+        assert (
+            len(decoded) <= self.count_item + 1
+        ), "Чтение книги не должно разбирать все записи журнала."
+
+    def test_invalid_binary(self, tmpdir: Path, book: BookSchema):
+        path_file = Path(tmpdir / "test_binary.books")
+        self.create_books(RepositoryBook(path_file), book)
+        data = path_file.read_bytes()
+
+        for broken in (b"NOTBOOKS" + data[8:], data[: len(data) // 2]):
+            path_file.write_bytes(broken)
+            with pytest.raises(ValueError) as ex:
+                RepositoryBook(path_file)
+            assert "невалидные данные" in str(
+                ex.value
+            ), "Поврежденный бинарный снимок не должен читаться."
+
+    def test_convert(
+        self,
+        tmpdir: Path,
+        book: BookSchema,
+        capsys: pytest.CaptureFixture,
+    ):
+        json_path = Path(tmpdir / "test_convert.json")
+        repository = RepositoryBook(json_path)
+        self.create_books(repository, book)
+        repository.remove(1)
+        books = [book_.model_dump() for book_ in repository.get_all()]
+
+        binary_path = Path(tmpdir / "test_convert.books")
+        convert(repository, Namespace(file=binary_path))
+        assert "Записано 19 книг" in capsys.readouterr().out
+        binary_repository = RepositoryBook(binary_path)
+        assert [
+            book_.model_dump() for book_ in binary_repository.get_all()
+        ] == books, "Конвертация должна сохранять книги и их айди."
+
+        back_path = Path(tmpdir / "test_back.json")
+        convert(binary_repository, Namespace(file=back_path))
+        assert [
+            book_.model_dump() for book_ in RepositoryBook(back_path).get_all()
+        ] == books
+        convert(repository, Namespace(file=json_path))
+        convert(repository, Namespace(file=Path(tmpdir / "books.csv")))
+        output = capsys.readouterr().out
+        assert "нельзя записать в файл хранилища" in output
+        assert "путь к файлу .json" in output
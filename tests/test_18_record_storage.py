@@ -0,0 +1,207 @@
+import json
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+
+from book_library.commands import convert
+from book_library.record_file import (
+    UNDO_ENTRY,
+    UNDO_HEADER,
+    overflow_path,
+    undo_path,
+)
+from book_library.record_repository import RecordRepositoryBook
+from book_library.repository import RepositoryBook
+from book_library.schemas import BookSchema
+from book_library.snapshot import write_snapshot
+
+
+class TestRecordStorage:
+    """Test class for storage of books in records of fixed size.
+    It is testing changes in place, long strings and rollback."""
+
+    count_item = 20
+
+    def create_books(
+        self, repository: RecordRepositoryBook, book: BookSchema
+    ) -> None:
+        book_data = book.model_dump()
+        book_data.pop("id")
+        repository.create_many(
+            {**book_data, "year": 2000 + number}
+            for number in range(self.count_item)
+        )
+
+    def test_change_in_place(self, tmpdir: Path, book: BookSchema):
+        path_file = Path(tmpdir / "test_records.rec")
+        repository = RecordRepositoryBook(path_file)
+        self.create_books(repository, book)
+        size = path_file.stat().st_size
+
+        repository.update(5, title="Новое название", availability=False)
+        repository.remove(7)
+
+        assert (
+            path_file.stat().st_size == size
+        ), "Изменение и удаление книги должны менять запись на месте."
+        reopened = RecordRepositoryBook(path_file)
+        assert reopened.get(5).title == "Новое название"
+        assert reopened.get(5).availability is False
+        with pytest.raises(ValueError):
+            reopened.get(7)
+        assert [book_.id for book_ in reopened.get_many([6, 7, 8])] == [6, 8]
+        assert (
+            reopened.create(**book.model_dump(exclude={"id"})).id
+            == self.count_item + 1
+        ), "Айди удаленных книг не должны повторяться."
+
+    def test_long_strings(self, tmpdir: Path, book: BookSchema):
+        path_file = Path(tmpdir / "test_records.rec")
+        repository = RecordRepositoryBook(path_file)
+        title = "Очень длинное название " * 20
+        author = "Автор " * 30
+
+        new_book = repository.create(
+            title=title, author=author, year=2000, availability=True
+        )
+
+        assert overflow_path(path_file).stat().st_size > 0
+        reopened_book = RecordRepositoryBook(path_file).get(new_book.id)
+        assert (
+            reopened_book.title == title and reopened_book.author == author
+        ), "Длинные строки должны храниться в файле переполнения."
+
+    def test_rollback(self, tmpdir: Path, book: BookSchema):
+        path_file = Path(tmpdir / "test_records.rec")
+        repository = RecordRepositoryBook(path_file)
+        self.create_books(repository, book)
+        data = path_file.read_bytes()
+        book_data = book.model_dump(exclude={"id"})
+
+        with pytest.raises(ValueError):
+            repository.create_many([book_data, {**book_data, "year": "год"}])
+        with pytest.raises(RuntimeError):
+            with repository.batch():
+                repository.update(1, title="Название " * 30)
+                repository.remove(2)
+                repository.create(**book_data)
+                raise RuntimeError
+
+        assert (
+            path_file.read_bytes() == data
+        ), "Ошибка должна возвращать записи и длину файла."
+        assert overflow_path(path_file).stat().st_size == 0
+        assert len(repository.get_all()) == self.count_item
+
+    def test_convert_records(
+        self,
+        tmpdir: Path,
+        book: BookSchema,
+        capsys: pytest.CaptureFixture,
+    ):
+        json_path = Path(tmpdir / "test_records.json")
+        json_repository = RepositoryBook(json_path)
+        self.create_books(json_repository, book)
+        json_repository.remove(3)
+        path_file = Path(tmpdir / "test_records.rec")
+
+        convert(json_repository, Namespace(file=path_file))
+
+        assert "Записано 19 книг" in capsys.readouterr().out
+        repository = RecordRepositoryBook(path_file)
+        assert [book_.model_dump() for book_ in repository.get_all()] == [
+            book_.model_dump() for book_ in json_repository.get_all()
+        ], "Конвертация должна сохранять айди книг."
+        assert repository.stats() == json_repository.stats()
+
+    def test_invalid_records(self, tmpdir: Path):
+        path_file = Path(tmpdir / "test_records.rec")
+        path_file.write_bytes(b"not records of books")
+
+        with pytest.raises(ValueError) as ex:
+            RecordRepositoryBook(path_file)
+        assert "невалидные данные" in str(ex.value)
+
+    def test_invalid_ids(self, tmpdir: Path, book: BookSchema):
+        path_file = Path(tmpdir / "test_records.rec")
+        repository = RecordRepositoryBook(path_file)
+        self.create_books(repository, book)
+        data = path_file.read_bytes()
+
+        with pytest.raises(ValueError):
+            repository.create(
+                **{**book.model_dump(exclude={"id"}), "year": 2**70}
+            )
+        assert path_file.read_bytes() == data
+
+        for obj_id in (0, 10**9):
+            json_path = Path(tmpdir / f"test_records_{obj_id}.json")
+            json_path.write_text(
+                json.dumps([{**book.model_dump(), "id": obj_id}]),
+                encoding="utf-8",
+            )
+            records_path = Path(tmpdir / f"test_records_{obj_id}.rec")
+            with pytest.raises(ValueError):
+                write_snapshot(
+                    records_path, RepositoryBook(json_path).iter_all()
+                )
+            assert (
+                not records_path.exists()
+            ), "Айди вне файла записей не должен создавать файл."
+
+    def test_recover_after_crash(self, tmpdir: Path, book: BookSchema):
+        path_file = Path(tmpdir / "test_records.rec")
+        repository = RecordRepositoryBook(path_file)
+        self.create_books(repository, book)
+        with repository.batch():
+            repository.update(1, title="Новое название")
+            repository.remove(2)
+        assert (
+            undo_path(path_file).stat().st_size == 0
+        ), "Журнал должен очищаться после записи."
+        data = path_file.read_bytes()
+        size_overflow = overflow_path(path_file).stat().st_size
+
+        position = len(data) // 2
+        old_bytes = data[position : position + 10]
+        undo_path(path_file).write_bytes(
+            UNDO_HEADER.pack(len(data), size_overflow)
+            + UNDO_ENTRY.pack(position, len(old_bytes))
+            + old_bytes
+            + UNDO_ENTRY.pack(0, 100)
+        )
+        path_file.write_bytes(
+            data[:position]
+            + bytes(len(old_bytes))
+            + data[position + len(old_bytes) :]
+            + bytes(100)
+        )
+        with overflow_path(path_file).open("ab") as file:
+            file.write(b"x" * 50)
+
+        reopened = RecordRepositoryBook(path_file)
+        assert (
+            path_file.read_bytes() == data
+        ), "Прерванное изменение должно отменяться при открытии."
+        assert overflow_path(path_file).stat().st_size == size_overflow
+        assert undo_path(path_file).stat().st_size == 0
+        assert len(reopened.get_all()) == self.count_item - 1
+
+    def test_string_ids(self, tmpdir: Path, book: BookSchema):
+        path_file = Path(tmpdir / "test_records.rec")
+        repository = RecordRepositoryBook(path_file)
+        self.create_books(repository, book)
+        json_repository = RepositoryBook(Path(tmpdir / "test_records.json"))
+        self.create_books(json_repository, book)
+
+        for obj_id in ("3", 3):
+            assert (
+                repository.get(obj_id).model_dump()
+                == json_repository.get(obj_id).model_dump()
+            ), "Айди строкой должен читаться как в json хранилище."
+        for obj_id in ("03", "три", True, 3.5):
+            with pytest.raises(ValueError):
+                repository.get(obj_id)
+            with pytest.raises(ValueError):
+                json_repository.get(obj_id)
@@ -0,0 +1,112 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from book_library.schemas import BookSchema
+from book_library.snapshot import (
+    iter_snapshot,
+    read_jsonl_parallel,
+    split_jsonl,
+)
+from book_library.stats import BookStats
+
+
+class TestParallelLoad:
+    """Test class for validation of json lines snapshot in processes.
+    It is testing order of books, counters and numbers of errors."""
+
+    count_item = 300
+    chunk_bytes = 2048
+
+    def write_books(self, path_file: Path, book: BookSchema) -> list[dict]:
+        books_data = [
+            {
+                **book.model_dump(),
+                "id": number,
+                "author": f"Автор {number % 7}",
+                "year": 1900 + number % 50,
+                "availability": number % 3 == 0,
+            }
+            for number in range(1, self.count_item + 1)
+        ]
+        lines = list(map(json.dumps, books_data))
+        lines.insert(100, "")
+        path_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return books_data
+
+    def test_split_jsonl(self, tmpdir: Path, book: BookSchema):
+        path_file = Path(tmpdir / "test_parallel.jsonl")
+        self.write_books(path_file, book)
+        data = path_file.read_bytes()
+
+        ranges = split_jsonl(path_file, self.chunk_bytes)
+
+        assert len(ranges) > 2
+        assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            assert end == start and data[end - 1 : end] == b"\n", (
+                "Части снимка должны идти подряд и заканчиваться"
+                " концом строки."
+            )
+
+    def test_parallel_load(self, tmpdir: Path, book: BookSchema):
+        path_file = Path(tmpdir / "test_parallel.jsonl")
+        books_data = self.write_books(path_file, book)
+
+        store, stats = read_jsonl_parallel(path_file, 2, self.chunk_bytes)
+
+        assert [
+            book_.model_dump() for book_ in store.values()
+        ] == books_data, "Книги частей должны идти в порядке файла."
+        expected_stats = BookStats()
+        expected_stats.build(iter_snapshot(path_file))
+        assert stats.summary() == expected_stats.summary()
+        assert read_jsonl_parallel(path_file, 1, self.chunk_bytes) is None
+        assert read_jsonl_parallel(path_file, 2) is None
+
+    def test_parallel_errors(self, tmpdir: Path, book: BookSchema):
+        path_file = Path(tmpdir / "test_parallel.jsonl")
+        self.write_books(path_file, book)
+        lines = path_file.read_text(encoding="utf-8").splitlines()
+
+        lines[250] = lines[250].replace('"availability"', '"year": "год", "x"')
+        path_file.write_text("\n".join(lines), encoding="utf-8")
+        with pytest.raises(ValueError) as ex:
+            read_jsonl_parallel(path_file, 2, self.chunk_bytes)
+        assert "запись 251)" in str(ex.value) and "часть" in str(
+            ex.value
+        ), "Ошибка должна содержать номер части и строки записи."
+
+        lines[250] = lines[251]
+        path_file.write_text("\n".join(lines), encoding="utf-8")
+        with pytest.raises(ValueError) as ex:
+            read_jsonl_parallel(path_file, 2, self.chunk_bytes)
+        assert "запись 251)" in str(
+            ex.value
+        ), "Повтор айди должен указывать номер книги."
+
+    def test_same_records_as_serial(self, tmpdir: Path, book: BookSchema):
+        path_file = Path(tmpdir / "test_parallel.jsonl")
+        self.write_books(path_file, book)
+        lines = path_file.read_text(encoding="utf-8").splitlines()
+
+        lines[200] = f"{lines[200]},{lines[201]}"
+        del lines[201]
+        path_file.write_text("\n".join(lines), encoding="utf-8")
+        with pytest.raises(ValueError) as ex:
+            read_jsonl_parallel(path_file, 2, self.chunk_bytes)
+        assert "запись 201)" in str(
+            ex.value
+        ), "Строка с двумя записями не должна читаться ни одним путем."
+        with pytest.raises(ValueError):
+            list(iter_snapshot(path_file))
+
+        lines[200] = json.dumps(
+            {**book.model_dump(), "id": 2**70, "year": -(2**70)}
+        )
+        path_file.write_text("\n".join(lines), encoding="utf-8")
+        store, _ = read_jsonl_parallel(path_file, 2, self.chunk_bytes)
+        assert [book_.model_dump() for book_ in store.values()] == [
+            book_.model_dump() for book_ in iter_snapshot(path_file)
+        ], "Большие айди и годы должны читаться как в одном процессе."